@@ -0,0 +1,37 @@
+#!/bin/sh
+# Starts gunicorn, and with REPLICATE_DB=True the replicator beside it,
+# since it needs the database on the same volume. SIGTERM and SIGINT are
+# passed on to both, so an upload in progress finishes before the
+# machine stops. replicate_db retries failed shipments itself; if it
+# gives up, or isn't configured, the app carries on without it.
+
+replicator=
+case "${REPLICATE_DB:-False}" in
+    True|true|1)
+        python manage.py replicate_db &
+        replicator=$!
+        ;;
+esac
+
+gunicorn --bind :8000 --workers 2 tennis_doubles.wsgi:application &
+server=$!
+
+stopped=
+stop() {
+    if [ -z "$stopped" ]; then
+        stopped=1
+        kill -TERM "$server" $replicator 2>/dev/null
+    fi
+}
+trap stop TERM INT
+
+wait "$server"
+status=$?
+# A trapped signal ends the wait early, so wait again for gunicorn to exit
+if kill -0 "$server" 2>/dev/null; then
+    wait "$server"
+    status=$?
+fi
+stop
+wait
+exit "$status"
@@ -12,5 +12,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tennis_doubles.settings')
+# Record /metrics/ figures in the app server's workers
+os.environ.setdefault('METRICS_ENABLED', 'True')
 
 application = get_asgi_application()
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 import os
 from pathlib import Path
 import environ
+from tournament.sqlite import TUNED_PRAGMAS
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -49,16 +50,44 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tournament.middleware.RequestTimingMiddleware',
+    'tournament.middleware.MaintenanceModeMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'tournament.middleware.RequestProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Server-Timing headers and a timing log line per request
+REQUEST_TIMING_ENABLED = env.bool('REQUEST_TIMING_ENABLED', default=True)
+
+# Latency histograms and counters behind /metrics/, shared by all workers
+# through a small SQLite file (next to the main database unless set).
+# wsgi.py and asgi.py switch them on, so tests and management commands
+# do not write metrics unless asked to
+METRICS_ENABLED = env.bool('METRICS_ENABLED', default=False)
+METRICS_DB_PATH = env('METRICS_DB_PATH', default=None)
+METRICS_FLUSH_INTERVAL = env.int('METRICS_FLUSH_INTERVAL', default=5)
+
+# Staff can profile a single request with ?profile=1; profiles are kept
+# here and listed in the admin at /admin/profiles/
+PROFILING_ENABLED = env.bool('PROFILING_ENABLED', default=True)
+PROFILE_DIR = env('PROFILE_DIR', default=os.path.join(BASE_DIR, 'profiles'))
+PROFILE_KEEP = env.int('PROFILE_KEEP', default=50)
+
+# Match and team saves take SQLite's write lock up front and retry with
+# backoff while another worker holds it. WRITE_QUEUE_ENABLED also makes
+# threads in one worker wait their turn before asking for the lock.
+WRITE_RETRY_ATTEMPTS = env.int('WRITE_RETRY_ATTEMPTS', default=5)
+WRITE_RETRY_BACKOFF = env.float('WRITE_RETRY_BACKOFF', default=0.05)
+WRITE_RETRY_MAX_BACKOFF = env.float('WRITE_RETRY_MAX_BACKOFF', default=1.0)
+WRITE_QUEUE_ENABLED = env.bool('WRITE_QUEUE_ENABLED', default=False)
+
 ROOT_URLCONF = 'tennis_doubles.urls'
 
 TEMPLATES = [
@@ -83,13 +112,59 @@ WSGI_APPLICATION = 'tennis_doubles.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# The tournament backend is Django's SQLite backend plus the PRAGMAs below,
+# run on every new connection. SQLITE_TUNING=False keeps SQLite's defaults.
+SQLITE_PRAGMAS = {
+    **TUNED_PRAGMAS,
+    'cache_size': env.int('SQLITE_CACHE_SIZE', default=TUNED_PRAGMAS['cache_size']),
+    'mmap_size': env.int('SQLITE_MMAP_SIZE', default=TUNED_PRAGMAS['mmap_size']),
+    'busy_timeout': env.int('SQLITE_BUSY_TIMEOUT', default=TUNED_PRAGMAS['busy_timeout']),
+} if env.bool('SQLITE_TUNING', default=True) else {}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'tournament.backends.sqlite3',
         'NAME': os.environ.get('SQLITE_DB_PATH', os.path.join(BASE_DIR, 'db.sqlite3')),
+        # Seconds a worker keeps its connection open between requests
+        'CONN_MAX_AGE': env.int('DB_CONN_MAX_AGE', default=600),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'pragmas': SQLITE_PRAGMAS,
+        },
     }
 }
 
+# While restore_db swaps the database file, MAINTENANCE_FLAG_PATH exists:
+# writes get a 503 asking to retry after MAINTENANCE_RETRY_AFTER seconds
+# and reads go to a read-only copy taken just before
+MAINTENANCE_FLAG_PATH = env('MAINTENANCE_FLAG_PATH', default=f"{DATABASES['default']['NAME']}.maintenance")
+MAINTENANCE_SNAPSHOT_PATH = f"{DATABASES['default']['NAME']}.snapshot"
+MAINTENANCE_RETRY_AFTER = env.int('MAINTENANCE_RETRY_AFTER', default=30)
+# Seconds to wait after raising the flag before the swap, for requests that
+# passed the check just before to finish; gunicorn's default timeout
+MAINTENANCE_DRAIN_SECONDS = env.float('MAINTENANCE_DRAIN_SECONDS', default=30)
+
+DATABASES['snapshot'] = {
+    'ENGINE': 'tournament.backends.sqlite3',
+    'NAME': f"file:{MAINTENANCE_SNAPSHOT_PATH}?mode=ro",
+    # Closed after each request so a later snapshot is always picked up
+    'CONN_MAX_AGE': 0,
+    'OPTIONS': {
+        'pragmas': {},
+    },
+    'TEST': {
+        'MIRROR': 'default',
+    },
+}
+DATABASE_ROUTERS = ['tournament.routers.ReadAliasRouter']
+
+# Completed tournaments moved out by archive_seasons, one read-only
+# season_<year>.sqlite3 per season, opened as needed
+SEASON_ARCHIVE_DIR = env(
+    'SEASON_ARCHIVE_DIR',
+    default=os.path.join(os.path.dirname(DATABASES['default']['NAME']) or BASE_DIR, 'seasons'),
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -124,6 +199,9 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# Files with a 12 character hex version in their name, such as the pages
+# written by export_static_history, never change and are cached for a year
+WHITENOISE_IMMUTABLE_FILE_TEST = r'\.[0-9a-f]{12}\.\w+$'
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -148,6 +226,13 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': True,
         },
+        'tournament.timing': {
+            'handlers': ['console'],
+            'level': env('REQUEST_TIMING_LOG_LEVEL', default='INFO'),
+            'propagate': False,
+        },
+        # boto3 logs every request at DEBUG, which drowns out backup output
+        **{name: {'level': 'WARNING'} for name in ('boto3', 'botocore', 's3transfer', 'urllib3')},
     },
 }
 
@@ -16,11 +16,14 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from tournament.views import TournamentGridView
+from tournament.views import TournamentGridView, metrics, profile_detail, profile_list
 
 urlpatterns = [
+    path('admin/profiles/', admin.site.admin_view(profile_list), name='profile_list'),
+    path('admin/profiles/<str:name>', admin.site.admin_view(profile_detail), name='profile_detail'),
     path('admin/', admin.site.urls),
     path('', TournamentGridView.as_view(), name='tournament_grid'),
     path('api/tournament/', include('tournament.api_urls')),
+    path('metrics/', metrics, name='metrics'),
     path('', include('tournament.urls')),
 ]
@@ -1,6 +1,13 @@
-from django.contrib import admin
+import io
+import os
+from django.contrib import admin, messages
 from django import forms
-from .models import Tournament, Group, TournamentGroup, Player, Team, Match
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
+from .imports import MatchResultImporter, current_tournament, read_rows
+from .models import Tournament, Group, TournamentGroup, Player, Team, Match, ValidationContext
+from .writes import WriteRetryAdminMixin
 
 class TournamentGroupInline(admin.TabularInline):
     model = TournamentGroup
@@ -21,6 +28,31 @@ class TournamentAdmin(admin.ModelAdmin):
     list_filter = ['status']
     inlines = [TournamentGroupInline]
 
+    def save_model(self, request, obj, form, change):
+        # A changed tournament is saved in save_related, once the inline's
+        # groups are known; a new one has no groups to count yet
+        if not change:
+            super().save_model(request, obj, form, change)
+
+    def save_related(self, request, form, formsets, change):
+        if change:
+            tournament = form.instance
+            tournament.save(validation_context=ValidationContext(
+                tournaments={tournament.pk: tournament},
+                group_counts={tournament.pk: self.group_count(formsets)},
+            ))
+        super().save_related(request, form, formsets, change)
+
+    def group_count(self, formsets):
+        """The groups the tournament will have once the inline is saved"""
+        return sum(
+            1
+            for formset in formsets if formset.model is TournamentGroup
+            for inline_form in formset.forms
+            if (inline_form.instance.pk or inline_form.has_changed())
+            and not inline_form.cleaned_data.get('DELETE')
+        )
+
 @admin.register(Group)
 class GroupAdmin(admin.ModelAdmin):
     list_display = ['name']
@@ -36,10 +68,12 @@ class TeamAdminForm(forms.ModelForm):
         fields = ['player1', 'player2', 'tournament_group', 'rank', 'is_withdrawn']
 
 @admin.register(Team)
-class TeamAdmin(admin.ModelAdmin):
+class TeamAdmin(WriteRetryAdminMixin, admin.ModelAdmin):
     form = TeamAdminForm
     list_display = ['__str__', 'player1', 'player2', 'get_group', 'get_tournament', 'rank']
-    list_filter = ['tournament_group__group', 'tournament_group__tournament']
+    list_filter = ['tournament_group__group', 'tournament']
+    list_select_related = ['player1', 'player2',
+                           'tournament_group__group', 'tournament']
     search_fields = ['player1__first_name', 'player1__last_name',
                     'player2__first_name', 'player2__last_name']
 
@@ -54,9 +88,9 @@ class TeamAdmin(admin.ModelAdmin):
     get_group.admin_order_field = 'tournament_group__group'
 
     def get_tournament(self, obj):
-        return obj.tournament_group.tournament
+        return obj.tournament
     get_tournament.short_description = 'Tournament'
-    get_tournament.admin_order_field = 'tournament_group__tournament'
+    get_tournament.admin_order_field = 'tournament'
 
     class Media:
         js = ('js/team_admin.js',)
@@ -83,18 +117,97 @@ class MatchAdminForm(forms.ModelForm):
 
         # Set the team querysets based on tournament
         if tournament:
-            teams = Team.objects.filter(tournament_group__tournament=tournament)
+            # Match.clean checks the selected teams against their copied
+            # tournament id, so no tournament group needs loading
+            teams = Team.objects.filter(tournament=tournament)
             self.fields['team1'].queryset = teams
             self.fields['team2'].queryset = teams
         else:
             self.fields['team1'].queryset = Team.objects.none()
             self.fields['team2'].queryset = Team.objects.none()
 
+class MatchImportForm(forms.Form):
+    tournament = forms.ModelChoiceField(
+        queryset=Tournament.objects.order_by('-start_date')
+    )
+    results_file = forms.FileField(
+        help_text="CSV or JSON with team1, team2, set1_team1 ... set3_team2, "
+                  "date_played and retired_team columns"
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        help_text="Check every row without saving anything"
+    )
+
+class TournamentGroupFilter(admin.RelatedFieldListFilter):
+    """Group filter whose labels don't load the group and tournament per choice"""
+
+    def field_choices(self, field, request, model_admin):
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        queryset = TournamentGroup.objects.select_related('group', 'tournament')
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return [(tournament_group.pk, str(tournament_group)) for tournament_group in queryset]
+
 @admin.register(Match)
-class MatchAdmin(admin.ModelAdmin):
+class MatchAdmin(WriteRetryAdminMixin, admin.ModelAdmin):
     form = MatchAdminForm
     list_display = ('__str__', 'tournament', 'date_played', 'get_score', 'retired_team')
-    list_filter = ('tournament', 'team1__tournament_group', 'date_played', 'retired_team')
+    list_filter = ('tournament', ('team1__tournament_group', TournamentGroupFilter),
+                   'date_played', 'retired_team')
+    list_select_related = ('tournament', 'team1__player1', 'team1__player2',
+                           'team2__player1', 'team2__player2')
+    change_list_template = 'admin/tournament/match/change_list.html'
+
+    def get_urls(self):
+        urls = [
+            path(
+                'import/',
+                self.admin_site.admin_view(self.import_results_view),
+                name='tournament_match_import',
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def import_results_view(self, request):
+        """Upload a batch of results and bulk insert the valid rows"""
+        if not self.has_add_permission(request):
+            return redirect('admin:tournament_match_changelist')
+
+        result = None
+        if request.method == 'POST':
+            form = MatchImportForm(request.POST, request.FILES)
+            if form.is_valid():
+                upload = form.cleaned_data['results_file']
+                file_format = 'json' if os.path.splitext(upload.name)[1].lower() == '.json' else 'csv'
+                try:
+                    rows = read_rows(
+                        io.StringIO(upload.read().decode('utf-8-sig')), file_format
+                    )
+                except (UnicodeDecodeError, ValueError) as e:
+                    form.add_error('results_file', f"Could not read file: {e}")
+                else:
+                    importer = MatchResultImporter(form.cleaned_data['tournament'])
+                    result = importer.import_rows(rows, dry_run=form.cleaned_data['dry_run'])
+                    verb = 'would be imported' if form.cleaned_data['dry_run'] else 'imported'
+                    self.message_user(
+                        request,
+                        f"{len(result.created)} results {verb}, {len(result.errors)} rows rejected",
+                        messages.WARNING if result.errors else messages.SUCCESS,
+                    )
+        else:
+            form = MatchImportForm(initial={'tournament': current_tournament()})
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Import match results',
+            'form': form,
+            'result': result,
+        }
+        return TemplateResponse(
+            request, 'admin/tournament/match/import_results.html', context
+        )
 
     class Media:
         js = ('js/match_admin.js',)
\ No newline at end of file
@@ -9,9 +9,8 @@ class TeamAPI:
     def get_teams_by_tournament(self, tournament_id: int) -> List[Dict[str, Any]]:
         """Get teams grouped by tournament group"""
         teams = Team.objects.filter(
-            tournament_group__tournament_id=tournament_id
+            tournament_id=tournament_id
         ).select_related(
-            'player1', 'player2',
             'tournament_group', 'tournament_group__group'
         ).order_by('tournament_group__group__name')
 
@@ -32,7 +31,7 @@ class TeamAPI:
 
             groups_dict[group_name]['teams'].append({
                 'id': team.id,
-                'name': f"{team.player1.first_name}/{team.player2.first_name}"
+                'name': team.full_label
             })
 
         return list(groups_dict.values())
@@ -49,7 +48,7 @@ class TeamAPI:
 
         # Find the team this player was on in the previous tournament
         previous_team = Team.objects.filter(
-            tournament_group__tournament=previous_tournament
+            tournament=previous_tournament
         ).filter(
             Q(player1_id=player_id) | Q(player2_id=player_id)
         ).first()
@@ -0,0 +1,309 @@
+# tournament/archive.py
+import json
+import mmap
+import sys
+from array import array
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from django.db import transaction
+from .models import Group, Match, Player, Team, Tournament, TournamentGroup
+from .seasons import archived_querysets
+from .writes import immediate_atomic
+
+MAGIC = b"TDARC\x00\x00\x01"
+VERSION = 1
+
+# Every block starts on a multiple of this, so any column can be cast in place
+ALIGNMENT = 8
+
+# Null in every integer column: ids, scores and ranks are never negative,
+# and dictionary codes and day numbers are kept non-negative too
+NULL = -1
+
+# Days are counted from 1970-01-01, stored as int32
+EPOCH = date(1970, 1, 1).toordinal()
+
+TYPECODES = {"int8": "b", "int16": "h", "int32": "i", "int64": "q", "string": "i", "date": "i"}
+# The array typecodes are sized by the platform's C types
+assert [array(code).itemsize for code in "bhiqI"] == [1, 2, 4, 8, 4]
+
+EXPORT_CHUNK_SIZE = 2000
+IMPORT_BATCH_SIZE = 500
+
+
+class ArchiveError(Exception):
+    """The archive cannot be written, read or loaded"""
+
+
+@dataclass(frozen=True)
+class Column:
+    name: str
+    type: str
+
+
+# Tables in dependency order. Strings share one dictionary and are stored
+# as int32 codes into it; dates as int32 days since 1970.
+TABLES: Dict[str, Tuple[Any, Tuple[Column, ...]]] = {
+    "groups": (Group, (Column("id", "int32"), Column("name", "string"))),
+    "players": (Player, (
+        Column("id", "int32"), Column("first_name", "string"), Column("last_name", "string"),
+    )),
+    "tournaments": (Tournament, (
+        Column("id", "int32"), Column("name", "string"), Column("start_date", "date"),
+        Column("end_date", "date"), Column("status", "string"),
+    )),
+    "tournament_groups": (TournamentGroup, (
+        Column("id", "int32"), Column("tournament_id", "int32"), Column("group_id", "int32"),
+    )),
+    "teams": (Team, (
+        Column("id", "int32"), Column("player1_id", "int32"), Column("player2_id", "int32"),
+        Column("tournament_group_id", "int32"), Column("tournament_id", "int32"),
+        Column("rank", "int16"), Column("is_withdrawn", "int8"),
+    )),
+    "matches": (Match, (
+        Column("id", "int32"), Column("tournament_id", "int32"),
+        Column("team1_id", "int32"), Column("team2_id", "int32"),
+        Column("set1_team1", "int8"), Column("set1_team2", "int8"),
+        Column("set2_team1", "int8"), Column("set2_team2", "int8"),
+        Column("set3_team1", "int8"), Column("set3_team2", "int8"),
+        Column("date_played", "date"), Column("retired_team", "string"),
+    )),
+}
+
+
+def _padding(size: int) -> bytes:
+    return b"\0" * (-size % ALIGNMENT)
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class StringDictionary:
+    """Each distinct string once, numbered in order of first use"""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return NULL
+        return self.codes.setdefault(value, len(self.codes))
+
+    def blocks(self) -> Tuple[array, bytes]:
+        """uint32 offsets, one past the end included, and the UTF-8 data"""
+        offsets = array("I", [0])
+        data = bytearray()
+        for value in self.codes:
+            data += value.encode()
+            offsets.append(len(data))
+        return offsets, bytes(data)
+
+
+def _encode(value: Any, type: str, strings: StringDictionary) -> int:
+    if type == "string":
+        return strings.encode(value)
+    if value is None:
+        return NULL
+    if type == "date":
+        return value.toordinal() - EPOCH
+    return int(value)
+
+
+def export_archive(path: str) -> Dict[str, int]:
+    """Write every tournament table to a columnar archive; returns row counts
+
+    Columns are collected as typed arrays, a few bytes a row, then written
+    after a JSON header giving each block's type, offset and size.
+    """
+    strings = StringDictionary()
+    tables = {}
+    # One transaction, so every table is read from the same snapshot.
+    # Archived tournaments' groups, teams and matches are read from their
+    # season files, which never change.
+    with transaction.atomic():
+        for table, (model, columns) in TABLES.items():
+            arrays = [array(TYPECODES[column.type]) for column in columns]
+            for queryset in [model.objects.all(), *archived_querysets(model.objects.all())]:
+                rows = (
+                    queryset.order_by("pk")
+                    .values_list(*(column.name for column in columns))
+                    .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+                )
+                for row in rows:
+                    for values, column, value in zip(arrays, columns, row):
+                        values.append(_encode(value, column.type, strings))
+            tables[table] = (columns, arrays)
+
+    blocks: List[bytes] = []
+    offset = 0
+
+    def add(block: bytes) -> Dict[str, int]:
+        nonlocal offset
+        entry = {"offset": offset, "size": len(block)}
+        blocks.append(block + _padding(len(block)))
+        offset += len(blocks[-1])
+        return entry
+
+    header = {
+        "version": VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "tables": {},
+    }
+    for table, (columns, arrays) in tables.items():
+        header["tables"][table] = {
+            "rows": len(arrays[0]),
+            "columns": {
+                column.name: {"type": column.type, **add(_little_endian(values))}
+                for column, values in zip(columns, arrays)
+            },
+        }
+    offsets, data = strings.blocks()
+    header["strings"] = {"count": len(strings.codes), "offsets": add(_little_endian(offsets)), "data": add(data)}
+
+    encoded = json.dumps(header, separators=(",", ":")).encode()
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(len(encoded).to_bytes(8, "little"))
+        f.write(encoded + _padding(len(encoded)))
+        for block in blocks:
+            f.write(block)
+    return {table: entry["rows"] for table, entry in header["tables"].items()}
+
+
+class Archive:
+    """Read-only, memory-mapped view of an archive
+
+    Columns come back as memoryviews straight onto the mapped file, so
+    opening years of history reads only the pages actually touched.
+    Views are released when the archive is closed.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError as e:
+            self._file.close()
+            raise ArchiveError(f"{path} is empty") from e
+        self._views: List[memoryview] = []
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ArchiveError(f"{path} is not a tournament archive")
+        length = int.from_bytes(self._map[8:16], "little")
+        self.header = json.loads(self._map[16:16 + length])
+        if self.header.get("version") != VERSION:
+            self.close()
+            raise ArchiveError(f"Unsupported archive version {self.header.get('version')}")
+        self._data_start = 16 + length + len(_padding(length))
+        self._strings: Optional[List[Optional[str]]] = None
+
+    def __enter__(self) -> "Archive":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+        self._map.close()
+        self._file.close()
+
+    def rows(self, table: str) -> int:
+        return self.header["tables"][table]["rows"]
+
+    def _block(self, entry: Dict[str, int], typecode: Optional[str] = None) -> Sequence:
+        start = self._data_start + entry["offset"]
+        view = memoryview(self._map)[start:start + entry["size"]]
+        self._views.append(view)
+        if typecode is None:
+            return view
+        if sys.byteorder == "big":
+            values = array(typecode, view.tobytes())
+            values.byteswap()
+            return values
+        view = view.cast(typecode)
+        self._views.append(view)
+        return view
+
+    def column(self, table: str, name: str) -> Sequence[int]:
+        """The raw integers of a column: codes, day numbers or values, NULL for none"""
+        try:
+            entry = self.header["tables"][table]["columns"][name]
+        except KeyError:
+            raise ArchiveError(f"No column {table}.{name} in the archive")
+        return self._block(entry, TYPECODES[entry["type"]])
+
+    def string(self, code: int) -> Optional[str]:
+        if self._strings is None:
+            entry = self.header["strings"]
+            offsets = self._block(entry["offsets"], "I")
+            data = self._block(entry["data"])
+            self._strings = [
+                bytes(data[offsets[index]:offsets[index + 1]]).decode()
+                for index in range(entry["count"])
+            ]
+        return None if code == NULL else self._strings[code]
+
+    def _decode(self, value: int, type: str) -> Any:
+        if type == "string":
+            return self.string(value)
+        if value == NULL:
+            return None
+        if type == "date":
+            return date.fromordinal(value + EPOCH)
+        return value
+
+    def records(self, table: str) -> Iterator[Dict[str, Any]]:
+        """Decoded rows of a table, one dict at a time"""
+        columns = self.header["tables"][table]["columns"]
+        values = {name: self.column(table, name) for name in columns}
+        for index in range(self.rows(table)):
+            yield {
+                name: self._decode(values[name][index], entry["type"])
+                for name, entry in columns.items()
+            }
+
+
+def _batches(items: Iterator, size: int) -> Iterator[list]:
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+def load_archive(path: str, replace: bool = False) -> Dict[str, int]:
+    """Rebuild the tournament tables from an archive, keeping its ids
+
+    The tables must be empty unless replace is set, in which case their
+    rows are deleted first. Returns row counts by table.
+    """
+    counts = {}
+    with Archive(path) as archive, immediate_atomic():
+        models = [model for model, _ in TABLES.values()]
+        if any(model.objects.exists() for model in models):
+            if not replace:
+                raise ArchiveError("The tournament tables are not empty; pass replace to overwrite them")
+            for model in reversed(models):
+                model.objects.all().delete()
+
+        first_names = dict(zip(
+            archive.column("players", "id"),
+            (archive.string(code) for code in archive.column("players", "first_name")),
+        ))
+        for table, (model, _) in TABLES.items():
+            for batch in _batches(archive.records(table), IMPORT_BATCH_SIZE):
+                objects = [model(**record) for record in batch]
+                if model is Team:
+                    for team in objects:
+                        team.short_label, team.full_label = Team.labels_for(
+                            first_names[team.player1_id], first_names[team.player2_id]
+                        )
+                model.objects.bulk_create(objects)
+            counts[table] = archive.rows(table)
+    return counts
@@ -0,0 +1,39 @@
+# tournament/backends/sqlite3/base.py
+from django.db.backends.sqlite3 import base
+from tournament.sqlite import apply_pragmas, read_generation
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Django's SQLite backend with production pragmas
+
+    Set OPTIONS["pragmas"] to a mapping of PRAGMA names to values; they are
+    run on every new connection, after Django's own setup.
+
+    Each connection also remembers the database file's generation (see
+    tournament.sqlite.swap_database). When a restore swaps in a new file,
+    persistent connections are closed at the next request boundary and
+    the following query opens the new file.
+    """
+
+    generation = ""
+
+    def get_connection_params(self):
+        kwargs = super().get_connection_params()
+        self.pragmas = kwargs.pop("pragmas", {})
+        return kwargs
+
+    def get_new_connection(self, conn_params):
+        self.generation = read_generation(self.settings_dict["NAME"])
+        connection = super().get_new_connection(conn_params)
+        apply_pragmas(connection, self.pragmas)
+        return connection
+
+    def close_if_unusable_or_obsolete(self):
+        if (
+            self.connection is not None
+            and not self.in_atomic_block
+            and read_generation(self.settings_dict["NAME"]) != self.generation
+        ):
+            self.close()
+            return
+        super().close_if_unusable_or_obsolete()
@@ -0,0 +1,535 @@
+# tournament/backups.py
+import gzip
+import hashlib
+import io
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import BinaryIO, Iterator, List, Optional, Set, Tuple
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.exceptions import ClientError
+from .sqlite import copy_database, swap_database
+
+BACKUP_PREFIX = "backup_"
+MANIFEST_PREFIX = "manifests/"
+CHUNK_PREFIX = "chunks/"
+# Rewritten after every successful backup, so a restore needs no listing
+LATEST_KEY = "latest.json"
+CHECKSUM_SUFFIX = ".sha256"
+
+# Incremental backups split the file into chunks of this size. It is a
+# multiple of every SQLite page size, so a page never straddles two chunks
+# and a write only changes the chunks holding the pages it touched.
+CHUNK_SIZE = 1024 * 1024
+
+# Pages copied per backup step, and the pause between steps in which
+# writers can take the database back. 1024 pages is 4 MiB at SQLite's
+# default page size.
+BACKUP_PAGES_PER_STEP = 1024
+BACKUP_STEP_SLEEP = 0.005
+
+# Parts of a multipart upload; boto3 reads one part at a time from the
+# compressed stream, so memory use stays at a few parts
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=8 * 1024 * 1024,
+    max_concurrency=4,
+)
+
+# Restores fetch this many byte ranges or chunks at a time
+DOWNLOAD_PART_SIZE = 8 * 1024 * 1024
+DOWNLOAD_WORKERS = 4
+
+
+class BackupError(Exception):
+    """A backup could not be taken or failed its integrity check"""
+
+
+@dataclass
+class StoredObject:
+    key: str
+    size: int
+    modified: datetime
+
+
+@dataclass
+class BackupResult:
+    key: str
+    database_bytes: int
+    compressed_bytes: int
+    sha256: str
+    seconds: float
+
+
+@dataclass
+class Manifest:
+    """The chunks that reassemble one incremental backup, in order"""
+
+    created: str
+    size: int
+    sha256: str
+    chunk_size: int
+    chunks: List[str] = field(default_factory=list)
+
+    def to_json(self) -> bytes:
+        return json.dumps(asdict(self), indent=1).encode()
+
+    @classmethod
+    def from_json(cls, data: bytes) -> "Manifest":
+        return cls(**json.loads(data))
+
+
+@dataclass
+class IncrementalBackupResult:
+    key: str
+    database_bytes: int
+    chunks: int
+    uploaded_chunks: int
+    uploaded_bytes: int
+    sha256: str
+    seconds: float
+
+
+class GzipStream(io.RawIOBase):
+    """A readable gzip of another file, compressed as it is read
+
+    Lets an upload stream the compressed backup without writing it to
+    disk first. The sha256 and size of the compressed bytes are
+    available once the stream has been read to the end.
+    """
+
+    def __init__(self, source: BinaryIO, chunk_size: int = 1024 * 1024, level: int = 6):
+        self.source = source
+        self.chunk_size = chunk_size
+        # wbits 31 writes a gzip header and trailer
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        self.buffer = bytearray()
+        self.finished = False
+        self.digest = hashlib.sha256()
+        self.bytes_read = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        while len(self.buffer) < len(target) and not self.finished:
+            chunk = self.source.read(self.chunk_size)
+            if chunk:
+                self.buffer += self.compressor.compress(chunk)
+            else:
+                self.buffer += self.compressor.flush()
+                self.finished = True
+
+        size = min(len(target), len(self.buffer))
+        target[:size] = self.buffer[:size]
+        self.digest.update(self.buffer[:size])
+        del self.buffer[:size]
+        self.bytes_read += size
+        return size
+
+
+class LocalStore:
+    """Backups kept in a local directory
+
+    Behaves like S3Store, so it works for development and as a stand-in
+    for S3 in tests.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def upload(self, key: str, fileobj: BinaryIO):
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        partial = f"{path}.partial"
+        with open(partial, "wb") as f:
+            shutil.copyfileobj(fileobj, f)
+        os.replace(partial, path)
+
+    def download(self, key: str, fileobj: BinaryIO):
+        with open(self.path(key), "rb") as f:
+            shutil.copyfileobj(f, fileobj)
+
+    def exists(self, key: str) -> bool:
+        return os.path.isfile(self.path(key))
+
+    def size(self, key: str) -> int:
+        return os.path.getsize(self.path(key))
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        with open(self.path(key), "rb") as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    def list(self, prefix: str = "") -> Iterator[StoredObject]:
+        for directory, _, filenames in os.walk(self.root):
+            for filename in sorted(filenames):
+                path = os.path.join(directory, filename)
+                key = os.path.relpath(path, self.root).replace(os.sep, "/")
+                if key.startswith(prefix) and not key.endswith(".partial"):
+                    stat = os.stat(path)
+                    yield StoredObject(
+                        key, stat.st_size,
+                        datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc),
+                    )
+
+    def delete(self, keys: List[str]):
+        for key in keys:
+            os.remove(self.path(key))
+
+
+class S3Store:
+    """Backups in an S3 bucket, moved with boto3's managed transfers"""
+
+    def __init__(self, client, bucket: str):
+        self.client = client
+        self.bucket = bucket
+
+    def upload(self, key: str, fileobj: BinaryIO):
+        self.client.upload_fileobj(fileobj, self.bucket, key, Config=TRANSFER_CONFIG)
+
+    def download(self, key: str, fileobj: BinaryIO):
+        self.client.download_fileobj(self.bucket, key, fileobj, Config=TRANSFER_CONFIG)
+
+    def exists(self, key: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey"):
+                return False
+            raise
+        return True
+
+    def size(self, key: str) -> int:
+        return self.client.head_object(Bucket=self.bucket, Key=key)["ContentLength"]
+
+    def read_range(self, key: str, start: int, end: int) -> bytes:
+        response = self.client.get_object(
+            Bucket=self.bucket, Key=key, Range=f"bytes={start}-{end - 1}"
+        )
+        return response["Body"].read()
+
+    def list(self, prefix: str = "") -> Iterator[StoredObject]:
+        paginator = self.client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for item in page.get("Contents", []):
+                yield StoredObject(item["Key"], item["Size"], item["LastModified"])
+
+    def delete(self, keys: List[str]):
+        # DeleteObjects takes at most 1000 keys per request
+        for start in range(0, len(keys), 1000):
+            self.client.delete_objects(
+                Bucket=self.bucket,
+                Delete={"Objects": [{"Key": key} for key in keys[start:start + 1000]]},
+            )
+
+
+def store_from_env(env):
+    """The backup store the environment points at
+
+    BACKUP_DIR selects a local directory; otherwise backups go to the
+    AWS_BACKUP_BUCKET_NAME bucket. AWS_S3_ENDPOINT_URL points the client
+    at any S3 compatible service, such as a local MinIO.
+    """
+    local_dir = env("BACKUP_DIR", default=None)
+    if local_dir:
+        return LocalStore(local_dir)
+    client = boto3.client(
+        "s3",
+        aws_access_key_id=env("AWS_ACCESS_KEY_ID"),
+        aws_secret_access_key=env("AWS_SECRET_ACCESS_KEY"),
+        endpoint_url=env("AWS_S3_ENDPOINT_URL", default=None),
+    )
+    return S3Store(client, env("AWS_BACKUP_BUCKET_NAME"))
+
+
+def check_integrity(path: str):
+    """Raise BackupError unless PRAGMA integrity_check reports ok"""
+    try:
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = [row[0] for row in connection.execute("PRAGMA integrity_check")]
+        finally:
+            connection.close()
+    except sqlite3.DatabaseError as e:
+        raise BackupError(f"{path} is not a readable database: {e}") from e
+    if rows != ["ok"]:
+        raise BackupError(f"Integrity check failed: {'; '.join(rows[:5])}")
+
+
+def snapshot_database(
+    db_path: str,
+    dest_path: str,
+    pages: int = BACKUP_PAGES_PER_STEP,
+    sleep: float = BACKUP_STEP_SLEEP,
+):
+    """Take a consistent copy of a live database and check it"""
+    copy_database(db_path, dest_path, pages=pages, sleep=sleep)
+    check_integrity(dest_path)
+
+
+def backup_key(now: Optional[datetime] = None) -> str:
+    return f"{BACKUP_PREFIX}{(now or datetime.now()).strftime('%Y%m%d_%H%M%S')}.sqlite3.gz"
+
+
+def backup_database(
+    db_path: str,
+    store,
+    key: Optional[str] = None,
+    pages: int = BACKUP_PAGES_PER_STEP,
+    sleep: float = BACKUP_STEP_SLEEP,
+) -> BackupResult:
+    """Snapshot, check and upload a gzipped copy of the database
+
+    The snapshot is written to the system temporary directory and the
+    compressed copy only ever exists as the upload stream.
+    """
+    start = time.perf_counter()
+    key = key or backup_key()
+    with tempfile.TemporaryDirectory(prefix="backup_") as tmp:
+        snapshot = os.path.join(tmp, "snapshot.sqlite3")
+        snapshot_database(db_path, snapshot, pages=pages, sleep=sleep)
+        with open(snapshot, "rb") as f:
+            stream = GzipStream(f)
+            store.upload(key, stream)
+        sha256 = stream.digest.hexdigest()
+        store.upload(f"{key}{CHECKSUM_SUFFIX}", io.BytesIO(sha256.encode()))
+        write_latest(store, key)
+        return BackupResult(
+            key=key,
+            database_bytes=os.path.getsize(snapshot),
+            compressed_bytes=stream.bytes_read,
+            sha256=sha256,
+            seconds=time.perf_counter() - start,
+        )
+
+
+def manifest_key(now: Optional[datetime] = None) -> str:
+    return f"{MANIFEST_PREFIX}{(now or datetime.now()).strftime('%Y%m%d_%H%M%S')}.json"
+
+
+def chunk_key(digest: str) -> str:
+    return f"{CHUNK_PREFIX}{digest}"
+
+
+def read_bytes(store, key: str) -> bytes:
+    buffer = io.BytesIO()
+    store.download(key, buffer)
+    return buffer.getvalue()
+
+
+def incremental_backup(
+    db_path: str,
+    store,
+    key: Optional[str] = None,
+    pages: int = BACKUP_PAGES_PER_STEP,
+    sleep: float = BACKUP_STEP_SLEEP,
+    chunk_size: int = CHUNK_SIZE,
+) -> IncrementalBackupResult:
+    """Snapshot and check the database, then upload only the chunks the store lacks
+
+    Chunks are stored gzipped under the sha256 of their content, so a
+    chunk shared by many backups is uploaded once. The manifest is
+    written last; a backup that fails halfway leaves at most some
+    unreferenced chunks for collect_garbage.
+    """
+    start = time.perf_counter()
+    key = key or manifest_key()
+    existing = {stored.key for stored in store.list(CHUNK_PREFIX)}
+    uploaded_chunks = uploaded_bytes = 0
+
+    with tempfile.TemporaryDirectory(prefix="backup_") as tmp:
+        snapshot = os.path.join(tmp, "snapshot.sqlite3")
+        snapshot_database(db_path, snapshot, pages=pages, sleep=sleep)
+
+        digest = hashlib.sha256()
+        chunks = []
+        with open(snapshot, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+                chunk_digest = hashlib.sha256(chunk).hexdigest()
+                chunks.append(chunk_digest)
+                if chunk_key(chunk_digest) in existing:
+                    continue
+                compressed = gzip.compress(chunk)
+                store.upload(chunk_key(chunk_digest), io.BytesIO(compressed))
+                existing.add(chunk_key(chunk_digest))
+                uploaded_chunks += 1
+                uploaded_bytes += len(compressed)
+
+        manifest = Manifest(
+            created=datetime.now(timezone.utc).isoformat(),
+            size=os.path.getsize(snapshot),
+            sha256=digest.hexdigest(),
+            chunk_size=chunk_size,
+            chunks=chunks,
+        )
+    store.upload(key, io.BytesIO(manifest.to_json()))
+    write_latest(store, key)
+
+    return IncrementalBackupResult(
+        key=key,
+        database_bytes=manifest.size,
+        chunks=len(chunks),
+        uploaded_chunks=uploaded_chunks,
+        uploaded_bytes=uploaded_bytes,
+        sha256=manifest.sha256,
+        seconds=time.perf_counter() - start,
+    )
+
+
+def collect_garbage(store, keep: int) -> Tuple[List[str], List[str]]:
+    """Keep the newest `keep` manifests and delete chunks none of them use
+
+    Must not run while a backup is uploading, since that backup's new
+    chunks are not referenced until its manifest is written.
+    """
+    manifests = sorted((stored.key for stored in store.list(MANIFEST_PREFIX)), reverse=True)
+    expired = manifests[keep:]
+    referenced: Set[str] = set()
+    for key in manifests[:keep]:
+        referenced.update(
+            chunk_key(digest) for digest in Manifest.from_json(read_bytes(store, key)).chunks
+        )
+    unreferenced = [
+        stored.key for stored in store.list(CHUNK_PREFIX) if stored.key not in referenced
+    ]
+    # Manifests go first so an interrupted run never leaves one pointing
+    # at deleted chunks
+    store.delete(expired)
+    store.delete(unreferenced)
+    return expired, unreferenced
+
+
+def write_latest(store, key: str):
+    store.upload(LATEST_KEY, io.BytesIO(json.dumps({"key": key}).encode()))
+
+
+def list_backups(store) -> List[StoredObject]:
+    """Every full and incremental backup, oldest first"""
+    backups = [
+        stored for stored in [*store.list(BACKUP_PREFIX), *store.list(MANIFEST_PREFIX)]
+        if not stored.key.endswith(CHECKSUM_SUFFIX)
+    ]
+    return sorted(backups, key=lambda stored: (stored.modified, stored.key))
+
+
+def latest_backup(store) -> Optional[str]:
+    """The key of the newest backup, from the latest pointer if there is one"""
+    if store.exists(LATEST_KEY):
+        return json.loads(read_bytes(store, LATEST_KEY))["key"]
+    backups = list_backups(store)
+    return backups[-1].key if backups else None
+
+
+def download_ranges(
+    store, key: str, dest_path: str,
+    part_size: int = DOWNLOAD_PART_SIZE, workers: int = DOWNLOAD_WORKERS,
+):
+    """Download an object as byte ranges fetched in parallel
+
+    Each part is written at its offset as it arrives, so memory use stays
+    at one part per worker.
+    """
+    size = store.size(key)
+    with open(dest_path, "wb") as f:
+        f.truncate(size)
+    fd = os.open(dest_path, os.O_WRONLY)
+    try:
+        def fetch(start):
+            os.pwrite(fd, store.read_range(key, start, min(start + part_size, size)), start)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(fetch, range(0, size, part_size)))
+    finally:
+        os.close(fd)
+
+
+def unpack_download(download_path: str, dest_path: str, compressed: bool) -> str:
+    """Copy a downloaded backup to dest_path, gunzipping it as it streams
+
+    Returns the sha256 of the downloaded bytes.
+    """
+    digest = hashlib.sha256()
+    decompressor = zlib.decompressobj(31) if compressed else None
+    with open(download_path, "rb") as source, open(dest_path, "wb") as dest:
+        for block in iter(lambda: source.read(DOWNLOAD_PART_SIZE), b""):
+            digest.update(block)
+            dest.write(decompressor.decompress(block) if decompressor else block)
+        if decompressor:
+            dest.write(decompressor.flush())
+            if not decompressor.eof:
+                raise BackupError("The backup ends before the end of its gzip stream")
+    return digest.hexdigest()
+
+
+def assemble_manifest(store, key: str, dest_path: str, workers: int = DOWNLOAD_WORKERS):
+    """Rebuild the database file a manifest describes, checking every chunk
+
+    Chunks are downloaded in parallel and written at their offsets.
+    """
+    manifest = Manifest.from_json(read_bytes(store, key))
+    with open(dest_path, "wb") as f:
+        f.truncate(manifest.size)
+    fd = os.open(dest_path, os.O_WRONLY)
+    try:
+        def fetch(item):
+            index, chunk_digest = item
+            chunk = gzip.decompress(read_bytes(store, chunk_key(chunk_digest)))
+            if hashlib.sha256(chunk).hexdigest() != chunk_digest:
+                raise BackupError(f"Chunk {chunk_digest} does not match its checksum")
+            os.pwrite(fd, chunk, index * manifest.chunk_size)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(fetch, enumerate(manifest.chunks)))
+    finally:
+        os.close(fd)
+
+    digest = hashlib.sha256()
+    with open(dest_path, "rb") as f:
+        for block in iter(lambda: f.read(DOWNLOAD_PART_SIZE), b""):
+            digest.update(block)
+    if digest.hexdigest() != manifest.sha256:
+        raise BackupError(f"{key} reassembled to a file that does not match its checksum")
+
+
+def restore_backup(
+    store, key: str, db_path: str, workers: int = DOWNLOAD_WORKERS, during_swap=nullcontext,
+) -> str:
+    """Download, verify and check a backup, then swap it in for db_path
+
+    Everything is staged next to db_path so the final step is a rename;
+    until then the live database is untouched. The swap itself runs
+    inside the during_swap() context, such as maintenance_mode. Returns
+    the new generation token.
+    """
+    directory = os.path.dirname(os.path.abspath(db_path))
+    with tempfile.TemporaryDirectory(prefix=".restore_", dir=directory) as tmp:
+        snapshot = os.path.join(tmp, "snapshot.sqlite3")
+        if key.startswith(MANIFEST_PREFIX):
+            assemble_manifest(store, key, snapshot, workers=workers)
+        else:
+            download = os.path.join(tmp, "download")
+            download_ranges(store, key, download, workers=workers)
+            sha256 = unpack_download(download, snapshot, compressed=key.endswith(".gz"))
+            os.remove(download)
+            checksum_key = f"{key}{CHECKSUM_SUFFIX}"
+            if store.exists(checksum_key) and read_bytes(store, checksum_key).decode() != sha256:
+                raise BackupError(f"{key} does not match its checksum")
+
+        check_integrity(snapshot)
+        with during_swap():
+            return swap_database(snapshot, db_path)
@@ -0,0 +1,164 @@
+# tournament/benchmarks.py
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext, override_settings
+from .models import Tournament, TournamentGroup, Team
+from .services import StandingsCalculator, TournamentGridBuilder
+from .synthetic import SyntheticConfig, SyntheticDataGenerator
+from .views import TournamentDetailView
+
+
+@contextmanager
+def throwaway_database():
+    """Run the block against a freshly migrated test database
+
+    Uses the same machinery as the test runner, so the real database is
+    never touched and the data disappears afterwards.
+    """
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        # Keep benchmark runs out of the production metrics
+        with override_settings(METRICS_ENABLED=False):
+            yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    """Time func repeatedly and count the queries of one run"""
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "queries": len(queries.captured_queries),
+        "min_ms": min(timings),
+        "median_ms": statistics.median(timings),
+        "max_ms": max(timings),
+    }
+
+
+def benchmark_tournament(tournament: Tournament, repeat: int) -> Dict[str, Any]:
+    """Time each service against one tournament"""
+    builder = TournamentGridBuilder()
+    calculator = StandingsCalculator()
+    tournament_groups = list(TournamentGroup.objects.filter(tournament=tournament))
+
+    return {
+        "build_grid_data": measure(lambda: builder.build_grid_data(tournament), repeat),
+        "calculate_standings": measure(
+            lambda: [calculator.calculate_standings(tg) for tg in tournament_groups],
+            repeat,
+        ),
+        "_get_annotated_matches": measure(
+            lambda: [builder._get_annotated_matches(tg, tournament) for tg in tournament_groups],
+            repeat,
+        ),
+    }
+
+
+def run_service_benchmarks(
+    team_counts: List[int], groups: int, completion: float, repeat: int, seed: int
+) -> Dict[str, Any]:
+    """Generate one tournament per size and benchmark the services on each"""
+    runs = []
+    for teams_per_group in team_counts:
+        config = SyntheticConfig(
+            min_groups=groups,
+            max_groups=groups,
+            teams_per_group=teams_per_group,
+            completion=completion,
+            seed=seed,
+        )
+        tournament = SyntheticDataGenerator(config).generate(
+            f"Benchmark {teams_per_group} teams"
+        )[0]
+        runs.append({
+            "groups": groups,
+            "teams_per_group": teams_per_group,
+            "matches": tournament.matches.count(),
+            "services": benchmark_tournament(tournament, repeat),
+        })
+
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "repeat": repeat,
+        "runs": runs,
+    }
+
+
+def _module_name(filename: str) -> str:
+    """Dotted module for a source file, or the file itself outside sys.path"""
+    roots = sorted((os.path.abspath(p) for p in sys.path if p), key=len, reverse=True)
+    path = os.path.abspath(filename)
+    for root in roots:
+        if path.startswith(root + os.sep):
+            relative = os.path.splitext(os.path.relpath(path, root))[0]
+            return relative.replace(os.sep, ".").removesuffix(".__init__")
+    return filename
+
+
+def profile_memory(tournament: Tournament, top: int = 15) -> Dict[str, Any]:
+    """Peak traced memory of building and rendering a tournament page
+
+    The page is rendered once beforehand so template compilation and first
+    imports are not counted. Peaks are measured from the memory in use just
+    before each stage; allocation sites are what is still held once the
+    page has been rendered, grouped by the module that allocated it.
+    """
+    request = RequestFactory().get(f"/tournament/{tournament.id}/")
+    view = TournamentDetailView.as_view()
+    view(request, tournament_id=tournament.id).render()
+
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        response = view(request, tournament_id=tournament.id)
+        built, build_peak = tracemalloc.get_traced_memory()
+
+        tracemalloc.reset_peak()
+        response.render()
+        _, render_peak = tracemalloc.get_traced_memory()
+
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen *>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ])
+    finally:
+        tracemalloc.stop()
+
+    by_module: Dict[str, Dict[str, int]] = {}
+    for stat in snapshot.statistics("filename"):
+        module = _module_name(stat.traceback[0].filename)
+        totals = by_module.setdefault(module, {"bytes": 0, "blocks": 0})
+        totals["bytes"] += stat.size
+        totals["blocks"] += stat.count
+    sites = sorted(by_module.items(), key=lambda item: item[1]["bytes"], reverse=True)
+
+    return {
+        "tournament": tournament.name,
+        "teams": Team.objects.filter(tournament=tournament).count(),
+        "matches": tournament.matches.count(),
+        "build_peak_bytes": build_peak - start,
+        "render_peak_bytes": render_peak - start,
+        "peak_bytes": max(build_peak, render_peak) - start,
+        "retained_after_build_bytes": built - start,
+        "top_modules": [{"module": module, **totals} for module, totals in sites[:top]],
+    }
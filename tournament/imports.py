@@ -0,0 +1,216 @@
+# tournament/imports.py
+import csv
+import json
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, IO, Iterable, List, Optional
+from django.core.exceptions import ValidationError
+from .models import Tournament, Team, Match, ValidationContext
+from .writes import run_write
+
+
+SCORE_FIELDS = [
+    "set1_team1", "set1_team2",
+    "set2_team1", "set2_team2",
+    "set3_team1", "set3_team2",
+]
+OPTIONAL_SCORE_FIELDS = {"set3_team1", "set3_team2"}
+RETIREMENT_VALUES = {"team1", "team2"}
+
+
+@dataclass
+class ImportRowError:
+    """A row that could not be imported and why"""
+
+    row: int
+    message: str
+
+    def __str__(self):
+        return f"Row {self.row}: {self.message}"
+
+
+@dataclass
+class ImportResult:
+    """Outcome of a match result import"""
+
+    created: List[Match] = field(default_factory=list)
+    errors: List[ImportRowError] = field(default_factory=list)
+
+
+def read_rows(stream: IO, format: str) -> List[Dict[str, Any]]:
+    """Read raw result rows from a text stream of CSV or JSON"""
+    if format == "json":
+        rows = json.load(stream)
+        if not isinstance(rows, list):
+            raise ValueError("JSON results must be a list of objects")
+        return rows
+
+    return list(csv.DictReader(stream))
+
+
+def _normalise(name: str) -> str:
+    return " ".join(name.split()).casefold()
+
+
+class MatchResultImporter:
+    """Validate and bulk insert a batch of match results for one tournament
+
+    Teams are given by their players' names, either in full
+    ("Alice Smith/Beth Jones") or by first names as shown on the grid
+    ("Alice/Beth"). Everything a row is checked against is loaded up front
+    and handed to Match.clean as a ValidationContext, so validation does not
+    query the database per row.
+    """
+
+    def __init__(self, tournament: Tournament):
+        self.tournament = tournament
+        teams = list(
+            Team.objects.filter(
+                tournament=tournament
+            ).select_related("player1", "player2", "tournament_group")
+        )
+        self.context = ValidationContext.from_objects(
+            tournaments=[tournament],
+            tournament_groups={team.tournament_group for team in teams},
+            teams=teams,
+        )
+        self.teams_by_name = self._build_team_lookup(teams)
+        self.existing_pairs = self._load_existing_pairs()
+
+    def _build_team_lookup(self, teams: List[Team]) -> Dict[frozenset, Optional[Team]]:
+        """Map each way of naming a team to the team, or None when ambiguous"""
+        lookup = {}
+        for team in teams:
+            players = (team.player1, team.player2)
+            full_names = frozenset(
+                _normalise(f"{p.first_name} {p.last_name}") for p in players
+            )
+            first_names = frozenset(_normalise(p.first_name) for p in players)
+            for key in (full_names, first_names):
+                lookup[key] = None if key in lookup else team
+        return lookup
+
+    def _load_existing_pairs(self) -> set:
+        pairs = Match.objects.filter(tournament=self.tournament).values_list(
+            "team1_id", "team2_id"
+        )
+        return {frozenset(pair) for pair in pairs}
+
+    def import_rows(
+        self, rows: Iterable[Dict[str, Any]], dry_run: bool = False
+    ) -> ImportResult:
+        """Validate every row and insert the valid ones in one transaction"""
+        result = ImportResult()
+        matches = []
+        seen_pairs = set(self.existing_pairs)
+
+        for row_number, row in enumerate(rows, start=1):
+            if not isinstance(row, dict):
+                result.errors.append(
+                    ImportRowError(row_number, f"Expected an object, got {type(row).__name__}")
+                )
+                continue
+            try:
+                match = self.build_match(row)
+            except ValidationError as e:
+                result.errors.append(ImportRowError(row_number, " ".join(e.messages)))
+                continue
+
+            pair = frozenset((match.team1.id, match.team2.id))
+            if pair in seen_pairs:
+                result.errors.append(
+                    ImportRowError(
+                        row_number,
+                        f"A result between {match.team1} and {match.team2} already exists",
+                    )
+                )
+                continue
+
+            seen_pairs.add(pair)
+            matches.append(match)
+
+        if matches and not dry_run:
+            result.created = run_write(
+                lambda: Match.objects.bulk_create(matches), name="import_results"
+            )
+        else:
+            result.created = matches
+
+        return result
+
+    def build_match(self, row: Dict[str, Any]) -> Match:
+        """Turn a raw row into a validated, unsaved Match"""
+        team1 = self._resolve_team(row.get("team1"))
+        team2 = self._resolve_team(row.get("team2"))
+        scores = {name: self._parse_score(row, name) for name in SCORE_FIELDS}
+
+        retired_team = (row.get("retired_team") or "").strip() or None
+        if retired_team is not None and retired_team not in RETIREMENT_VALUES:
+            raise ValidationError(f"Unknown retired_team {retired_team!r}")
+
+        match = Match(
+            tournament=self.tournament,
+            team1=team1,
+            team2=team2,
+            date_played=self._parse_date(row.get("date_played")),
+            retired_team=retired_team,
+            **scores,
+        )
+        if team1.id == team2.id:
+            raise ValidationError("A team cannot play itself")
+        match.clean(context=self.context)
+        return match
+
+    def _resolve_team(self, value: Any) -> Team:
+        if not value or not str(value).strip():
+            raise ValidationError("Both teams are required")
+
+        names = str(value).split("/")
+        if len(names) != 2:
+            raise ValidationError(
+                f"Team {value!r} must be two player names separated by '/'"
+            )
+
+        key = frozenset(_normalise(name) for name in names)
+        if key not in self.teams_by_name:
+            raise ValidationError(f"No team {value!r} in {self.tournament}")
+
+        team = self.teams_by_name[key]
+        if team is None:
+            raise ValidationError(
+                f"Team {value!r} is ambiguous, use the players' full names"
+            )
+        return team
+
+    def _parse_score(self, row: Dict[str, Any], name: str) -> Optional[int]:
+        value = row.get(name)
+        if value is None or str(value).strip() == "":
+            if name in OPTIONAL_SCORE_FIELDS:
+                return None
+            raise ValidationError(f"{name} is required")
+
+        try:
+            score = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError(f"{name} must be a whole number, got {value!r}")
+
+        if score < 0:
+            raise ValidationError(f"{name} cannot be negative")
+        return score
+
+    def _parse_date(self, value: Any) -> Optional[date]:
+        if value is None or str(value).strip() == "":
+            return None
+        try:
+            return date.fromisoformat(str(value).strip())
+        except ValueError:
+            raise ValidationError(f"date_played must be YYYY-MM-DD, got {value!r}")
+
+
+def current_tournament() -> Optional[Tournament]:
+    """The tournament results are entered for when none is given"""
+    return (
+        Tournament.objects.filter(status="ONGOING", end_date__isnull=True)
+        .order_by("-start_date")
+        .first()
+    )
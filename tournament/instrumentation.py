@@ -0,0 +1,76 @@
+# tournament/instrumentation.py
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+
+_current_timings: ContextVar[Optional["RequestTimings"]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+class RequestTimings:
+    """Query, template and service stage timings collected for one request
+
+    An instance doubles as a database execute wrapper, so it sees every
+    query the request runs, including those evaluated lazily while the
+    template renders.
+    """
+
+    def __init__(self):
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.stages: Dict[str, float] = defaultdict(float)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - start
+            self.query_count += 1
+
+    def as_milliseconds(self) -> Dict[str, float]:
+        """Durations in milliseconds keyed by metric name"""
+        durations = {"db": self.sql_time * 1000, "template": self.template_time * 1000}
+        durations.update(
+            (name, seconds * 1000) for name, seconds in self.stages.items()
+        )
+        return durations
+
+
+def current_timings() -> Optional[RequestTimings]:
+    """Timings for the request being handled, if instrumentation is on"""
+    return _current_timings.get()
+
+
+@contextmanager
+def collect_timings():
+    """Collect timings for everything run inside the block"""
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def timed_stage(name: str):
+    """Add the time spent in the block to the current request's named stage
+
+    Costs a single context variable lookup when no request is being timed.
+    """
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.stages[name] += time.perf_counter() - start
@@ -0,0 +1,360 @@
+# tournament/loadtest.py
+import http.cookiejar
+import os
+import random
+import shutil
+import socket
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from django.conf import settings
+from .synthetic import SyntheticConfig
+
+ROUTES = ("grid", "detail", "history", "write")
+DEFAULT_MIX = "grid=70,detail=15,history=10,write=5"
+SERVERS = ("gunicorn", "uvicorn")
+
+USERNAME = "loadtest"
+PASSWORD = "loadtest-password"
+
+
+def parse_mix(value: str) -> Dict[str, int]:
+    """Parse "grid=70,history=10" into route weights"""
+    mix = {}
+    for part in value.split(","):
+        route, _, weight = part.strip().partition("=")
+        if route not in ROUTES:
+            raise ValueError(f"Unknown route {route!r}, expected one of {', '.join(ROUTES)}")
+        try:
+            mix[route] = int(weight)
+        except ValueError:
+            raise ValueError(f"Weight for {route} must be a whole number, got {weight!r}")
+        if mix[route] < 0:
+            raise ValueError(f"Weight for {route} cannot be negative")
+    if not sum(mix.values()):
+        raise ValueError("At least one route needs a positive weight")
+    return mix
+
+
+@dataclass
+class Target:
+    """The running server and the data the traffic is built from"""
+
+    base_url: str
+    tournament_ids: List[int]
+    matches: List[Dict[str, Any]]
+    username: str = USERNAME
+    password: str = PASSWORD
+
+
+@dataclass
+class Sample:
+    route: str
+    status: int
+    elapsed_ms: float
+
+
+@dataclass
+class LoadResult:
+    samples: List[Sample] = field(default_factory=list)
+    duration: float = 0.0
+
+
+def _manage(db_path: str, *args: str, env: Optional[Dict[str, str]] = None):
+    subprocess.run(
+        [sys.executable, os.path.join(settings.BASE_DIR, "manage.py"), *args],
+        env=server_environment(db_path, env),
+        check=True,
+        stdout=subprocess.DEVNULL,
+    )
+
+
+def server_environment(db_path: str, extra: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Environment for processes that run against the load-test database"""
+    env = {
+        **os.environ,
+        "SQLITE_DB_PATH": db_path,
+        "METRICS_DB_PATH": os.path.join(os.path.dirname(db_path), "metrics.sqlite3"),
+        "REQUEST_TIMING_LOG_LEVEL": "WARNING",
+        "DEBUG": "False",
+    }
+    env.setdefault("SECRET_KEY", "loadtest")
+    env.update(extra or {})
+    return env
+
+
+def prepare_database(db_path: str, config: SyntheticConfig):
+    """Migrate a fresh SQLite file, fill it with synthetic data and add an admin"""
+    _manage(db_path, "migrate", "--noinput")
+    _manage(
+        db_path, "generate_synthetic_data",
+        f"--tournaments={config.tournaments}",
+        f"--groups={config.min_groups}-{config.max_groups}",
+        f"--teams={config.teams_per_group}",
+        f"--completion={config.completion}",
+        f"--seed={config.seed if config.seed is not None else 1}",
+        "--prefix=Load test",
+    )
+    _manage(
+        db_path, "createsuperuser", "--noinput",
+        f"--username={USERNAME}", "--email=loadtest@example.com",
+        env={"DJANGO_SUPERUSER_PASSWORD": PASSWORD},
+    )
+
+
+def load_target_data(db_path: str) -> Dict[str, Any]:
+    """Tournament ids and editable matches of the seeded database"""
+    connection = sqlite3.connect(db_path)
+    try:
+        tournament_ids = [
+            row[0] for row in connection.execute("SELECT id FROM tournament_tournament")
+        ]
+        columns = ["id", "tournament_id", "team1_id", "team2_id", "date_played"]
+        rows = connection.execute(
+            f"SELECT m.{', m.'.join(columns)} FROM tournament_match m "
+            "JOIN tournament_tournament t ON t.id = m.tournament_id "
+            "WHERE t.status = 'ONGOING' AND m.retired_team IS NULL"
+        ).fetchall()
+    finally:
+        connection.close()
+    return {
+        "tournament_ids": tournament_ids,
+        "matches": [dict(zip(columns, row)) for row in rows],
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server_command(
+    server: str, port: int, workers: int, worker_class: str, threads: int
+) -> List[str]:
+    if server == "uvicorn":
+        if shutil.which("uvicorn") is None:
+            raise RuntimeError("uvicorn is not installed")
+        return [
+            "uvicorn", "tennis_doubles.asgi:application",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--no-access-log",
+        ]
+    return [
+        "gunicorn", "tennis_doubles.wsgi:application",
+        "--bind", f"127.0.0.1:{port}",
+        "--workers", str(workers),
+        "--worker-class", worker_class,
+        "--threads", str(threads),
+    ]
+
+
+@contextmanager
+def run_server(
+    db_path: str,
+    server: str = "gunicorn",
+    workers: int = 2,
+    worker_class: str = "sync",
+    threads: int = 1,
+    startup_timeout: float = 30,
+    env: Optional[Dict[str, str]] = None,
+) -> Iterator[str]:
+    """Start the app against db_path and yield its base URL
+
+    env adds to or overrides the server's environment, e.g. to try other
+    database settings.
+    """
+    port = free_port()
+    process = subprocess.Popen(
+        server_command(server, port, workers, worker_class, threads),
+        cwd=settings.BASE_DIR,
+        env=server_environment(db_path, env),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"{server} exited with status {process.returncode}")
+            try:
+                urllib.request.urlopen(f"{base_url}/tournaments/", timeout=1).close()
+                break
+            except (urllib.error.URLError, OSError):
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"{server} did not start within {startup_timeout}s")
+                time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+class LoadClient:
+    """One simulated user with its own cookies, logged in when it writes"""
+
+    def __init__(self, target: Target, rng: random.Random):
+        self.target = target
+        self.rng = rng
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(self.cookies), _NoRedirect
+        )
+        self.logged_in = False
+
+    def _open(self, path: str, data: Optional[Dict[str, Any]] = None) -> int:
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        request = urllib.request.Request(self.target.base_url + path, data=body)
+        if data is not None:
+            request.add_header("Referer", self.target.base_url + path)
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as e:
+            return e.code
+        except (urllib.error.URLError, OSError):
+            # Refused or timed out; counted as an error
+            return 0
+
+    def _csrf_token(self) -> str:
+        for cookie in self.cookies:
+            if cookie.name == "csrftoken":
+                return cookie.value
+        return ""
+
+    def login(self):
+        self._open("/admin/login/")
+        self._open("/admin/login/?next=/admin/", {
+            "csrfmiddlewaretoken": self._csrf_token(),
+            "username": self.target.username,
+            "password": self.target.password,
+            "next": "/admin/",
+        })
+        self.logged_in = True
+
+    def path_for(self, route: str) -> str:
+        if route == "grid":
+            return "/"
+        if route == "history":
+            return "/tournaments/"
+        return f"/tournament/{self.rng.choice(self.target.tournament_ids)}/"
+
+    def score_write(self) -> int:
+        """Post a new straight-sets score for a match, as the admin form does"""
+        match = self.rng.choice(self.target.matches)
+        games = [self.rng.randint(0, 4), self.rng.randint(0, 4)]
+        return self._open(f"/admin/tournament/match/{match['id']}/change/", {
+            "csrfmiddlewaretoken": self._csrf_token(),
+            "tournament": match["tournament_id"],
+            "team1": match["team1_id"],
+            "team2": match["team2_id"],
+            "set1_team1": 6, "set1_team2": games[0],
+            "set2_team1": 6, "set2_team2": games[1],
+            "set3_team1": "", "set3_team2": "",
+            "date_played": match["date_played"] or "",
+            "retired_team": "",
+            "_save": "Save",
+        })
+
+    def request(self, route: str) -> Sample:
+        if route == "write" and not self.logged_in:
+            self.login()
+        start = time.perf_counter()
+        status = self.score_write() if route == "write" else self._open(self.path_for(route))
+        return Sample(route, status, (time.perf_counter() - start) * 1000)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    # A successful admin save answers with a redirect; time the save only
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def run_load(
+    target: Target,
+    mix: Dict[str, int],
+    concurrency: int = 8,
+    duration: float = 30,
+    seed: Optional[int] = None,
+) -> LoadResult:
+    """Drive concurrent users through the route mix for duration seconds"""
+    if not target.matches:
+        mix = {route: weight for route, weight in mix.items() if route != "write"}
+    routes, weights = zip(*mix.items())
+    result = LoadResult()
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def user(index: int):
+        rng = random.Random(None if seed is None else seed + index)
+        client = LoadClient(target, rng)
+        samples = []
+        while time.monotonic() < deadline:
+            samples.append(client.request(rng.choices(routes, weights)[0]))
+        with lock:
+            result.samples.extend(samples)
+
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(user, index) for index in range(concurrency)]:
+            future.result()
+    result.duration = time.monotonic() - start
+    return result
+
+
+def percentile(sorted_values: List[float], percent: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * percent // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def is_error(sample: Sample) -> bool:
+    if sample.route == "write":
+        # A saved admin form redirects; a 200 means the form was rejected
+        return sample.status != 302
+    return not 200 <= sample.status < 400
+
+
+def summarise(
+    result: LoadResult, key: Callable[[Sample], str] = lambda sample: sample.route
+) -> Dict[str, Any]:
+    """Throughput, errors and latency percentiles per route and overall
+
+    key groups the samples differently, e.g. into reads and writes.
+    """
+    by_route = defaultdict(list)
+    for sample in result.samples:
+        by_route[key(sample)].append(sample)
+    by_route["total"] = result.samples
+
+    summary = {}
+    for route, samples in by_route.items():
+        latencies = sorted(sample.elapsed_ms for sample in samples)
+        errors = sum(1 for sample in samples if is_error(sample))
+        summary[route] = {
+            "requests": len(samples),
+            "errors": errors,
+            "rps": len(samples) / result.duration if result.duration else 0.0,
+            "mean_ms": sum(latencies) / len(latencies) if latencies else None,
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+        }
+    return summary
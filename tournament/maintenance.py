@@ -0,0 +1,47 @@
+# tournament/maintenance.py
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator
+from django.conf import settings
+from .sqlite import copy_database
+
+
+def in_maintenance() -> bool:
+    return os.path.exists(settings.MAINTENANCE_FLAG_PATH)
+
+
+@contextmanager
+def maintenance_mode(db_path: str) -> Iterator[None]:
+    """Hold every worker in read-only mode for the duration of the block
+
+    A copy of the database is taken first for reads to use, then the flag
+    file is created. While it exists MaintenanceModeMiddleware answers
+    writes with 503 and reads from the copy, so whatever happens to the
+    live file meanwhile is never seen by a request. Requests that got past
+    the middleware before the flag appeared may still write, so the block
+    only runs after MAINTENANCE_DRAIN_SECONDS, by when they have finished
+    or gunicorn has killed them. The copy is left in
+    place afterwards, since a request that saw the flag just before it was
+    removed may still be about to open it; the next maintenance overwrites
+    it.
+    """
+    snapshot = settings.MAINTENANCE_SNAPSHOT_PATH
+    copy_database(db_path, snapshot)
+    # A rollback journal lets the copy be opened read-only without a
+    # -shm file beside it
+    connection = sqlite3.connect(snapshot)
+    try:
+        connection.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        connection.close()
+
+    with open(settings.MAINTENANCE_FLAG_PATH, "w") as f:
+        f.write(datetime.now().isoformat())
+    try:
+        time.sleep(settings.MAINTENANCE_DRAIN_SECONDS)
+        yield
+    finally:
+        os.remove(settings.MAINTENANCE_FLAG_PATH)
@@ -0,0 +1,37 @@
+# tournament/management/commands/archive_seasons.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from tournament.seasons import archive_completed, season_path
+
+
+class Command(BaseCommand):
+    help = 'Moves completed tournaments into read-only per-season databases'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep', type=int, default=1,
+            help='Newest completed tournaments to leave in the main database',
+        )
+        parser.add_argument(
+            '--vacuum', action='store_true',
+            help='VACUUM the main database afterwards so the file shrinks; blocks writes while it runs',
+        )
+
+    def handle(self, *args, **options):
+        if options['keep'] < 0:
+            raise CommandError('--keep cannot be negative')
+
+        archived = archive_completed(keep=options['keep'])
+        if not archived:
+            self.stdout.write('No completed tournaments to archive')
+            return
+
+        for season, tournaments in sorted(archived.items()):
+            names = ', '.join(tournament.name for tournament in tournaments)
+            self.stdout.write(self.style.SUCCESS(f'Archived {names} to {season_path(season)}'))
+
+        if options['vacuum']:
+            with connection.cursor() as cursor:
+                cursor.execute('VACUUM')
+            self.stdout.write('Vacuumed the main database')
@@ -1,45 +1,79 @@
 # yourapp/management/commands/backup_db.py
 
-import os
-import shutil
-from datetime import datetime
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
-import boto3
-from pathlib import Path
 import environ
+from tournament.backups import (
+    BACKUP_PAGES_PER_STEP, BACKUP_STEP_SLEEP, BackupError, backup_database, collect_garbage,
+    incremental_backup, store_from_env,
+)
+from tournament.seasons import upload_seasons
 
 
 class Command(BaseCommand):
     help = 'Backup SQLite database and upload to AWS S3'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages', type=int, default=BACKUP_PAGES_PER_STEP,
+            help='Pages copied per backup step; writers can run between steps',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=BACKUP_STEP_SLEEP,
+            help='Seconds to pause between backup steps',
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Upload one gzipped copy of the whole database instead of changed chunks',
+        )
+        parser.add_argument(
+            '--keep', type=int, default=96,
+            help='Incremental backups to keep; older ones and their unused chunks are deleted',
+        )
+        parser.add_argument(
+            '--skip-gc', action='store_true', help='Do not delete old backups or chunks',
+        )
+
     def handle(self, *args, **options):
         environ.Env.read_env(settings.BASE_DIR / '.env')
 
         env = environ.Env()
-   
+
         # Get the path to the SQLite database file
         db_path = settings.DATABASES['default']['NAME']
-        
-        # Create a timestamp for the backup file
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        backup_filename = f'backup_{timestamp}.sqlite3'
-        
-        # Create a copy of the database file
-        backup_path = os.path.join(settings.BASE_DIR, backup_filename)
-        shutil.copy2(db_path, backup_path)
-
-        # Upload to AWS S3
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=env('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=env('AWS_SECRET_ACCESS_KEY')
-        )
 
-        bucket_name = env('AWS_BACKUP_BUCKET_NAME')
-        s3_client.upload_file(backup_path, bucket_name, backup_filename)
+        # The snapshot goes through SQLite's backup API, so commits still in
+        # the WAL are included, and is gzipped while it uploads
+        if options['keep'] < 1:
+            raise CommandError('--keep must be at least 1')
+        store = store_from_env(env)
+        try:
+            if options['full']:
+                result = backup_database(db_path, store, pages=options['pages'], sleep=options['sleep'])
+                self.stdout.write(
+                    f'{result.database_bytes} bytes compressed to {result.compressed_bytes} '
+                    f'in {result.seconds:.1f}s (sha256 {result.sha256})'
+                )
+            else:
+                result = incremental_backup(db_path, store, pages=options['pages'], sleep=options['sleep'])
+                self.stdout.write(
+                    f'{result.database_bytes} bytes in {result.chunks} chunks, uploaded '
+                    f'{result.uploaded_chunks} new chunks ({result.uploaded_bytes} bytes) '
+                    f'in {result.seconds:.1f}s'
+                )
+        except BackupError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(f'Successfully backed up database to {result.key}'))
 
-        # Clean up local backup file
-        os.remove(backup_path)
+        # Archived seasons live in their own files, which only change when
+        # archive_seasons runs
+        for key in upload_seasons(store):
+            self.stdout.write(f'Uploaded {key}')
 
-        self.stdout.write(self.style.SUCCESS(f'Successfully backed up database to {backup_filename} in S3 bucket {bucket_name}'))
\ No newline at end of file
+        if not options['full'] and not options['skip_gc']:
+            expired, unreferenced = collect_garbage(store, options['keep'])
+            if expired or unreferenced:
+                self.stdout.write(
+                    f'Deleted {len(expired)} old backups and {len(unreferenced)} unused chunks'
+                )
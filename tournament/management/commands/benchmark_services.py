@@ -0,0 +1,77 @@
+# tournament/management/commands/benchmark_services.py
+
+import json
+import os
+from datetime import datetime
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from tournament.benchmarks import run_service_benchmarks, throwaway_database
+
+
+class Command(BaseCommand):
+    help = 'Times the grid, standings and match services against synthetic tournaments of increasing size'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--teams', default='4,8,12,16',
+            help='Comma separated teams per group to benchmark (default 4,8,12,16)',
+        )
+        parser.add_argument('--groups', type=int, default=4, help='Groups per tournament')
+        parser.add_argument('--completion', type=float, default=1.0)
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per service')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--output',
+            help='Where to write the JSON results (default benchmarks/services-<timestamp>.json)',
+        )
+        parser.add_argument('--compare', help='Earlier results file to compare against')
+
+    def handle(self, *args, **options):
+        team_counts = [int(value) for value in options['teams'].split(',')]
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'benchmarks',
+            f"services-{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+        )
+
+        baseline = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Could not read {options['compare']}: {e}")
+
+        with throwaway_database():
+            results = run_service_benchmarks(
+                team_counts, options['groups'], options['completion'],
+                options['repeat'], options['seed'],
+            )
+
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+        self.print_results(results, baseline)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+    def print_results(self, results, baseline):
+        previous = {}
+        if baseline:
+            for run in baseline['runs']:
+                for service, figures in run['services'].items():
+                    previous[(run['groups'], run['teams_per_group'], service)] = figures
+
+        self.stdout.write(
+            f"{'groups':>6} {'teams':>5} {'matches':>7}  {'service':<24}"
+            f"{'queries':>8} {'median ms':>10} {'change':>8}"
+        )
+        for run in results['runs']:
+            for service, figures in run['services'].items():
+                change = ''
+                before = previous.get((run['groups'], run['teams_per_group'], service))
+                if before and before['median_ms']:
+                    change = f"{(figures['median_ms'] / before['median_ms'] - 1) * 100:+.0f}%"
+                self.stdout.write(
+                    f"{run['groups']:>6} {run['teams_per_group']:>5} {run['matches']:>7}  "
+                    f"{service:<24}{figures['queries']:>8} {figures['median_ms']:>10.1f} {change:>8}"
+                )
@@ -0,0 +1,129 @@
+# tournament/management/commands/benchmark_sqlite.py
+
+import json
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from tournament.loadtest import (
+    Target, load_target_data, parse_mix, prepare_database, run_load, run_server, summarise,
+)
+from tournament.sqlite import copy_database, read_pragmas
+from tournament.synthetic import SyntheticConfig
+
+# SQLite as it was before tuning: rollback journal, no pragmas and a new
+# connection per request
+CONFIGURATIONS = {
+    'default': {
+        'journal_mode': 'DELETE',
+        'env': {'SQLITE_TUNING': 'False', 'DB_CONN_MAX_AGE': '0'},
+    },
+    'tuned': {
+        'journal_mode': 'WAL',
+        'env': {},
+    },
+}
+
+
+def read_or_write(sample):
+    return 'write' if sample.route == 'write' else 'read'
+
+
+class Command(BaseCommand):
+    help = 'Compares read and write latency under concurrent gunicorn workers with default and tuned SQLite settings'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=20, help='Seconds of traffic per configuration')
+        parser.add_argument('--mix', default='grid=60,detail=15,history=5,write=20')
+        parser.add_argument('--teams', type=int, default=8, help='Teams per group')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--output',
+            help='Where to write the JSON results (default benchmarks/sqlite-<timestamp>.json)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options['mix'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'benchmarks',
+            f"sqlite-{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+        )
+
+        results = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            seeded = os.path.join(tmp, 'seeded.sqlite3')
+            self.stdout.write('Seeding database...')
+            prepare_database(seeded, SyntheticConfig(
+                tournaments=4, min_groups=4, max_groups=6,
+                teams_per_group=options['teams'], completion=0.7, seed=options['seed'],
+            ))
+            data = load_target_data(seeded)
+
+            for name, configuration in CONFIGURATIONS.items():
+                # Each configuration starts from an identical copy, since the
+                # journal mode is stored in the database file
+                db_path = os.path.join(tmp, f'{name}.sqlite3')
+                copy_database(seeded, db_path)
+                connection = sqlite3.connect(db_path)
+                connection.execute(f"PRAGMA journal_mode = {configuration['journal_mode']}")
+                connection.close()
+
+                self.stdout.write(f'Running {name}...')
+                try:
+                    with run_server(db_path, workers=options['workers'], env=configuration['env']) as base_url:
+                        result = run_load(
+                            Target(base_url, data['tournament_ids'], data['matches']),
+                            mix, options['concurrency'], options['duration'], options['seed'],
+                        )
+                except RuntimeError as e:
+                    raise CommandError(str(e))
+
+                connection = sqlite3.connect(db_path)
+                pragmas = read_pragmas(connection, ['journal_mode'])
+                connection.close()
+                results[name] = {
+                    **pragmas,
+                    'environment': configuration['env'],
+                    'summary': summarise(result, key=read_or_write),
+                }
+
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump({
+                'created': datetime.now().isoformat(),
+                'workers': options['workers'],
+                'concurrency': options['concurrency'],
+                'duration': options['duration'],
+                'mix': mix,
+                'configurations': results,
+            }, f, indent=2)
+
+        self.print_results(results)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+    def print_results(self, results):
+        def ms(value):
+            return f"{value:.1f}" if value is not None else '-'
+
+        self.stdout.write(
+            f"{'config':<9}{'kind':<7}{'requests':>9}{'errors':>7}{'req/s':>8}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        )
+        for name, result in results.items():
+            for kind in ('read', 'write', 'total'):
+                figures = result['summary'].get(kind)
+                if figures is None:
+                    continue
+                self.stdout.write(
+                    f"{name:<9}{kind:<7}{figures['requests']:>9}{figures['errors']:>7}"
+                    f"{figures['rps']:>8.1f}{ms(figures['p50_ms']):>9}"
+                    f"{ms(figures['p95_ms']):>9}{ms(figures['p99_ms']):>9}"
+                )
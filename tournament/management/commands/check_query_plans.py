@@ -0,0 +1,47 @@
+# tournament/management/commands/check_query_plans.py
+
+from django.core.management.base import BaseCommand, CommandError
+from tournament.benchmarks import throwaway_database
+from tournament.models import Tournament
+from tournament.query_plans import collect_query_plans
+from tournament.synthetic import SyntheticConfig, SyntheticDataGenerator
+
+
+class Command(BaseCommand):
+    help = 'Runs EXPLAIN QUERY PLAN on every query the pages and services issue and fails on full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tournament', type=int,
+            help='Tournament id in the current database (default a synthetic tournament)',
+        )
+        parser.add_argument('--verbose', action='store_true', help='Print the plan of every query')
+
+    def handle(self, *args, **options):
+        if options['tournament']:
+            try:
+                tournament = Tournament.objects.get(id=options['tournament'])
+            except Tournament.DoesNotExist:
+                raise CommandError(f"Tournament {options['tournament']} does not exist")
+            plans = collect_query_plans(tournament)
+        else:
+            with throwaway_database():
+                tournament = SyntheticDataGenerator(
+                    SyntheticConfig(tournaments=3, min_groups=4, max_groups=4, teams_per_group=6, seed=1)
+                ).generate('Query plans')[-1]
+                plans = collect_query_plans(tournament)
+
+        scanning = [plan for plan in plans if plan.full_scans]
+        for plan in plans:
+            if options['verbose'] or plan.full_scans:
+                style = self.style.ERROR if plan.full_scans else (lambda text: text)
+                self.stdout.write(style(f"[{plan.source}] {plan.sql}"))
+                for line in plan.plan:
+                    self.stdout.write(f"    {line}")
+
+        if scanning:
+            tables = sorted({table for plan in scanning for table in plan.full_scans})
+            raise CommandError(
+                f"{len(scanning)} of {len(plans)} queries scan a whole table: {', '.join(tables)}"
+            )
+        self.stdout.write(self.style.SUCCESS(f'All {len(plans)} queries use an index'))
@@ -1,22 +1,33 @@
 # In myapp/management/commands/create_seed_data.py
 
-from django.core.management.base import BaseCommand
-from django.core.management import call_command
 import os
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from tournament.seed import SeedError, export_seed
 
 class Command(BaseCommand):
-    help = 'Creates seed data JSON file from the current database'
+    help = 'Streams the tournament data to a newline-delimited seed file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default='tournament/fixtures/seed_data.ndjson',
+            help='File to write, or - for stdout',
+        )
 
     def handle(self, *args, **options):
-        output_file = 'tournament/fixtures/seed_data.json'
-        
-        # Ensure the fixtures directory exists
-        os.makedirs(os.path.dirname(output_file), exist_ok=True)
-        
-        # Create the seed data
-        call_command('dumpdata', 
-                     exclude=['contenttypes', 'auth.permission'],
-                     output=output_file,
-                     indent=2)
-        
-        self.stdout.write(self.style.SUCCESS(f'Successfully created seed data at {output_file}'))
\ No newline at end of file
+        output_file = options['output']
+
+        try:
+            if output_file == '-':
+                counts = export_seed(sys.stdout)
+            else:
+                # Ensure the fixtures directory exists
+                os.makedirs(os.path.dirname(output_file) or '.', exist_ok=True)
+                with open(output_file, 'w', encoding='utf-8') as stream:
+                    counts = export_seed(stream)
+        except SeedError as e:
+            raise CommandError(str(e))
+
+        if output_file != '-':
+            summary = ', '.join(f'{count} {label}' for label, count in counts.items())
+            self.stdout.write(self.style.SUCCESS(f'Successfully created seed data at {output_file} ({summary})'))
@@ -2,18 +2,36 @@
 
 from django.core.management.base import BaseCommand
 from django.utils import timezone
+from django.core.exceptions import ValidationError
 from tournament.models import Tournament, TournamentGroup, Team
 from django.db import transaction
 
+
+class DryRunRollback(Exception):
+    """Raised inside the transaction to discard a --dry-run"""
+
+
 class Command(BaseCommand):
     help = 'Creates a new tournament copying team structure from the most recent tournament'
 
     def add_arguments(self, parser):
         parser.add_argument('name', type=str, help='Name of the new tournament')
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate and report what would be created without saving anything',
+        )
+        parser.add_argument(
+            '--summary-only',
+            action='store_true',
+            help='Only print the final summary instead of a line per group and team',
+        )
 
     def handle(self, *args, **options):
         tournament_name = options['name']
-        
+        dry_run = options['dry_run']
+        self.summary_only = options['summary_only']
+
         # Get the most recent tournament
         previous_tournament = Tournament.objects.order_by('-start_date').first()
         if not previous_tournament:
@@ -22,6 +40,30 @@ class Command(BaseCommand):
             )
             return
 
+        # Load the whole structure of the previous tournament up front: one
+        # query for the groups and one for every team in them.
+        previous_tournament_groups = list(
+            TournamentGroup.objects.filter(
+                tournament=previous_tournament
+            ).select_related('group')
+        )
+        previous_teams = list(
+            Team.objects.filter(
+                tournament=previous_tournament
+            ).select_related('player1', 'player2')
+        )
+
+        errors = self.validate_structure(previous_tournament_groups, previous_teams)
+        if errors:
+            for error in errors:
+                self.stdout.write(self.style.ERROR(error))
+            self.stdout.write(
+                self.style.ERROR(
+                    f'Failed to create tournament: {len(errors)} validation errors'
+                )
+            )
+            return
+
         try:
             with transaction.atomic():
                 # Create new tournament
@@ -30,46 +72,53 @@ class Command(BaseCommand):
                     start_date=timezone.now().date(),
                     status='ONGOING'
                 )
-                self.stdout.write(
-                    self.style.SUCCESS(f'Created new tournament: {new_tournament.name}')
-                )
-
-                # Get all groups from previous tournament
-                previous_tournament_groups = TournamentGroup.objects.filter(
-                    tournament=previous_tournament
-                ).select_related('group')
+                self.write_detail(f'Created new tournament: {new_tournament.name}')
 
                 # Create new tournament groups
-                for prev_tournament_group in previous_tournament_groups:
-                    new_tournament_group = TournamentGroup.objects.create(
+                new_tournament_groups = TournamentGroup.objects.bulk_create([
+                    TournamentGroup(
                         tournament=new_tournament,
                         group=prev_tournament_group.group
                     )
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f'Created tournament group: {new_tournament_group.group.name}'
-                        )
+                    for prev_tournament_group in previous_tournament_groups
+                ])
+                new_group_by_previous_id = {}
+                for prev_tournament_group, new_tournament_group in zip(
+                    previous_tournament_groups, new_tournament_groups
+                ):
+                    new_group_by_previous_id[prev_tournament_group.id] = new_tournament_group
+                    self.write_detail(
+                        f'Created tournament group: {new_tournament_group.group.name}'
                     )
 
-                    # Get teams from previous tournament group
-                    previous_teams = Team.objects.filter(
-                        tournament_group=prev_tournament_group
-                    ).select_related('player1', 'player2')
-
-                    # Create new teams
-                    for prev_team in previous_teams:
-                        new_team = Team.objects.create(
-                            player1=prev_team.player1,
-                            player2=prev_team.player2,
-                            tournament_group=new_tournament_group,
-                            rank=prev_team.rank
-                        )
-                        self.stdout.write(
-                            self.style.SUCCESS(
-                                f'Created team: {new_team}'
-                            )
-                        )
+                # Create new teams
+                new_teams = Team.objects.bulk_create([
+                    Team(
+                        player1=prev_team.player1,
+                        player2=prev_team.player2,
+                        tournament_group=new_group_by_previous_id[prev_team.tournament_group_id],
+                        tournament=new_tournament,
+                        rank=prev_team.rank,
+                        short_label=prev_team.short_label,
+                        full_label=prev_team.full_label,
+                    )
+                    for prev_team in previous_teams
+                ])
+                for new_team in new_teams:
+                    self.write_detail(f'Created team: {new_team}')
+
+                if dry_run:
+                    raise DryRunRollback
 
+        except DryRunRollback:
+            self.stdout.write(
+                self.style.WARNING(
+                    f'Dry run: would create tournament {tournament_name} '
+                    f'with {len(previous_tournament_groups)} groups '
+                    f'and {len(previous_teams)} teams'
+                )
+            )
+            return
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'Failed to create tournament: {str(e)}')
@@ -79,6 +128,26 @@ class Command(BaseCommand):
         self.stdout.write(
             self.style.SUCCESS(
                 f'Successfully created new tournament {tournament_name} '
-                f'with {Team.objects.filter(tournament_group__tournament=new_tournament).count()} teams'
+                f'with {len(new_tournament_groups)} groups and {len(new_teams)} teams'
+            )
+        )
+
+    def validate_structure(self, tournament_groups, teams):
+        """Run the model validation against the loaded rows without touching the database"""
+        errors = []
+        if not 2 <= len(tournament_groups) <= 7:
+            errors.append(
+                f'A tournament must have between 2 and 7 groups, '
+                f'found {len(tournament_groups)}'
             )
-        )
\ No newline at end of file
+
+        for team in teams:
+            try:
+                team.clean()
+            except ValidationError as e:
+                errors.append(f'Team {team.id}: {" ".join(e.messages)}')
+        return errors
+
+    def write_detail(self, message):
+        if not self.summary_only:
+            self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,18 @@
+# tournament/management/commands/export_archive.py
+
+import os
+from django.core.management.base import BaseCommand
+from tournament.archive import export_archive
+
+
+class Command(BaseCommand):
+    help = 'Writes all tournaments, teams and matches to a memory-mappable columnar archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='tournament_history.tda', help='Archive file to write')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        counts = export_archive(path)
+        summary = ', '.join(f'{rows} {table}' for table, rows in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Wrote {path} ({os.path.getsize(path)} bytes: {summary})'))
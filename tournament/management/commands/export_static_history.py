@@ -0,0 +1,24 @@
+# tournament/management/commands/export_static_history.py
+
+from django.core.management.base import BaseCommand
+from tournament.static_history import export_root, export_static_history
+
+
+class Command(BaseCommand):
+    help = 'Renders completed tournaments to static HTML and JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force', action='store_true', help='Render every page, even those that have not changed',
+        )
+
+    def handle(self, *args, **options):
+        result = export_static_history(force=options['force'])
+        for url in result.written:
+            self.stdout.write(f'Exported {url}')
+        for url in result.removed:
+            self.stdout.write(f'Removed {url}')
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(result.written)} pages exported, {result.unchanged} unchanged, '
+            f'{len(result.removed)} removed in {export_root()}'
+        ))
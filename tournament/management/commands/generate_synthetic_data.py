@@ -0,0 +1,55 @@
+# tournament/management/commands/generate_synthetic_data.py
+
+from django.core.management.base import BaseCommand, CommandError
+from tournament.synthetic import SyntheticConfig, SyntheticDataGenerator
+
+
+def group_range(value):
+    """Parse "4" or "2-7" into a (min, max) pair"""
+    low, _, high = value.partition('-')
+    return int(low), int(high or low)
+
+
+class Command(BaseCommand):
+    help = 'Generates synthetic tournaments, teams and results for benchmarking and local testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tournaments', type=int, default=1, help='Number of tournaments')
+        parser.add_argument(
+            '--groups', type=group_range, default=(2, 7),
+            help='Groups per tournament, a number or a range such as 2-7 (default 2-7)',
+        )
+        parser.add_argument('--teams', type=int, default=6, help='Teams per group')
+        parser.add_argument(
+            '--completion', type=float, default=1.0,
+            help='Share of each round-robin already played, 0 to 1 (default 1)',
+        )
+        parser.add_argument('--retirement-rate', type=float, default=0.05)
+        parser.add_argument('--withdrawal-rate', type=float, default=0.05)
+        parser.add_argument('--seed', type=int, help='Random seed for a repeatable dataset')
+        parser.add_argument('--prefix', default='Synthetic', help='Prefix for tournament names')
+
+    def handle(self, *args, **options):
+        min_groups, max_groups = options['groups']
+        config = SyntheticConfig(
+            tournaments=options['tournaments'],
+            min_groups=min_groups,
+            max_groups=max_groups,
+            teams_per_group=options['teams'],
+            completion=options['completion'],
+            retirement_rate=options['retirement_rate'],
+            withdrawal_rate=options['withdrawal_rate'],
+            seed=options['seed'],
+        )
+
+        try:
+            tournaments = SyntheticDataGenerator(config).generate(options['prefix'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Generated {len(tournaments)} tournaments: '
+                + ', '.join(tournament.name for tournament in tournaments)
+            )
+        )
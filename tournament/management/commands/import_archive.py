@@ -0,0 +1,27 @@
+# tournament/management/commands/import_archive.py
+
+from django.core.management.base import BaseCommand, CommandError
+from tournament.archive import ArchiveError, load_archive
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the tournament tables from an archive written by export_archive'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Archive file to read')
+        parser.add_argument(
+            '--replace', action='store_true',
+            help='Delete the existing tournaments, teams, players and matches first',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            counts = load_archive(path, replace=options['replace'])
+        except OSError as e:
+            raise CommandError(f'Could not read {path}: {e}')
+        except ArchiveError as e:
+            raise CommandError(str(e))
+
+        summary = ', '.join(f'{rows} {table}' for table, rows in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Loaded {path} ({summary})'))
@@ -0,0 +1,64 @@
+# tournament/management/commands/import_results.py
+
+import os
+from django.core.management.base import BaseCommand, CommandError
+from tournament.imports import MatchResultImporter, current_tournament, read_rows
+from tournament.models import Tournament
+
+
+class Command(BaseCommand):
+    help = 'Imports a batch of match results from a CSV or JSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=str, help='CSV or JSON file of results')
+        parser.add_argument(
+            '--tournament',
+            type=int,
+            help='ID of the tournament the results belong to (defaults to the ongoing tournament)',
+        )
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'json'],
+            help='File format (defaults to the file extension)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Validate every row and report without saving anything',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or (
+            'json' if os.path.splitext(path)[1].lower() == '.json' else 'csv'
+        )
+
+        if options['tournament']:
+            try:
+                tournament = Tournament.objects.get(pk=options['tournament'])
+            except Tournament.DoesNotExist:
+                raise CommandError(f"Tournament {options['tournament']} does not exist")
+        else:
+            tournament = current_tournament()
+            if not tournament:
+                raise CommandError('No ongoing tournament found, pass --tournament')
+
+        try:
+            with open(path, newline='', encoding='utf-8-sig') as stream:
+                rows = read_rows(stream, file_format)
+        except (OSError, ValueError) as e:
+            raise CommandError(f'Could not read {path}: {e}')
+
+        importer = MatchResultImporter(tournament)
+        result = importer.import_rows(rows, dry_run=options['dry_run'])
+
+        for error in result.errors:
+            self.stdout.write(self.style.ERROR(str(error)))
+
+        verb = 'Would import' if options['dry_run'] else 'Imported'
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'{verb} {len(result.created)} results into {tournament.name}, '
+                f'{len(result.errors)} rows rejected'
+            )
+        )
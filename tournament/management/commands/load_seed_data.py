@@ -0,0 +1,34 @@
+# tournament/management/commands/load_seed_data.py
+
+import sys
+from django.core.management.base import BaseCommand, CommandError
+from tournament.seed import SeedError, load_seed
+
+
+class Command(BaseCommand):
+    help = 'Loads a seed file written by create_seed_data'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='tournament/fixtures/seed_data.ndjson',
+            help='Seed file to read, or - for stdin',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        try:
+            if path == '-':
+                result = load_seed(sys.stdin)
+            else:
+                with open(path, encoding='utf-8') as stream:
+                    result = load_seed(stream)
+        except OSError as e:
+            raise CommandError(f'Could not read {path}: {e}')
+        except SeedError as e:
+            raise CommandError(str(e))
+
+        for label in sorted({*result.created, *result.existing}):
+            self.stdout.write(
+                f'{label}: {result.created.get(label, 0)} created, {result.existing.get(label, 0)} already present'
+            )
+        self.stdout.write(self.style.SUCCESS(f'Successfully loaded {path}'))
@@ -0,0 +1,121 @@
+# tournament/management/commands/loadtest.py
+
+import json
+import os
+import tempfile
+from datetime import datetime
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from tournament.management.commands.generate_synthetic_data import group_range
+from tournament.loadtest import (
+    DEFAULT_MIX, SERVERS, Target, load_target_data, parse_mix, prepare_database,
+    run_load, run_server, summarise,
+)
+from tournament.synthetic import SyntheticConfig
+
+
+class Command(BaseCommand):
+    help = 'Starts the app on a seeded synthetic database and reports throughput and latency per route'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--server', choices=SERVERS, default='gunicorn')
+        parser.add_argument('--workers', type=int, default=2, help='Server worker processes (fly.toml runs 2)')
+        parser.add_argument(
+            '--worker-class', default='sync',
+            help='gunicorn worker class, e.g. sync, gthread or uvicorn.workers.UvicornWorker',
+        )
+        parser.add_argument('--threads', type=int, default=1, help='Threads per gunicorn worker')
+        parser.add_argument('--concurrency', type=int, default=8, help='Simultaneous simulated users')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds of traffic')
+        parser.add_argument(
+            '--mix', default=DEFAULT_MIX,
+            help=f'Route weights out of grid, detail, history and write (default {DEFAULT_MIX})',
+        )
+        parser.add_argument('--tournaments', type=int, default=4)
+        parser.add_argument('--groups', type=group_range, default=(4, 6), help='Groups per tournament (default 4-6)')
+        parser.add_argument('--teams', type=int, default=8, help='Teams per group')
+        parser.add_argument('--completion', type=float, default=0.7)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--database',
+            help='Seeded database to reuse; created if missing (default a temporary file)',
+        )
+        parser.add_argument(
+            '--output',
+            help='Where to write the JSON results (default benchmarks/loadtest-<timestamp>.json)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options['mix'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        output = options['output'] or os.path.join(
+            settings.BASE_DIR, 'benchmarks',
+            f"loadtest-{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+        )
+
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.abspath(options['database'] or os.path.join(tmp, 'loadtest.sqlite3'))
+            if not os.path.exists(db_path):
+                min_groups, max_groups = options['groups']
+                self.stdout.write(f'Seeding {db_path}...')
+                prepare_database(db_path, SyntheticConfig(
+                    tournaments=options['tournaments'],
+                    min_groups=min_groups,
+                    max_groups=max_groups,
+                    teams_per_group=options['teams'],
+                    completion=options['completion'],
+                    seed=options['seed'],
+                ))
+            data = load_target_data(db_path)
+
+            self.stdout.write(
+                f"Running {options['duration']:g}s of traffic from {options['concurrency']} users "
+                f"against {options['server']} with {options['workers']} workers..."
+            )
+            try:
+                with run_server(
+                    db_path, options['server'], options['workers'],
+                    options['worker_class'], options['threads'],
+                ) as base_url:
+                    result = run_load(
+                        Target(base_url, data['tournament_ids'], data['matches']),
+                        mix, options['concurrency'], options['duration'], options['seed'],
+                    )
+            except RuntimeError as e:
+                raise CommandError(str(e))
+
+        summary = summarise(result)
+        report = {
+            'created': datetime.now().isoformat(),
+            'server': options['server'],
+            'workers': options['workers'],
+            'worker_class': options['worker_class'],
+            'threads': options['threads'],
+            'concurrency': options['concurrency'],
+            'duration': result.duration,
+            'mix': mix,
+            'routes': summary,
+        }
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        self.print_summary(summary)
+        self.stdout.write(self.style.SUCCESS(f'Results written to {output}'))
+
+    def print_summary(self, summary):
+        def ms(value):
+            return f"{value:.1f}" if value is not None else '-'
+
+        self.stdout.write(
+            f"{'route':<8}{'requests':>9}{'errors':>7}{'req/s':>8}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        )
+        for route, figures in summary.items():
+            self.stdout.write(
+                f"{route:<8}{figures['requests']:>9}{figures['errors']:>7}{figures['rps']:>8.1f}"
+                f"{ms(figures['p50_ms']):>9}{ms(figures['p95_ms']):>9}{ms(figures['p99_ms']):>9}"
+            )
@@ -0,0 +1,24 @@
+# tournament/management/commands/metrics.py
+
+import json
+from django.core.management.base import BaseCommand
+from tournament.metrics import recorder
+
+
+class Command(BaseCommand):
+    help = 'Shows or resets the metrics aggregated across all workers'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Clear all recorded metrics, e.g. straight after a deploy',
+        )
+
+    def handle(self, *args, **options):
+        if options['reset']:
+            recorder.reset()
+            self.stdout.write(self.style.SUCCESS('Metrics reset'))
+            return
+
+        self.stdout.write(json.dumps(recorder.snapshot(), indent=2))
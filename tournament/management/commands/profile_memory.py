@@ -0,0 +1,104 @@
+# tournament/management/commands/profile_memory.py
+
+import json
+import os
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from tournament.benchmarks import profile_memory, throwaway_database
+from tournament.models import Tournament
+from tournament.synthetic import SyntheticConfig, SyntheticDataGenerator
+
+
+class Command(BaseCommand):
+    help = 'Reports the peak memory of building and rendering a tournament page'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tournament', type=int,
+            help='Tournament id in the current database (default a synthetic tournament)',
+        )
+        parser.add_argument('--groups', type=int, default=7, help='Groups in the synthetic tournament')
+        parser.add_argument('--teams', type=int, default=12, help='Teams per group in the synthetic tournament')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--top', type=int, default=15, help='Allocating modules to list')
+        parser.add_argument(
+            '--baseline',
+            default=os.path.join(settings.BASE_DIR, 'benchmarks', 'memory-baseline.json'),
+            help='Stored baseline for --save-baseline and --check',
+        )
+        parser.add_argument('--save-baseline', action='store_true', help='Store this run as the baseline')
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Fail if the peak exceeds the baseline by more than --tolerance',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.1,
+            help='Allowed growth over the baseline peak, as a fraction (default 0.1)',
+        )
+
+    def handle(self, *args, **options):
+        if options['tournament']:
+            try:
+                tournament = Tournament.objects.get(id=options['tournament'])
+            except Tournament.DoesNotExist:
+                raise CommandError(f"Tournament {options['tournament']} does not exist")
+            result = profile_memory(tournament, options['top'])
+        else:
+            with throwaway_database():
+                tournament = SyntheticDataGenerator(SyntheticConfig(
+                    min_groups=options['groups'],
+                    max_groups=options['groups'],
+                    teams_per_group=options['teams'],
+                    seed=options['seed'],
+                )).generate('Memory profile')[0]
+                result = profile_memory(tournament, options['top'])
+
+        self.print_result(result)
+
+        if options['save_baseline']:
+            os.makedirs(os.path.dirname(os.path.abspath(options['baseline'])), exist_ok=True)
+            with open(options['baseline'], 'w') as f:
+                json.dump(result, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {options['baseline']}"))
+
+        if options['check']:
+            self.check_baseline(result, options['baseline'], options['tolerance'])
+
+    def check_baseline(self, result, path, tolerance):
+        try:
+            with open(path) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read baseline {path}: {e}")
+
+        if (baseline['teams'], baseline['matches']) != (result['teams'], result['matches']):
+            self.stdout.write(self.style.WARNING(
+                f"Baseline was taken with {baseline['teams']} teams and {baseline['matches']} "
+                f"matches, this run has {result['teams']} and {result['matches']}"
+            ))
+
+        limit = baseline['peak_bytes'] * (1 + tolerance)
+        if result['peak_bytes'] > limit:
+            raise CommandError(
+                f"Peak memory {_kib(result['peak_bytes'])} exceeds the baseline "
+                f"{_kib(baseline['peak_bytes'])} by more than {tolerance:.0%}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Peak memory {_kib(result['peak_bytes'])} is within {tolerance:.0%} "
+            f"of the baseline {_kib(baseline['peak_bytes'])}"
+        ))
+
+    def print_result(self, result):
+        self.stdout.write(
+            f"{result['tournament']}: {result['teams']} teams, {result['matches']} matches"
+        )
+        self.stdout.write(f"  build_grid_data peak  {_kib(result['build_peak_bytes']):>12}")
+        self.stdout.write(f"  render peak           {_kib(result['render_peak_bytes']):>12}")
+        self.stdout.write(f"  peak                  {_kib(result['peak_bytes']):>12}")
+        self.stdout.write("Top allocating modules:")
+        for site in result['top_modules']:
+            self.stdout.write(f"  {_kib(site['bytes']):>12} {site['blocks']:>8} blocks  {site['module']}")
+
+
+def _kib(size):
+    return f"{size / 1024:,.1f} KiB"
@@ -0,0 +1,99 @@
+# tournament/management/commands/replicate_db.py
+
+import signal
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from botocore.exceptions import BotoCoreError, ClientError
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+import environ
+from tournament.backups import BACKUP_PAGES_PER_STEP, BACKUP_STEP_SLEEP, BackupError, store_from_env
+from tournament.replication import SNAPSHOT_SUFFIX, Replicator, prune_replica
+
+
+class Command(BaseCommand):
+    help = 'Continuously ship changed database pages to the backup store'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=float, default=10,
+            help='Seconds between shipments; at most this much is lost if the VM dies',
+        )
+        parser.add_argument(
+            '--snapshot-every', type=float, default=3600,
+            help='Seconds between full snapshots, which bound how many segments a restore replays',
+        )
+        parser.add_argument(
+            '--retain-hours', type=float, default=72,
+            help='Hours of history to keep restorable; older snapshots and segments are deleted',
+        )
+        parser.add_argument(
+            '--pages', type=int, default=BACKUP_PAGES_PER_STEP,
+            help='Pages copied per backup step; writers can run between steps',
+        )
+        parser.add_argument(
+            '--sleep', type=float, default=BACKUP_STEP_SLEEP,
+            help='Seconds to pause between backup steps',
+        )
+        parser.add_argument(
+            '--max-failures', type=int, default=8,
+            help='Failed shipments in a row, retried with a doubling wait, before giving up',
+        )
+        parser.add_argument('--once', action='store_true', help='Ship one snapshot and exit')
+
+    def handle(self, *args, **options):
+        environ.Env.read_env(settings.BASE_DIR / '.env')
+        env = environ.Env()
+
+        db_path = settings.DATABASES['default']['NAME']
+        store = store_from_env(env)
+        replicator = Replicator(
+            db_path, store, snapshot_every=options['snapshot_every'],
+            pages=options['pages'], sleep=options['sleep'],
+        )
+        # SIGTERM, as sent when the machine stops, lets the shipment in
+        # progress finish before exiting
+        stopping = threading.Event()
+        previous_handler = signal.signal(signal.SIGTERM, lambda *args: stopping.set())
+        failures = 0
+        try:
+            while not stopping.is_set():
+                started = time.monotonic()
+                try:
+                    result = replicator.tick()
+                except (BackupError, BotoCoreError, ClientError, OSError) as e:
+                    # The replicator is left as it was, so the retry
+                    # carries on the same generation
+                    failures += 1
+                    if options['once']:
+                        raise CommandError(str(e))
+                    if failures >= options['max_failures']:
+                        raise CommandError(f'Giving up after {failures} failed shipments: {e}')
+                    wait = options['interval'] * 2 ** (failures - 1)
+                    self.stderr.write(f'Shipment failed ({e}), retrying in {wait:.0f}s')
+                    stopping.wait(wait)
+                    continue
+                failures = 0
+                if result.key:
+                    self.stdout.write(
+                        f'Shipped {result.key}: {result.changed_pages} pages, {result.uploaded_bytes} bytes'
+                    )
+                    if result.key.endswith(SNAPSHOT_SUFFIX):
+                        keep_since = datetime.now(timezone.utc) - timedelta(hours=options['retain_hours'])
+                        try:
+                            expired = prune_replica(store, keep_since)
+                        except (BackupError, BotoCoreError, ClientError) as e:
+                            # Left for the next snapshot to delete
+                            self.stderr.write(f'Pruning the replica failed: {e}')
+                        else:
+                            if expired:
+                                self.stdout.write(f'Deleted {len(expired)} expired replica objects')
+                if options['once']:
+                    return
+                stopping.wait(max(0, options['interval'] - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            signal.signal(signal.SIGTERM, previous_handler)
+            replicator.close()
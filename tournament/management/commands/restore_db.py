@@ -1,16 +1,45 @@
 # yourapp/management/commands/restore_db.py
 
 import os
-import shutil
-from django.core.management.base import BaseCommand
+from contextlib import nullcontext
+from datetime import datetime
+from functools import partial
+from django.core.management.base import BaseCommand, CommandError
 from django.conf import settings
-import boto3
+from django.utils import timezone
 from botocore.exceptions import ClientError
 import environ
+from tournament.backups import (
+    DOWNLOAD_WORKERS, latest_backup, list_backups, restore_backup, store_from_env,
+)
+from tournament.maintenance import maintenance_mode
+from tournament.replication import restore_replica
+from tournament.seasons import download_seasons
+from tournament.sqlite import copy_database
 
 class Command(BaseCommand):
     help = 'Restore SQLite database from the latest backup in AWS S3'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--key', help='Restore this backup instead of the latest, e.g. manifests/20260501_120000.json',
+        )
+        parser.add_argument('--list', action='store_true', help='List the available backups and exit')
+        parser.add_argument(
+            '--replica', action='store_true',
+            help='Rebuild from the snapshots and page segments shipped by replicate_db',
+        )
+        parser.add_argument(
+            '--until', help='With --replica, restore the database as it was at this time, e.g. 2026-05-01T12:00',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=DOWNLOAD_WORKERS, help='Parallel downloads',
+        )
+        parser.add_argument(
+            '--no-maintenance', action='store_true',
+            help='Swap the file without holding running workers read-only, e.g. when none are running',
+        )
+
     def handle(self, *args, **options):
         environ.Env.read_env(settings.BASE_DIR / '.env')
         env = environ.Env()
@@ -18,51 +47,61 @@ class Command(BaseCommand):
         # Get the path to the SQLite database file
         db_path = settings.DATABASES['default']['NAME']
 
-        # Create S3 client
-        s3_client = boto3.client(
-            's3',
-            aws_access_key_id=env('AWS_ACCESS_KEY_ID'),
-            aws_secret_access_key=env('AWS_SECRET_ACCESS_KEY')
-        )
+        store = store_from_env(env)
 
-        bucket_name = env('AWS_BACKUP_BUCKET_NAME')
+        until = None
+        if options['until']:
+            if not options['replica']:
+                raise CommandError('--until needs --replica')
+            try:
+                until = datetime.fromisoformat(options['until'])
+            except ValueError:
+                raise CommandError(f"Invalid --until time: {options['until']}")
+            if timezone.is_naive(until):
+                until = timezone.make_aware(until)
 
         try:
-            # List objects in the bucket
-            response = s3_client.list_objects_v2(Bucket=bucket_name)
-
-            if 'Contents' not in response:
-                self.stdout.write(self.style.WARNING('No backups found in the S3 bucket.'))
+            if options['list']:
+                for backup in list_backups(store):
+                    self.stdout.write(f'{backup.modified:%Y-%m-%d %H:%M:%S}  {backup.size:>12}  {backup.key}')
                 return
 
-            # Sort the objects by last modified date
-            backups = sorted(response['Contents'], key=lambda x: x['LastModified'], reverse=True)
+            key = None if options['replica'] else options['key'] or latest_backup(store)
 
-            if not backups:
+            if key is None and not options['replica']:
                 self.stdout.write(self.style.WARNING('No backups found in the S3 bucket.'))
                 return
 
-            # Get the latest backup
-            latest_backup = backups[0]['Key']
-
-            # Download the latest backup
-            download_path = os.path.join(settings.BASE_DIR, 'latest_backup.sqlite3')
-            s3_client.download_file(bucket_name, latest_backup, download_path)
-
             # Backup the current database
             current_backup_path = f"{db_path}.bak"
-            shutil.copy2(db_path, current_backup_path)
-
-            # Replace the current database with the downloaded backup
-            shutil.copy2(download_path, db_path)
-
-            # Clean up the downloaded file
-            os.remove(download_path)
-
-            self.stdout.write(self.style.SUCCESS(f'Successfully restored database from {latest_backup}'))
+            if os.path.exists(db_path):
+                copy_database(db_path, current_backup_path)
+
+            # Download, verify and check the backup, then rename it over the
+            # current database. Only the rename happens in maintenance mode,
+            # so writes pause for the drain period and the rename; running
+            # workers reconnect when they see the new generation.
+            if options['no_maintenance'] or not os.path.exists(db_path):
+                during_swap = nullcontext
+            else:
+                during_swap = partial(maintenance_mode, db_path)
+            if options['replica']:
+                applied, generation = restore_replica(store, db_path, until=until, during_swap=during_swap)
+                key = f'{applied.key} ({applied.created:%Y-%m-%d %H:%M:%S} UTC)'
+            else:
+                generation = restore_backup(
+                    store, key, db_path, workers=options['workers'], during_swap=during_swap,
+                )
+
+            self.stdout.write(self.style.SUCCESS(f'Successfully restored database from {key} (generation {generation})'))
             self.stdout.write(self.style.SUCCESS(f'Previous database backed up to {current_backup_path}'))
 
+            # The restored database may refer to archived seasons this
+            # machine does not have yet
+            for path in download_seasons(store):
+                self.stdout.write(f'Downloaded {path}')
+
         except ClientError as e:
             self.stdout.write(self.style.ERROR(f'Error accessing S3: {str(e)}'))
         except Exception as e:
-            self.stdout.write(self.style.ERROR(f'Error during restore: {str(e)}'))
\ No newline at end of file
+            self.stdout.write(self.style.ERROR(f'Error during restore: {str(e)}'))
@@ -0,0 +1,240 @@
+# tournament/metrics.py
+import bisect
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple, Union
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets per metric; anything larger lands
+# in the final +Inf bucket.
+LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+QUERY_COUNT_BUCKETS = [1, 2, 5, 10, 20, 50, 100, 200, 500]
+BUCKETS = {
+    "request_ms": LATENCY_BUCKETS_MS,
+    "request_queries": QUERY_COUNT_BUCKETS,
+    "grid_build_ms": LATENCY_BUCKETS_MS,
+    "write_ms": LATENCY_BUCKETS_MS,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS histogram_bucket (
+    metric TEXT NOT NULL,
+    label TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (metric, label, bucket)
+);
+CREATE TABLE IF NOT EXISTS histogram_total (
+    metric TEXT NOT NULL,
+    label TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    PRIMARY KEY (metric, label)
+);
+CREATE TABLE IF NOT EXISTS counter (
+    metric TEXT NOT NULL,
+    label TEXT NOT NULL,
+    value INTEGER NOT NULL,
+    PRIMARY KEY (metric, label)
+);
+CREATE TABLE IF NOT EXISTS info (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def metrics_db_path() -> str:
+    """Where the shared metrics database lives, next to the main database by default"""
+    path = getattr(settings, "METRICS_DB_PATH", None)
+    if path:
+        return str(path)
+    db_dir = os.path.dirname(str(settings.DATABASES["default"]["NAME"]))
+    return os.path.join(db_dir or str(settings.BASE_DIR), "metrics.sqlite3")
+
+
+class MetricsRecorder:
+    """Aggregate metrics in memory and flush them to a shared SQLite file
+
+    Each gunicorn worker has its own recorder. Observations are added to an
+    in-process buffer and merged into the SQLite store at most once every
+    METRICS_FLUSH_INTERVAL seconds, so the store holds the totals of every
+    worker while a request only pays for a dictionary update.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connection = None
+        self._connection_key = None
+        self._last_flush = time.monotonic()
+        self._reset_buffer()
+
+    def _reset_buffer(self):
+        self._buckets: Dict[Tuple[str, str, int], int] = defaultdict(int)
+        self._totals: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0, 0.0])
+        self._counters: Dict[Tuple[str, str], int] = defaultdict(int)
+
+    @property
+    def enabled(self) -> bool:
+        return getattr(settings, "METRICS_ENABLED", False)
+
+    def observe(self, metric: str, label: str, value: float):
+        """Record one observation in a histogram"""
+        if not self.enabled:
+            return
+        bucket = bisect.bisect_left(BUCKETS.get(metric, LATENCY_BUCKETS_MS), value)
+        with self._lock:
+            self._buckets[(metric, label, bucket)] += 1
+            totals = self._totals[(metric, label)]
+            totals[0] += 1
+            totals[1] += value
+        self._maybe_flush()
+
+    def increment(self, metric: str, label: str, amount: int = 1):
+        """Add to a counter"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[(metric, label)] += amount
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        interval = getattr(settings, "METRICS_FLUSH_INTERVAL", 5)
+        if time.monotonic() - self._last_flush >= interval:
+            self.flush()
+
+    def _get_connection(self) -> sqlite3.Connection:
+        # Workers are forked, so never reuse a connection opened by the parent
+        key = (os.getpid(), metrics_db_path())
+        if self._connection is None or self._connection_key != key:
+            self._connection = sqlite3.connect(key[1], timeout=1, check_same_thread=False)
+            self._connection.executescript(SCHEMA)
+            self._connection.execute(
+                "INSERT OR IGNORE INTO info (key, value) VALUES ('since', ?)",
+                (str(time.time()),),
+            )
+            self._connection.commit()
+            self._connection_key = key
+        return self._connection
+
+    def flush(self):
+        """Merge the buffered observations into the shared store"""
+        with self._lock:
+            buckets, totals, counters = self._buckets, self._totals, self._counters
+            self._reset_buffer()
+            self._last_flush = time.monotonic()
+
+            if not (buckets or totals or counters):
+                return
+
+            try:
+                connection = self._get_connection()
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO histogram_bucket (metric, label, bucket, count) "
+                        "VALUES (?, ?, ?, ?) ON CONFLICT (metric, label, bucket) "
+                        "DO UPDATE SET count = count + excluded.count",
+                        [(*key, count) for key, count in buckets.items()],
+                    )
+                    connection.executemany(
+                        "INSERT INTO histogram_total (metric, label, count, total) "
+                        "VALUES (?, ?, ?, ?) ON CONFLICT (metric, label) "
+                        "DO UPDATE SET count = count + excluded.count, total = total + excluded.total",
+                        [(*key, count, total) for key, (count, total) in totals.items()],
+                    )
+                    connection.executemany(
+                        "INSERT INTO counter (metric, label, value) "
+                        "VALUES (?, ?, ?) ON CONFLICT (metric, label) "
+                        "DO UPDATE SET value = value + excluded.value",
+                        [(*key, value) for key, value in counters.items()],
+                    )
+            except sqlite3.Error as e:
+                # Metrics must never break a request; the batch is dropped
+                logger.warning("Could not flush metrics: %s", e)
+
+    def reset(self):
+        """Clear the shared store, e.g. after a deploy"""
+        with self._lock:
+            self._reset_buffer()
+            connection = self._get_connection()
+            with connection:
+                for table in ("histogram_bucket", "histogram_total", "counter", "info"):
+                    connection.execute(f"DELETE FROM {table}")
+                connection.execute(
+                    "INSERT INTO info (key, value) VALUES ('since', ?)", (str(time.time()),)
+                )
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Aggregated figures from every worker, after flushing this one"""
+        self.flush()
+        with self._lock:
+            connection = self._get_connection()
+            bucket_rows = connection.execute(
+                "SELECT metric, label, bucket, count FROM histogram_bucket"
+            ).fetchall()
+            total_rows = connection.execute(
+                "SELECT metric, label, count, total FROM histogram_total"
+            ).fetchall()
+            counter_rows = connection.execute(
+                "SELECT metric, label, value FROM counter"
+            ).fetchall()
+            since = connection.execute(
+                "SELECT value FROM info WHERE key = 'since'"
+            ).fetchone()
+
+        histograms = defaultdict(dict)
+        for metric, label, count, total in total_rows:
+            histograms[metric][label] = {"count": count, "sum": total, "mean": total / count}
+
+        bucket_counts = defaultdict(dict)
+        for metric, label, bucket, count in bucket_rows:
+            bucket_counts[(metric, label)][bucket] = count
+
+        for (metric, label), counts in bucket_counts.items():
+            summary = histograms[metric].setdefault(label, {"count": sum(counts.values())})
+            bounds = BUCKETS.get(metric, LATENCY_BUCKETS_MS)
+            summary["buckets"] = {
+                _bucket_name(bounds, index): counts.get(index, 0)
+                for index in range(len(bounds) + 1)
+            }
+            for percentile in (50, 95, 99):
+                summary[f"p{percentile}"] = _estimate_percentile(bounds, counts, percentile)
+
+        counters = defaultdict(dict)
+        for metric, label, value in counter_rows:
+            counters[metric][label] = value
+
+        return {
+            "since": float(since[0]) if since else None,
+            "histograms": histograms,
+            "counters": counters,
+        }
+
+
+def _bucket_name(bounds: List[float], index: int) -> str:
+    return f"le_{bounds[index]}" if index < len(bounds) else "le_inf"
+
+
+def _estimate_percentile(
+    bounds: List[float], counts: Dict[int, int], percentile: int
+) -> Optional[Union[float, str]]:
+    """Upper bound of the bucket holding the given percentile, "+Inf" past the last one"""
+    total = sum(counts.values())
+    if not total:
+        return None
+    rank = total * percentile / 100
+    seen = 0
+    for index in range(len(bounds) + 1):
+        seen += counts.get(index, 0)
+        if seen >= rank:
+            return bounds[index] if index < len(bounds) else "+Inf"
+    return "+Inf"
+
+
+recorder = MetricsRecorder()
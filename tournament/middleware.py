@@ -0,0 +1,150 @@
+# tournament/middleware.py
+import cProfile
+import logging
+import os
+import time
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+from django.http import HttpResponse
+from .instrumentation import collect_timings, current_timings
+from .maintenance import in_maintenance
+from .metrics import recorder
+from .profiling import profile_path, prune_profiles
+from .routers import SNAPSHOT_ALIAS, reading_from
+
+logger = logging.getLogger("tournament.timing")
+
+
+class RequestTimingMiddleware:
+    """Report where each request spent its time
+
+    Adds a Server-Timing header (visible in the browser dev tools) and logs
+    one key=value line per request with the query count, SQL time, template
+    render time and the time spent in each services.py stage. Latency and
+    query count also feed the per-route histograms behind /metrics/.
+    Switch off with REQUEST_TIMING_ENABLED = False.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_TIMING_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with collect_timings() as timings:
+            with connection.execute_wrapper(timings):
+                response = self.get_response(request)
+        total = (time.perf_counter() - start) * 1000
+
+        durations = timings.as_milliseconds()
+        response["Server-Timing"] = self.server_timing(timings, durations, total)
+
+        route = request.resolver_match.view_name if request.resolver_match else "unmatched"
+        recorder.observe("request_ms", route, total)
+        recorder.observe("request_queries", route, timings.query_count)
+
+        logger.info(
+            "method=%s path=%s status=%s total_ms=%.1f queries=%d %s",
+            request.method,
+            request.path,
+            response.status_code,
+            total,
+            timings.query_count,
+            " ".join(f"{name}_ms={ms:.1f}" for name, ms in durations.items()),
+        )
+        return response
+
+    def process_template_response(self, request, response):
+        """Time the template render, which happens after the view returns"""
+        timings = current_timings()
+        if timings is None:
+            return response
+
+        render = response.render
+
+        def timed_render():
+            start = time.perf_counter()
+            try:
+                return render()
+            finally:
+                timings.template_time += time.perf_counter() - start
+
+        response.render = timed_render
+        return response
+
+    def server_timing(self, timings, durations, total):
+        metrics = [f'db;dur={durations["db"]:.1f};desc="{timings.query_count} queries"']
+        metrics.extend(
+            f"{name};dur={ms:.1f}" for name, ms in durations.items() if name != "db"
+        )
+        metrics.append(f"total;dur={total:.1f}")
+        return ", ".join(metrics)
+
+
+class MaintenanceModeMiddleware:
+    """Keep the site readable while restore_db swaps the database file
+
+    Outside maintenance this costs one stat() of MAINTENANCE_FLAG_PATH per
+    request. During it, anything but a read is answered with a 503 and a
+    Retry-After header, and reads are served from the snapshot alias, a
+    read-only copy taken as maintenance began. Both are counted on
+    /metrics/.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not in_maintenance():
+            return self.get_response(request)
+
+        if request.method not in self.SAFE_METHODS:
+            recorder.increment("maintenance_rejected", request.method)
+            response = HttpResponse(
+                "The database is being restored. Please try again in a moment.",
+                status=503,
+                content_type="text/plain",
+            )
+            response["Retry-After"] = str(settings.MAINTENANCE_RETRY_AFTER)
+            return response
+
+        recorder.increment("maintenance_reads", request.method)
+        with reading_from(SNAPSHOT_ALIAS):
+            return self.get_response(request)
+
+
+class RequestProfilingMiddleware:
+    """Run a single request under cProfile when a staff user asks for it
+
+    Add ?profile=1 to any URL while logged in as staff. The whole request,
+    including the services and the template render, is profiled and saved
+    under PROFILE_DIR; the file name is returned in an X-Profile header and
+    the profiles can be browsed from the admin. Every other request only
+    pays for one query-string lookup.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if "profile" not in request.GET or not request.user.is_staff:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+
+        path = profile_path(request.path)
+        profiler.dump_stats(path)
+        prune_profiles()
+        response["X-Profile"] = os.path.basename(path)
+        return response
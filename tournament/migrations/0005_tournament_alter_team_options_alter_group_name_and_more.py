@@ -5,22 +5,24 @@ from django.db import migrations, models
 import json
 
 def store_group_mappings(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
     Team = apps.get_model('tournament', 'Team')
     Group = apps.get_model('tournament', 'Group')
     
     # Create a mapping of team IDs to their group names
     mappings = {
         team.id: team.group.name 
-        for team in Team.objects.select_related('group').all()
+        for team in Team.objects.using(db_alias).select_related('group').all()
     }
     
     # Store this in a new model that we'll create just for the migration
     GroupMapping = apps.get_model('tournament', 'GroupMapping')
-    GroupMapping.objects.create(mapping_data=json.dumps(mappings))
+    GroupMapping.objects.using(db_alias).create(mapping_data=json.dumps(mappings))
 
 def reverse_group_mappings(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
     GroupMapping = apps.get_model('tournament', 'GroupMapping')
-    GroupMapping.objects.all().delete()
+    GroupMapping.objects.using(db_alias).all().delete()
 
 class Migration(migrations.Migration):
 
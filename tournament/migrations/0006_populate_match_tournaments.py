@@ -3,6 +3,7 @@ from django.db import migrations
 import json
 
 def link_matches_to_tournament(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
     Tournament = apps.get_model('tournament', 'Tournament')
     Group = apps.get_model('tournament', 'Group')
     Team = apps.get_model('tournament', 'Team')
@@ -11,14 +12,14 @@ def link_matches_to_tournament(apps, schema_editor):
     GroupMapping = apps.get_model('tournament', 'GroupMapping')
     
     # Get the stored mappings
-    stored_mappings = GroupMapping.objects.first()
+    stored_mappings = GroupMapping.objects.using(db_alias).first()
     if stored_mappings:
         team_to_group = json.loads(stored_mappings.mapping_data)
     else:
         team_to_group = {}
     
     # Create default tournament
-    default_tournament, _ = Tournament.objects.get_or_create(
+    default_tournament, _ = Tournament.objects.using(db_alias).get_or_create(
         name="Winter 2024",
         defaults={
             'start_date': '2024-09-02',
@@ -34,12 +35,12 @@ def link_matches_to_tournament(apps, schema_editor):
     
     for group_name in unique_group_names:
         # Create or get new standalone group
-        new_group, _ = Group.objects.get_or_create(
+        new_group, _ = Group.objects.using(db_alias).get_or_create(
             name=group_name
         )
         
         # Create or get tournament group
-        tournament_group, _ = TournamentGroup.objects.get_or_create(
+        tournament_group, _ = TournamentGroup.objects.using(db_alias).get_or_create(
             tournament=default_tournament,
             group=new_group
         )
@@ -50,22 +51,23 @@ def link_matches_to_tournament(apps, schema_editor):
     # Update teams using the stored mappings
     for team_id, group_name in team_to_group.items():
         if group_name in group_mapping:
-            Team.objects.filter(id=team_id).update(
+            Team.objects.using(db_alias).filter(id=team_id).update(
                 tournament_group=group_mapping[group_name]
             )
     
     # Update matches
-    Match.objects.all().update(tournament=default_tournament)
+    Match.objects.using(db_alias).all().update(tournament=default_tournament)
 
 def reverse_migration(apps, schema_editor):
+    db_alias = schema_editor.connection.alias
     Tournament = apps.get_model('tournament', 'Tournament')
     TournamentGroup = apps.get_model('tournament', 'TournamentGroup')
     Group = apps.get_model('tournament', 'Group')
     Match = apps.get_model('tournament', 'Match')
     
-    Match.objects.all().update(tournament=None)
-    TournamentGroup.objects.all().delete()
-    Tournament.objects.all().delete()
+    Match.objects.using(db_alias).all().update(tournament=None)
+    TournamentGroup.objects.using(db_alias).all().delete()
+    Tournament.objects.using(db_alias).all().delete()
 
 class Migration(migrations.Migration):
     dependencies = [
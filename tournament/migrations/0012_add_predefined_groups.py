@@ -4,6 +4,7 @@ from django.db import migrations
 
 def create_predefined_groups(apps, schema_editor):
     """Create predefined group names for tournament selection"""
+    db_alias = schema_editor.connection.alias
     Group = apps.get_model('tournament', 'Group')
 
     # Only create groups that don't already exist
@@ -19,17 +20,18 @@ def create_predefined_groups(apps, schema_editor):
     ]
 
     for name in group_names:
-        Group.objects.get_or_create(name=name)
+        Group.objects.using(db_alias).get_or_create(name=name)
 
 
 def reverse_migration(apps, schema_editor):
     """Remove predefined groups (only if they're not in use)"""
+    db_alias = schema_editor.connection.alias
     Group = apps.get_model('tournament', 'Group')
     TournamentGroup = apps.get_model('tournament', 'TournamentGroup')
 
     # Delete groups that are not associated with any tournament
-    unused_groups = Group.objects.exclude(
-        id__in=TournamentGroup.objects.values_list('group_id', flat=True)
+    unused_groups = Group.objects.using(db_alias).exclude(
+        id__in=TournamentGroup.objects.using(db_alias).values_list('group_id', flat=True)
     )
     unused_groups.delete()
 
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.1 on 2026-10-19 09:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def copy_tournament_from_group(apps, schema_editor):
+    """Fill the new column from each team's tournament group"""
+    db_alias = schema_editor.connection.alias
+    Team = apps.get_model('tournament', 'Team')
+    TournamentGroup = apps.get_model('tournament', 'TournamentGroup')
+
+    Team.objects.using(db_alias).update(
+        tournament_id=models.Subquery(
+            TournamentGroup.objects.using(db_alias).filter(
+                pk=models.OuterRef('tournament_group_id')
+            ).values('tournament_id')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournament', '0013_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='tournament',
+            field=models.ForeignKey(editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='teams', to='tournament.tournament'),
+        ),
+        migrations.RunPython(copy_tournament_from_group, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='team',
+            name='tournament',
+            field=models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='teams', to='tournament.tournament'),
+        ),
+    ]
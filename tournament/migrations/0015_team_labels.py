@@ -0,0 +1,37 @@
+# Generated by Django 5.1.1 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+def build_labels(apps, schema_editor):
+    """Fill the labels of existing teams from their players' first names"""
+    db_alias = schema_editor.connection.alias
+    Team = apps.get_model('tournament', 'Team')
+
+    teams = list(Team.objects.using(db_alias).select_related('player1', 'player2'))
+    for team in teams:
+        first1, first2 = team.player1.first_name, team.player2.first_name
+        team.short_label = f"{first1[:4]}/{first2[:4]}"
+        team.full_label = f"{first1}/{first2}"
+    Team.objects.using(db_alias).bulk_update(teams, ['short_label', 'full_label'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournament', '0014_team_tournament'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='team',
+            name='full_label',
+            field=models.CharField(default='', editable=False, max_length=201),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='short_label',
+            field=models.CharField(default='', editable=False, max_length=9),
+        ),
+        migrations.RunPython(build_labels, migrations.RunPython.noop),
+    ]
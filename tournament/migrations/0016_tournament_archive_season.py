@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 03:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournament', '0015_team_labels'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='archive_season',
+            field=models.PositiveSmallIntegerField(blank=True, editable=False, null=True),
+        ),
+    ]
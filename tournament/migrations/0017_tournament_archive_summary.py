@@ -0,0 +1,18 @@
+# Generated by Django 5.1.1 on 2026-10-19 03:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tournament', '0016_tournament_archive_season'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tournament',
+            name='archive_summary',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -1,7 +1,67 @@
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Optional, Tuple
 from django.db import models
 from django.core.exceptions import ValidationError
 
 
+@dataclass
+class ValidationContext:
+    """Preloaded rows that model validation reads instead of lazy lookups
+
+    Bulk paths (management commands, imports) already hold the tournaments,
+    groups and teams they are working with. Passing them in lets clean()
+    validate without issuing a query per row. Anything missing from the
+    context falls back to the normal lazy lookup.
+    """
+
+    tournaments: Dict[int, 'Tournament'] = field(default_factory=dict)
+    tournament_groups: Dict[int, 'TournamentGroup'] = field(default_factory=dict)
+    teams: Dict[int, 'Team'] = field(default_factory=dict)
+    group_counts: Dict[int, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_objects(
+        cls,
+        tournaments: Iterable['Tournament'] = (),
+        tournament_groups: Iterable['TournamentGroup'] = (),
+        teams: Iterable['Team'] = (),
+    ) -> 'ValidationContext':
+        """Build a context from already loaded objects, counting groups per tournament"""
+        context = cls(
+            tournaments={t.pk: t for t in tournaments},
+            tournament_groups={tg.pk: tg for tg in tournament_groups},
+            teams={team.pk: team for team in teams},
+        )
+        for tournament_group in context.tournament_groups.values():
+            context.group_counts[tournament_group.tournament_id] = (
+                context.group_counts.get(tournament_group.tournament_id, 0) + 1
+            )
+        return context
+
+    @classmethod
+    def for_tournament(cls, tournament: 'Tournament') -> 'ValidationContext':
+        """Load everything needed to validate rows in one tournament (two queries)"""
+        tournament_groups = list(TournamentGroup.objects.filter(tournament=tournament))
+        teams = Team.objects.filter(tournament=tournament)
+        return cls.from_objects([tournament], tournament_groups, teams)
+
+
+def _from_context(
+    lookup: Optional[Dict[int, models.Model]], instance: models.Model, field_name: str
+) -> models.Model:
+    """Resolve a foreign key from the validation context, or lazily if not there"""
+    if lookup is not None:
+        related_id = getattr(instance, f"{field_name}_id")
+        if related_id in lookup:
+            return lookup[related_id]
+    return getattr(instance, field_name)
+
+
+class TournamentManager(models.Manager):
+    def get_by_natural_key(self, name, start_date):
+        return self.get(name=name, start_date=start_date)
+
+
 class Tournament(models.Model):
     STATUS_CHOICES = [
         ('ONGOING', 'Ongoing'),
@@ -17,6 +77,20 @@ class Tournament(models.Model):
         default='ONGOING'
     )
     groups = models.ManyToManyField('Group', through='TournamentGroup')
+    # Set once archive_seasons has moved the groups, teams and matches out
+    # to that season's database
+    archive_season = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+    # The history list's counts and group winners, frozen when archived
+    archive_summary = models.JSONField(null=True, blank=True, editable=False)
+
+    objects = TournamentManager()
+
+    class Meta:
+        indexes = [
+            # Current-tournament lookup and prev/next navigation
+            models.Index(fields=['status', 'end_date', 'start_date'], name='tournament_current_idx'),
+            models.Index(fields=['start_date'], name='tournament_start_idx'),
+        ]
 
     def clean(self):
         if self.end_date and self.end_date < self.start_date:
@@ -25,13 +99,12 @@ class Tournament(models.Model):
         if self.status == 'COMPLETED' and not self.end_date:
             raise ValidationError("End date must be set when tournament is completed")
 
-        # Validate group count if tournament is saved (has an ID)
-        if self.pk:
-            self.validate_group_count()
-
-    def validate_group_count(self):
+    def validate_group_count(self, context: Optional[ValidationContext] = None):
         """Validate that tournament has between 2 and 7 groups"""
-        group_count = self.tournamentgroup_set.count()
+        if context is not None and self.pk in context.group_counts:
+            group_count = context.group_counts[self.pk]
+        else:
+            group_count = self.tournamentgroup_set.count()
 
         if group_count < 2:
             raise ValidationError(
@@ -43,25 +116,68 @@ class Tournament(models.Model):
                 "A tournament can have a maximum of 7 groups."
             )
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, validation_context: Optional[ValidationContext] = None, **kwargs):
         self.clean()
+        # Validate group count if tournament is saved (has an ID) and its
+        # groups are still in this database. Forms leave this to the save,
+        # as the admin edits the groups in an inline alongside.
+        if self.pk and self.archive_season is None:
+            self.validate_group_count(validation_context)
         super().save(*args, **kwargs)
 
+    def natural_key(self):
+        return (self.name, self.start_date.isoformat())
+
     def __str__(self):
         return self.name
 
 
+class PlayerManager(models.Manager):
+    def get_by_natural_key(self, first_name, last_name):
+        return self.get(first_name=first_name, last_name=last_name)
+
+
 class Player(models.Model):
     first_name = models.CharField(max_length=100)
     last_name = models.CharField(max_length=100)
 
+    objects = PlayerManager()
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if adding or (update_fields is not None and "first_name" not in update_fields):
+            return
+        # Teams store labels built from their players' first names
+        teams = list(
+            Team.objects.filter(models.Q(player1=self) | models.Q(player2=self))
+            .select_related("player1", "player2")
+        )
+        for team in teams:
+            team.sync_labels()
+        Team.objects.bulk_update(teams, ["short_label", "full_label"])
+
+    def natural_key(self):
+        return (self.first_name, self.last_name)
+
     def __str__(self):
         return f"{self.first_name} {self.last_name}"
 
 
+class GroupManager(models.Manager):
+    def get_by_natural_key(self, name):
+        return self.get(name=name)
+
+
 class Group(models.Model):
     name = models.CharField(max_length=100, unique=True)
 
+    objects = GroupManager()
+
+    def natural_key(self):
+        return (self.name,)
+
     def __str__(self):
         return self.name
 
@@ -73,6 +189,15 @@ class TournamentGroup(models.Model):
     class Meta:
         unique_together = ['tournament', 'group']
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if not adding:
+            # Teams keep a copy of the tournament, so follow a group that moved
+            self.teams.exclude(tournament_id=self.tournament_id).update(
+                tournament_id=self.tournament_id
+            )
+
     def __str__(self):
         return f"{self.group.name} in {self.tournament.name}"
 
@@ -89,23 +214,77 @@ class Team(models.Model):
         related_name="teams", 
         on_delete=models.CASCADE,
     )
+    # Copied from tournament_group on save so tournament lookups skip a join
+    tournament = models.ForeignKey(
+        Tournament,
+        related_name="teams",
+        on_delete=models.CASCADE,
+        editable=False,
+    )
     rank = models.IntegerField(null=True, blank=True)
     is_withdrawn = models.BooleanField(default=False)
+    # Built from the players' first names on save, so listings need no join
+    short_label = models.CharField(max_length=9, editable=False, default="")
+    full_label = models.CharField(max_length=201, editable=False, default="")
 
     class Meta:
         unique_together = ["player1", "player2", "tournament_group"]
         ordering = ["tournament_group", "rank"]
+        indexes = [
+            models.Index(fields=["tournament_group", "rank"], name="team_group_rank_idx"),
+        ]
 
     def clean(self):
-        if self.player1 == self.player2:
+        if self.player1_id is not None and self.player1_id == self.player2_id:
             raise ValidationError("A team must consist of two different players")
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, validation_context: Optional[ValidationContext] = None, **kwargs):
         self.clean()
+        self.sync_tournament(context=validation_context)
+        if self._players_changed():
+            self.sync_labels()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if "tournament_group" in update_fields:
+                update_fields.add("tournament")
+            if update_fields & {"player1", "player2"}:
+                update_fields |= {"short_label", "full_label"}
+            kwargs["update_fields"] = update_fields
         super().save(*args, **kwargs)
+        self._saved_players = (self.player1_id, self.player2_id)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_players = (
+            instance.__dict__.get("player1_id"), instance.__dict__.get("player2_id")
+        )
+        return instance
+
+    def _players_changed(self) -> bool:
+        """Whether the labels may be stale, without loading the players"""
+        saved = getattr(self, "_saved_players", None)
+        return not self.full_label or saved != (self.player1_id, self.player2_id)
+
+    def sync_tournament(self, context: Optional[ValidationContext] = None):
+        """Copy the tournament of the team's group onto the team"""
+        groups = context.tournament_groups if context else None
+        self.tournament_id = _from_context(groups, self, "tournament_group").tournament_id
+
+    def sync_labels(self):
+        """Rebuild the display labels from the players' first names"""
+        self.short_label, self.full_label = self.labels_for(
+            self.player1.first_name, self.player2.first_name
+        )
+
+    @staticmethod
+    def labels_for(first1: str, first2: str) -> Tuple[str, str]:
+        """The short and full labels of a team of players with these first names"""
+        return f"{first1[:4]}/{first2[:4]}", f"{first1}/{first2}"
 
     def __str__(self):
-        return f"{self.player1.first_name}/{self.player2.first_name}"
+        return self.full_label
 
 
 class Match(models.Model):
@@ -141,20 +320,36 @@ class Match(models.Model):
         help_text="Indicates which team retired from the match due to injury"
     )
 
-    def clean(self):
-        if self.team1.tournament_group != self.team2.tournament_group:
+    class Meta:
+        indexes = [
+            # Grid cells and duplicate checks look matches up by their teams
+            models.Index(fields=["tournament", "team1", "team2"], name="match_tournament_teams_idx"),
+            # Match results are listed newest first
+            models.Index(fields=["tournament", "-date_played"], name="match_tournament_played_idx"),
+        ]
+
+    def clean(self, context: Optional[ValidationContext] = None):
+        teams = context.teams if context else None
+        team1 = _from_context(teams, self, "team1")
+        team2 = _from_context(teams, self, "team2")
+
+        if team1.tournament_group_id != team2.tournament_group_id:
             raise ValidationError("Teams must be in the same tournament group")
 
-        if self.team1.tournament_group.tournament != self.tournament or \
-           self.team2.tournament_group.tournament != self.tournament:
+        if team1.tournament_id != self.tournament_id or team2.tournament_id != self.tournament_id:
             raise ValidationError("Teams must belong to the tournament's groups")
 
         if self.date_played:
-            if self.date_played < self.tournament.start_date:
+            tournament = _from_context(context.tournaments if context else None, self, "tournament")
+            if self.date_played < tournament.start_date:
                 raise ValidationError("Match cannot be played before tournament start date")
-            if self.tournament.end_date and self.date_played > self.tournament.end_date:
+            if tournament.end_date and self.date_played > tournament.end_date:
                 raise ValidationError("Match cannot be played after tournament end date")
 
+        self.validate_scores()
+
+    def validate_scores(self):
+        """Validate the set scores, which needs no related objects"""
         # Skip score validation for matches with retirement
         if self.retired_team:
             return
@@ -172,8 +367,8 @@ class Match(models.Model):
         if len(sets) == 2 and sets_won_team1 == sets_won_team2:
             raise ValidationError("Match must have a clear winner after two sets")
 
-    def save(self, *args, **kwargs):
-        self.clean()
+    def save(self, *args, validation_context: Optional[ValidationContext] = None, **kwargs):
+        self.clean(context=validation_context)
         super().save(*args, **kwargs)
 
     def __str__(self):
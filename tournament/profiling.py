@@ -0,0 +1,75 @@
+# tournament/profiling.py
+import io
+import os
+import pstats
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional
+from django.conf import settings
+
+PROFILE_SUFFIX = ".prof"
+SAFE_NAME = re.compile(r"^[\w.-]+\.prof$")
+
+
+@dataclass
+class ProfileFile:
+    """A saved request profile"""
+
+    name: str
+    size: int
+    created: datetime
+
+
+def profile_dir() -> str:
+    return str(getattr(settings, "PROFILE_DIR", os.path.join(settings.BASE_DIR, "profiles")))
+
+
+def profile_path(request_path: str) -> str:
+    """A new, unique file name for a profile of the given URL path"""
+    slug = re.sub(r"[^\w]+", "-", request_path).strip("-") or "root"
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    os.makedirs(profile_dir(), exist_ok=True)
+    return os.path.join(profile_dir(), f"{timestamp}-{slug[:80]}{PROFILE_SUFFIX}")
+
+
+def list_profiles() -> List[ProfileFile]:
+    """Saved profiles, newest first"""
+    try:
+        entries = list(os.scandir(profile_dir()))
+    except FileNotFoundError:
+        return []
+
+    profiles = [
+        ProfileFile(
+            name=entry.name,
+            size=entry.stat().st_size,
+            created=datetime.fromtimestamp(entry.stat().st_mtime, timezone.utc),
+        )
+        for entry in entries
+        if entry.is_file() and entry.name.endswith(PROFILE_SUFFIX)
+    ]
+    return sorted(profiles, key=lambda p: p.name, reverse=True)
+
+
+def prune_profiles():
+    """Keep only the newest PROFILE_KEEP profiles"""
+    keep = getattr(settings, "PROFILE_KEEP", 50)
+    for profile in list_profiles()[keep:]:
+        os.remove(os.path.join(profile_dir(), profile.name))
+
+
+def resolve_profile(name: str) -> Optional[str]:
+    """Full path of a saved profile, refusing anything outside the profile directory"""
+    if not SAFE_NAME.match(name):
+        return None
+    path = os.path.join(profile_dir(), name)
+    return path if os.path.isfile(path) else None
+
+
+def render_stats(path: str, limit: int = 60) -> str:
+    """Text summary of a profile sorted by cumulative time"""
+    output = io.StringIO()
+    stats = pstats.Stats(path, stream=output)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(limit)
+    return output.getvalue()
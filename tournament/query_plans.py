@@ -0,0 +1,86 @@
+# tournament/query_plans.py
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from .api import TeamAPI
+from .imports import MatchResultImporter
+from .models import Tournament, TournamentGroup, Team
+from .services import StandingsCalculator
+from .views import TournamentDetailView, TournamentGridView, TournamentHistoryView
+
+# "SCAN tournament_match" reads the whole table; "SCAN ... USING INDEX" and
+# "SEARCH ..." do not
+FULL_SCAN = re.compile(r"\bSCAN (\w+)\b(?! USING (?:COVERING )?INDEX)")
+
+
+@dataclass
+class QueryPlan:
+    """EXPLAIN QUERY PLAN output for one query a service runs"""
+
+    source: str
+    sql: str
+    plan: List[str] = field(default_factory=list)
+
+    @property
+    def full_scans(self) -> List[str]:
+        return [
+            match.group(1)
+            for line in self.plan
+            for match in [FULL_SCAN.search(line)]
+            if match and match.group(1) != "CONSTANT"
+        ]
+
+
+def explain(sql: str) -> List[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def _render(view, path: str, **kwargs) -> Callable[[], None]:
+    def render():
+        request = RequestFactory().get(path)
+        request.user = AnonymousUser()
+        view.as_view()(request, **kwargs).render()
+    return render
+
+
+def service_calls(tournament: Tournament) -> Dict[str, Callable[[], object]]:
+    """Every page and service whose queries should be index backed"""
+    tournament_groups = list(TournamentGroup.objects.filter(tournament=tournament))
+    team = Team.objects.filter(tournament=tournament).first()
+    player_id = team.player1_id if team else 0
+
+    return {
+        "grid page": _render(TournamentGridView, "/"),
+        "tournament detail": _render(
+            TournamentDetailView, f"/tournament/{tournament.id}/", tournament_id=tournament.id
+        ),
+        "tournament history": _render(TournamentHistoryView, "/tournaments/"),
+        "standings": lambda: [
+            StandingsCalculator().calculate_standings(tg) for tg in tournament_groups
+        ],
+        "teams API": lambda: TeamAPI().get_teams_by_tournament(tournament.id),
+        "previous partner API": lambda: TeamAPI().get_previous_partner(player_id),
+        "result import": lambda: MatchResultImporter(tournament),
+    }
+
+
+def collect_query_plans(tournament: Tournament) -> List[QueryPlan]:
+    """Run each service, then explain every distinct SELECT it issued"""
+    plans = []
+    seen = set()
+    for source, call in service_calls(tournament).items():
+        with CaptureQueriesContext(connection) as queries:
+            call()
+        for query in queries.captured_queries:
+            sql = query["sql"]
+            if not sql.lstrip().upper().startswith("SELECT") or sql in seen:
+                continue
+            seen.add(sql)
+            plans.append(QueryPlan(source, sql, explain(sql)))
+    return plans
@@ -0,0 +1,441 @@
+# tournament/replication.py
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import struct
+import sys
+import tempfile
+from array import array
+from contextlib import nullcontext
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from .backups import (
+    BACKUP_PAGES_PER_STEP, BACKUP_STEP_SLEEP, BackupError, GzipStream, check_integrity,
+)
+from .sqlite import copy_database, swap_database
+
+REPLICA_PREFIX = "replica/"
+SNAPSHOT_SUFFIX = ".snapshot.gz"
+PAGES_SUFFIX = ".pages.gz"
+
+# Keys sort in time order within a generation: <seq>-<timestamp><suffix>
+TIMESTAMP_FORMAT = "%Y%m%dT%H%M%S%fZ"
+
+# Bytes of page hash kept per page; 25,000 pages (100 MB) costs 400 KB
+PAGE_HASH_SIZE = 16
+
+# Header fields the backup API rewrites on every copy: the file change
+# counter, the schema cookie and the version-valid-for number. Left out
+# of page 1's hash so an idle database ships nothing; page 1 goes with
+# every segment so restored headers stay current.
+VOLATILE_HEADER = (slice(24, 28), slice(40, 44), slice(92, 96))
+
+# See https://www.sqlite.org/fileformat.html#the_write_ahead_log
+WAL_HEADER_SIZE = 32
+WAL_FRAME_HEADER_SIZE = 24
+# The low bit gives the byte order of the checksums' 32-bit words
+WAL_MAGIC = (0x377F0682, 0x377F0683)
+
+
+@dataclass(frozen=True)
+class ReplicaObject:
+    """One snapshot or page segment of a replica, parsed from its key"""
+
+    key: str
+    generation: str
+    sequence: int
+    created: datetime
+    is_snapshot: bool
+
+    @classmethod
+    def parse(cls, key: str) -> Optional["ReplicaObject"]:
+        try:
+            generation, name = key[len(REPLICA_PREFIX):].split("/")
+            for suffix, is_snapshot in ((SNAPSHOT_SUFFIX, True), (PAGES_SUFFIX, False)):
+                if name.endswith(suffix):
+                    sequence, stamp = name[:-len(suffix)].split("-")
+                    created = datetime.strptime(stamp, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+                    return cls(key, generation, int(sequence), created, is_snapshot)
+        except ValueError:
+            pass
+        return None
+
+    @property
+    def position(self) -> Tuple[str, int]:
+        return (self.generation, self.sequence)
+
+
+@dataclass
+class ShipResult:
+    key: Optional[str]
+    changed_pages: int
+    uploaded_bytes: int
+
+
+def object_key(generation: str, sequence: int, created: datetime, suffix: str) -> str:
+    return f"{REPLICA_PREFIX}{generation}/{sequence:08d}-{created.strftime(TIMESTAMP_FORMAT)}{suffix}"
+
+
+def page_size_of(path: str) -> int:
+    """Read the page size from a database file's header"""
+    with open(path, "rb") as f:
+        header = f.read(100)
+    size = int.from_bytes(header[16:18], "big")
+    # 1 stands for 65536, which doesn't fit in two bytes
+    return 65536 if size == 1 else size
+
+
+def iter_pages(path: str, page_size: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        yield from iter(lambda: f.read(page_size), b"")
+
+
+def page_hash(number: int, page: bytes) -> bytes:
+    if number == 0:
+        page = bytearray(page)
+        for field in VOLATILE_HEADER:
+            page[field] = bytes(field.stop - field.start)
+    return hashlib.blake2b(page, digest_size=PAGE_HASH_SIZE).digest()
+
+
+@dataclass(frozen=True)
+class WalPosition:
+    """The end of the last commit read from a WAL, and its running checksum"""
+
+    salts: bytes
+    page_size: int
+    frames: int
+    checksum: Tuple[int, int]
+
+
+@dataclass
+class WalScan:
+    position: WalPosition
+    # Offset of the newest committed copy of each page, by 0-based page number
+    pages: Dict[int, int]
+    # Database size in pages after the last commit, None if nothing was committed
+    page_count: Optional[int]
+
+
+def wal_checksum(data: bytes, big_endian: bool, checksum: Tuple[int, int]) -> Tuple[int, int]:
+    words = array("I", data)
+    if big_endian != (sys.byteorder == "big"):
+        words.byteswap()
+    s0, s1 = checksum
+    for index in range(0, len(words), 2):
+        s0 = (s0 + words[index] + s1) & 0xFFFFFFFF
+        s1 = (s1 + words[index + 1] + s0) & 0xFFFFFFFF
+    return s0, s1
+
+
+def wal_salts(wal_path: str) -> Optional[bytes]:
+    try:
+        with open(wal_path, "rb") as f:
+            header = f.read(WAL_HEADER_SIZE)
+    except FileNotFoundError:
+        return None
+    return header[16:24] if len(header) == WAL_HEADER_SIZE else None
+
+
+def scan_wal(wal_path: str, since: Optional[WalPosition] = None) -> Optional[WalScan]:
+    """The pages committed to the WAL after since, or from its start
+
+    Frames count until the first one whose salts or checksum don't follow
+    on, as SQLite itself reads the log. Returns None when there is no WAL,
+    or it has been restarted since since was read, as then commits may
+    have been checkpointed into the database and overwritten unseen.
+    """
+    try:
+        f = open(wal_path, "rb")
+    except FileNotFoundError:
+        return None
+    with f:
+        header = f.read(WAL_HEADER_SIZE)
+        if len(header) < WAL_HEADER_SIZE:
+            return None
+        magic, _, page_size = struct.unpack(">III", header[:12])
+        if magic not in WAL_MAGIC:
+            return None
+        big_endian = bool(magic & 1)
+        salts = header[16:24]
+        if since is None:
+            checksum = wal_checksum(header[:24], big_endian, (0, 0))
+            if checksum != struct.unpack(">II", header[24:32]):
+                return None
+            since = WalPosition(salts, page_size, 0, checksum)
+        elif salts != since.salts or page_size != since.page_size:
+            return None
+
+        scan = WalScan(since, {}, None)
+        pending: Dict[int, int] = {}
+        frames, checksum = since.frames, since.checksum
+        f.seek(WAL_HEADER_SIZE + frames * (WAL_FRAME_HEADER_SIZE + page_size))
+        while True:
+            frame_header = f.read(WAL_FRAME_HEADER_SIZE)
+            page = f.read(page_size)
+            if len(page) < page_size or frame_header[8:16] != salts:
+                break
+            checksum = wal_checksum(frame_header[:8] + page, big_endian, checksum)
+            if checksum != struct.unpack(">II", frame_header[16:24]):
+                break
+            number, commit_size = struct.unpack(">II", frame_header[:8])
+            pending[number - 1] = f.tell() - page_size
+            frames += 1
+            if commit_size:
+                scan.pages.update(pending)
+                pending.clear()
+                scan.page_count = commit_size
+                scan.position = WalPosition(salts, page_size, frames, checksum)
+    return scan
+
+
+class Replicator:
+    """Ships the pages that changed since the last tick to a backup store
+
+    Every tick reads the frames committed to the WAL since the last one
+    and uploads the newest copy of each page they hold, gzipped, as a
+    numbered segment; an idle database costs a 32 byte read. While the
+    replicator runs it keeps a connection open, so the WAL isn't deleted
+    when the app's last connection closes. When the WAL has been
+    restarted between ticks, which SQLite does once a checkpoint has
+    copied all of it into the database, the tick takes a consistent copy
+    with the backup API instead and diffs a hash of every page, reading
+    the whole database twice. The first tick of a generation, and one
+    every snapshot_every seconds after, uploads the whole file, so a
+    restore never has to replay more than that much history. Memory use
+    is one small hash per page plus one page at a time.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        store,
+        snapshot_every: float = 3600,
+        pages: int = BACKUP_PAGES_PER_STEP,
+        sleep: float = BACKUP_STEP_SLEEP,
+        workdir: Optional[str] = None,
+    ):
+        self.db_path = db_path
+        self.store = store
+        self.snapshot_every = snapshot_every
+        self.pages = pages
+        self.sleep = sleep
+        self.generation = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.sequence = 0
+        self.page_size = 0
+        self.hashes = bytearray()
+        self.last_snapshot: Optional[datetime] = None
+        self.wal_path = f"{db_path}-wal"
+        self.wal: Optional[WalPosition] = None
+        self._connection: Optional[sqlite3.Connection] = None
+        self._tmp = tempfile.TemporaryDirectory(prefix="replica_", dir=workdir)
+        self.copy_path = os.path.join(self._tmp.name, "copy.sqlite3")
+        self.segment_path = os.path.join(self._tmp.name, "segment.gz")
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+        self._tmp.cleanup()
+
+    def tick(self, now: Optional[datetime] = None) -> ShipResult:
+        now = now or datetime.now(timezone.utc)
+        snapshot_due = (
+            self.last_snapshot is None
+            or (now - self.last_snapshot).total_seconds() >= self.snapshot_every
+        )
+        if not snapshot_due and self.wal is not None:
+            scan = scan_wal(self.wal_path, self.wal)
+            if scan is not None:
+                result = self._ship_frames(now, scan)
+                if result is not None:
+                    return result
+
+        # Reopened each time, as a restore swaps in a new database file
+        if self._connection is not None:
+            self._connection.close()
+        self._connection = sqlite3.connect(self.db_path)
+        self._connection.execute("SELECT count(*) FROM sqlite_master")
+        # Read before copying: commits that land in between are in the
+        # copy and shipped again by the next tick, which does no harm
+        scan = scan_wal(self.wal_path)
+        wal = scan.position if scan is not None else None
+        copy_database(self.db_path, self.copy_path, pages=self.pages, sleep=self.sleep)
+        page_size = page_size_of(self.copy_path)
+
+        if snapshot_due or page_size != self.page_size:
+            return self._ship_snapshot(now, page_size, wal)
+        return self._ship_pages(now, wal)
+
+    def _hash_pages(self, page_size: int) -> bytearray:
+        hashes = bytearray()
+        for number, page in enumerate(iter_pages(self.copy_path, page_size)):
+            hashes += page_hash(number, page)
+        return hashes
+
+    def _ship_frames(self, now: datetime, scan: WalScan) -> Optional[ShipResult]:
+        """Ship the pages of a WAL scan, or None if the WAL restarted meanwhile"""
+        if scan.page_count is None:
+            return ShipResult(None, 0, 0)
+        if scan.position.page_size != self.page_size:
+            return None
+
+        changed = sorted(number for number in scan.pages if number < scan.page_count)
+        hashes = self.hashes[:scan.page_count * PAGE_HASH_SIZE]
+        hashes += bytes(scan.page_count * PAGE_HASH_SIZE - len(hashes))
+        with gzip.open(self.segment_path, "wb") as out, open(self.wal_path, "rb") as wal:
+            header = {"page_size": self.page_size, "page_count": scan.page_count, "pages": changed}
+            out.write(json.dumps(header).encode() + b"\n")
+            for number in changed:
+                wal.seek(scan.pages[number])
+                page = wal.read(self.page_size)
+                out.write(page)
+                hashes[number * PAGE_HASH_SIZE:(number + 1) * PAGE_HASH_SIZE] = page_hash(number, page)
+        # A restart rewrites the header before any frame, so if the salts
+        # still match, no page read above was overwritten
+        if wal_salts(self.wal_path) != scan.position.salts:
+            os.remove(self.segment_path)
+            return None
+        return self._upload_segment(now, scan.page_count, changed, hashes, wal=scan.position)
+
+    # Nothing below changes the replicator's state until the upload has
+    # succeeded, so a tick that fails can simply be tried again
+
+    def _ship_snapshot(self, now: datetime, page_size: int, wal: Optional[WalPosition]) -> ShipResult:
+        check_integrity(self.copy_path)
+        key = object_key(self.generation, self.sequence + 1, now, SNAPSHOT_SUFFIX)
+        with open(self.copy_path, "rb") as f:
+            stream = GzipStream(f)
+            self.store.upload(key, stream)
+        self.sequence += 1
+        self.page_size = page_size
+        self.hashes = self._hash_pages(page_size)
+        self.wal = wal
+        self.last_snapshot = now
+        return ShipResult(key, len(self.hashes) // PAGE_HASH_SIZE, stream.bytes_read)
+
+    def _ship_pages(self, now: datetime, wal: Optional[WalPosition]) -> ShipResult:
+        hashes = self._hash_pages(self.page_size)
+        changed = [
+            number for number in range(len(hashes) // PAGE_HASH_SIZE)
+            if hashes[number * PAGE_HASH_SIZE:(number + 1) * PAGE_HASH_SIZE]
+            != self.hashes[number * PAGE_HASH_SIZE:(number + 1) * PAGE_HASH_SIZE]
+        ]
+        page_count = len(hashes) // PAGE_HASH_SIZE
+        if not changed and page_count == len(self.hashes) // PAGE_HASH_SIZE:
+            self.wal = wal
+            return ShipResult(None, 0, 0)
+        if changed[:1] != [0]:
+            changed.insert(0, 0)
+
+        with gzip.open(self.segment_path, "wb") as out:
+            header = {"page_size": self.page_size, "page_count": page_count, "pages": changed}
+            out.write(json.dumps(header).encode() + b"\n")
+            with open(self.copy_path, "rb") as f:
+                for number in changed:
+                    f.seek(number * self.page_size)
+                    out.write(f.read(self.page_size))
+        return self._upload_segment(now, page_count, changed, hashes, wal=wal)
+
+    def _upload_segment(
+        self, now: datetime, page_count: int, changed: List[int], hashes: bytearray,
+        wal: Optional[WalPosition],
+    ) -> ShipResult:
+        key = object_key(self.generation, self.sequence + 1, now, PAGES_SUFFIX)
+        with open(self.segment_path, "rb") as f:
+            self.store.upload(key, f)
+        size = os.path.getsize(self.segment_path)
+        os.remove(self.segment_path)
+
+        self.sequence += 1
+        self.hashes = hashes
+        self.wal = wal
+        return ShipResult(key, len(changed), size)
+
+
+def list_replica(store) -> List[ReplicaObject]:
+    """Every snapshot and segment, oldest first"""
+    objects = filter(None, (ReplicaObject.parse(stored.key) for stored in store.list(REPLICA_PREFIX)))
+    return sorted(objects, key=lambda item: item.position)
+
+
+def restore_plan(objects: List[ReplicaObject], until: Optional[datetime] = None) -> List[ReplicaObject]:
+    """The newest snapshot at or before until, then its segments up to until"""
+    eligible = [item for item in objects if until is None or item.created <= until]
+    snapshots = [item for item in eligible if item.is_snapshot]
+    if not snapshots:
+        raise BackupError("No replica snapshot is old enough to restore from")
+    base = snapshots[-1]
+
+    plan = [base]
+    for item in eligible:
+        if item.generation != base.generation or item.sequence <= base.sequence:
+            continue
+        if item.sequence != plan[-1].sequence + 1:
+            raise BackupError(f"Replica segment {plan[-1].sequence + 1} of {base.generation} is missing")
+        plan.append(item)
+    return plan
+
+
+def apply_segment(fileobj: BinaryIO, dest_path: str):
+    """Write a segment's pages into the database file at dest_path"""
+    with gzip.open(fileobj, "rb") as segment:
+        header = json.loads(segment.readline())
+        page_size = header["page_size"]
+        with open(dest_path, "r+b") as dest:
+            for number in header["pages"]:
+                page = segment.read(page_size)
+                if len(page) != page_size:
+                    raise BackupError("Replica segment ends before its last page")
+                dest.seek(number * page_size)
+                dest.write(page)
+            dest.truncate(header["page_count"] * page_size)
+
+
+def restore_replica(
+    store, db_path: str, until: Optional[datetime] = None, during_swap=nullcontext,
+) -> Tuple[ReplicaObject, str]:
+    """Rebuild the database as it was at until and swap it in for db_path
+
+    Staged and swapped like restore_backup. Returns the last snapshot or
+    segment applied and the new generation token.
+    """
+    plan = restore_plan(list_replica(store), until)
+    directory = os.path.dirname(os.path.abspath(db_path))
+    with tempfile.TemporaryDirectory(prefix=".restore_", dir=directory) as tmp:
+        rebuilt = os.path.join(tmp, "replica.sqlite3")
+        download = os.path.join(tmp, "download")
+        for item in plan:
+            with open(download, "w+b") as f:
+                store.download(item.key, f)
+                f.seek(0)
+                if item.is_snapshot:
+                    with gzip.open(f, "rb") as source, open(rebuilt, "wb") as dest:
+                        shutil.copyfileobj(source, dest)
+                else:
+                    apply_segment(f, rebuilt)
+
+        os.remove(download)
+
+        check_integrity(rebuilt)
+        with during_swap():
+            return plan[-1], swap_database(rebuilt, db_path)
+
+
+def prune_replica(store, keep_since: datetime) -> List[str]:
+    """Delete replica history that no restore after keep_since can need
+
+    Everything before the newest snapshot taken at or before keep_since
+    goes; that snapshot and what follows it stay.
+    """
+    objects = list_replica(store)
+    snapshots = [item for item in objects if item.is_snapshot and item.created <= keep_since]
+    if not snapshots:
+        return []
+    keep_from = snapshots[-1].position
+    expired = [item.key for item in objects if item.position < keep_from]
+    store.delete(expired)
+    return expired
@@ -0,0 +1,52 @@
+# tournament/routers.py
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+from django.db import DEFAULT_DB_ALIAS
+
+SNAPSHOT_ALIAS = "snapshot"
+# Read-only per-season databases written by archive_seasons
+SEASON_ALIAS_PREFIX = "season_"
+
+# The alias reads in the current request or thread should use, if not default
+_read_alias: ContextVar[Optional[str]] = ContextVar("read_alias", default=None)
+
+
+@contextmanager
+def reading_from(alias: str) -> Iterator[None]:
+    """Send every read inside the block to another database alias"""
+    token = _read_alias.set(alias)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+class ReadAliasRouter:
+    """Routes reads to the alias set by reading_from
+
+    Writes always go to default, even for rows read from the other alias,
+    which is read-only.
+    """
+
+    @staticmethod
+    def _read_only(alias: Optional[str]) -> bool:
+        return alias == SNAPSHOT_ALIAS or bool(alias and alias.startswith(SEASON_ALIAS_PREFIX))
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS if _read_alias.get() else None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if all(db == DEFAULT_DB_ALIAS or self._read_only(db) for db in (obj1._state.db, obj2._state.db)):
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The snapshot is a read-only copy of default, and seasons are
+        # created with their tables by archive_seasons
+        if self._read_only(db):
+            return False
+        return None
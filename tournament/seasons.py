@@ -0,0 +1,298 @@
+# tournament/seasons.py
+import hashlib
+import io
+import os
+import shutil
+from collections import defaultdict
+from contextlib import contextmanager
+from itertools import islice
+from typing import Dict, Iterator, List
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import QuerySet
+from .backups import CHECKSUM_SUFFIX, CHUNK_SIZE, BackupError, read_bytes
+from .models import Group, Match, Player, Team, Tournament, TournamentGroup
+from .routers import SEASON_ALIAS_PREFIX, reading_from
+from .services import TournamentSummaryBuilder
+from .writes import immediate_atomic
+
+BUILD_ALIAS = "archive_build"
+SEASON_KEY_PREFIX = "seasons/"
+
+# Tables of a season file, in dependency order
+MODELS = [Group, Player, Tournament, TournamentGroup, Team, Match]
+# The rows that move out of the primary database, children first
+MOVED_MODELS = [Match, Team, TournamentGroup]
+
+COPY_BATCH_SIZE = 500
+
+
+def season_path(season: int) -> str:
+    return os.path.join(settings.SEASON_ARCHIVE_DIR, f"season_{season}.sqlite3")
+
+
+def _register(alias: str, name: str):
+    """Add a database alias at runtime, replacing any earlier one"""
+    if alias in connections.settings:
+        connections[alias].close()
+        del connections[alias]
+    default = connections.settings[DEFAULT_DB_ALIAS]
+    config = {
+        "ENGINE": default["ENGINE"],
+        "NAME": name,
+        # Opening a read-only file is cheap, and a rebuilt season is then
+        # picked up by the next request
+        "CONN_MAX_AGE": 0,
+        "OPTIONS": {"pragmas": {}},
+    }
+    connections.settings[alias] = connections.configure_settings(
+        {DEFAULT_DB_ALIAS: default, alias: config}
+    )[alias]
+
+
+def _unregister(alias: str):
+    connections[alias].close()
+    del connections[alias]
+    del connections.settings[alias]
+
+
+def season_alias(season: int) -> str:
+    """The read-only alias of a season's file, registered on first use"""
+    alias = f"{SEASON_ALIAS_PREFIX}{season}"
+    # Seasons are only ever replaced whole, by a rename
+    name = f"file:{season_path(season)}?mode=ro&immutable=1"
+    if connections.settings.get(alias, {}).get("NAME") != name:
+        _register(alias, name)
+    return alias
+
+
+@contextmanager
+def reading_tournament(tournament: Tournament) -> Iterator[None]:
+    """Send reads inside the block to wherever the tournament's teams and matches live"""
+    if tournament.archive_season is None:
+        yield
+        return
+    with reading_from(season_alias(tournament.archive_season)):
+        yield
+
+
+def _batches(iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _copy(queryset, alias: str):
+    """Insert the rows of a default-database queryset into alias, keeping ids"""
+    model = queryset.model
+    rows = queryset.using(DEFAULT_DB_ALIAS).order_by("pk").iterator(chunk_size=COPY_BATCH_SIZE)
+    for batch in _batches(rows, COPY_BATCH_SIZE):
+        model.objects.using(alias).bulk_create(batch)
+
+
+def _create_schema(connection):
+    """Create the season tables, or add the columns an older file lacks"""
+    tables = connection.introspection.table_names()
+    with connection.schema_editor() as editor:
+        for model in MODELS:
+            if model._meta.db_table not in tables:
+                editor.create_model(model)
+                continue
+            with connection.cursor() as cursor:
+                columns = {
+                    column.name
+                    for column in connection.introspection.get_table_description(cursor, model._meta.db_table)
+                }
+            for field in model._meta.local_fields:
+                if field.column not in columns:
+                    editor.add_field(model, field)
+
+
+def build_season(season: int, tournament_ids: List[int]):
+    """Write the tournaments' rows into the season's file
+
+    The file is built under a temporary name, starting from the current
+    season file if there is one, and renamed into place when complete.
+    Tournaments already in the file are replaced, so a build that was
+    interrupted can simply be run again.
+    """
+    path = season_path(season)
+    building = f"{path}.building"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if os.path.exists(path):
+        shutil.copyfile(path, building)
+    elif os.path.exists(building):
+        os.remove(building)
+
+    _register(BUILD_ALIAS, building)
+    try:
+        _create_schema(connections[BUILD_ALIAS])
+
+        with transaction.atomic(using=BUILD_ALIAS):
+            for model in [*MOVED_MODELS, Tournament]:
+                model.objects.using(BUILD_ALIAS).filter(
+                    **{"pk__in" if model is Tournament else "tournament_id__in": tournament_ids}
+                ).delete()
+
+            teams = Team.objects.using(DEFAULT_DB_ALIAS).filter(tournament_id__in=tournament_ids)
+            groups = TournamentGroup.objects.using(DEFAULT_DB_ALIAS).filter(tournament_id__in=tournament_ids)
+            # Players and groups stay in the primary database too; the
+            # season gets its own copy of those its teams refer to
+            shared = {
+                Player: {id for pair in teams.values_list("player1_id", "player2_id") for id in pair},
+                Group: set(groups.values_list("group_id", flat=True)),
+            }
+            for model, ids in shared.items():
+                present = set(model.objects.using(BUILD_ALIAS).filter(pk__in=ids).values_list("pk", flat=True))
+                _copy(model.objects.filter(pk__in=ids - present), BUILD_ALIAS)
+
+            _copy(Tournament.objects.filter(pk__in=tournament_ids), BUILD_ALIAS)
+            Tournament.objects.using(BUILD_ALIAS).update(archive_season=season)
+            for model in reversed(MOVED_MODELS):
+                _copy(model.objects.filter(tournament_id__in=tournament_ids), BUILD_ALIAS)
+    finally:
+        _unregister(BUILD_ALIAS)
+
+    os.replace(building, path)
+
+
+def archive_completed(keep: int = 1) -> Dict[int, List[Tournament]]:
+    """Move completed tournaments' groups, teams and matches to season files
+
+    The newest keep completed tournaments stay where they are, as new
+    tournaments are set up from the last one. Each tournament row stays
+    in the primary database, marked with its season, so lists and
+    navigation are unchanged. Everything runs under the write lock, so
+    nothing can change a tournament between its copy and its removal.
+    The history list's summary of each tournament is frozen onto its row
+    first, and filled in for tournaments archived before summaries were.
+    Returns the tournaments archived, by season.
+    """
+    archived = defaultdict(list)
+    builder = TournamentSummaryBuilder()
+    with immediate_atomic():
+        completed = Tournament.objects.filter(
+            status="COMPLETED", archive_season__isnull=True
+        ).order_by("-start_date", "-pk")
+        for tournament in completed[keep:]:
+            archived[tournament.start_date.year].append(tournament)
+
+        for season, tournaments in sorted(archived.items()):
+            ids = [tournament.pk for tournament in tournaments]
+            summaries = builder.summarize(tournaments)
+            build_season(season, ids)
+            for model in MOVED_MODELS:
+                model.objects.filter(tournament_id__in=ids).delete()
+            for tournament in tournaments:
+                tournament.archive_season = season
+                tournament.archive_summary = summaries[tournament.pk]
+            Tournament.objects.bulk_update(tournaments, ["archive_season", "archive_summary"])
+
+        _freeze_missing_summaries(builder)
+    return dict(archived)
+
+
+def _freeze_missing_summaries(builder: TournamentSummaryBuilder):
+    unsummarized = defaultdict(list)
+    for tournament in Tournament.objects.filter(archive_season__isnull=False, archive_summary__isnull=True):
+        unsummarized[tournament.archive_season].append(tournament)
+    for season, tournaments in unsummarized.items():
+        if not os.path.exists(season_path(season)):
+            continue
+        with reading_from(season_alias(season)):
+            summaries = builder.summarize(tournaments)
+        for tournament in tournaments:
+            tournament.archive_summary = summaries[tournament.pk]
+        Tournament.objects.bulk_update(tournaments, ["archive_summary"])
+
+
+def archived_tournaments() -> Dict[int, List[int]]:
+    """The ids of archived tournaments, by season"""
+    seasons = defaultdict(list)
+    archived = Tournament.objects.filter(archive_season__isnull=False).order_by("pk")
+    for pk, season in archived.values_list("pk", "archive_season"):
+        seasons[season].append(pk)
+    return dict(seasons)
+
+
+def archived_querysets(queryset) -> Iterator[QuerySet]:
+    """The same query against each season file, for the rows archive_seasons moved out
+
+    Exports read the primary database and then these, so archived
+    tournaments keep their groups, teams and matches. Yields nothing for
+    models that stay in the primary database.
+    """
+    if queryset.model not in MOVED_MODELS:
+        return
+    for season, ids in sorted(archived_tournaments().items()):
+        path = season_path(season)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Season file {path} is missing; restore_db downloads it")
+        yield queryset.using(season_alias(season)).filter(tournament_id__in=ids)
+
+
+def season_files() -> List[str]:
+    directory = settings.SEASON_ARCHIVE_DIR
+    if not os.path.isdir(directory):
+        return []
+    return sorted(
+        name for name in os.listdir(directory)
+        if name.startswith(SEASON_ALIAS_PREFIX) and name.endswith(".sqlite3")
+    )
+
+
+def _file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def upload_seasons(store) -> List[str]:
+    """Upload the season files the store lacks or has older copies of
+
+    Each upload has a sha256 sidecar, as full backups do, so an unchanged
+    season costs one small download. Returns the keys uploaded.
+    """
+    uploaded = []
+    for name in season_files():
+        path = os.path.join(settings.SEASON_ARCHIVE_DIR, name)
+        key = f"{SEASON_KEY_PREFIX}{name}"
+        checksum_key = f"{key}{CHECKSUM_SUFFIX}"
+        sha256 = _file_sha256(path)
+        if store.exists(checksum_key) and read_bytes(store, checksum_key).decode() == sha256:
+            continue
+        with open(path, "rb") as f:
+            store.upload(key, f)
+        store.upload(checksum_key, io.BytesIO(sha256.encode()))
+        uploaded.append(key)
+    return uploaded
+
+
+def download_seasons(store) -> List[str]:
+    """Download the season files missing from SEASON_ARCHIVE_DIR or older than the stored copy
+
+    archive_seasons rebuilds the current season's file, so a local copy is
+    kept only if it matches the stored file's sha256 sidecar. Returns the
+    paths downloaded.
+    """
+    downloaded = []
+    os.makedirs(settings.SEASON_ARCHIVE_DIR, exist_ok=True)
+    keys = {stored.key for stored in store.list(SEASON_KEY_PREFIX)}
+    for key in sorted(keys):
+        if key.endswith(CHECKSUM_SUFFIX):
+            continue
+        path = os.path.join(settings.SEASON_ARCHIVE_DIR, key[len(SEASON_KEY_PREFIX):])
+        checksum_key = f"{key}{CHECKSUM_SUFFIX}"
+        expected = read_bytes(store, checksum_key).decode() if checksum_key in keys else None
+        if os.path.exists(path) and (expected is None or _file_sha256(path) == expected):
+            continue
+        with open(f"{path}.partial", "wb") as f:
+            store.download(key, f)
+        if expected is not None and _file_sha256(f"{path}.partial") != expected:
+            os.remove(f"{path}.partial")
+            raise BackupError(f"{key} does not match its checksum")
+        os.replace(f"{path}.partial", path)
+        downloaded.append(path)
+    return downloaded
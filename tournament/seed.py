@@ -0,0 +1,398 @@
+# tournament/seed.py
+import json
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass, field
+from datetime import date
+from functools import reduce
+from itertools import chain, islice
+from operator import or_
+from typing import IO, Any, Dict, Iterable, Iterator, List, Tuple
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count, Q
+from .models import Group, Match, Player, Team, Tournament, TournamentGroup
+from .seasons import archived_querysets
+from .writes import immediate_atomic
+
+FORMAT = "tournament-seed"
+VERSION = 1
+
+# Records inserted per bulk_create, and rows fetched per export query
+BATCH_SIZE = 500
+# Natural keys per lookup query; each adds a few terms to one WHERE clause
+LOOKUP_SIZE = 100
+# Natural key to id entries kept per model while importing
+CACHE_SIZE = 10_000
+
+TOURNAMENT_KEY = ("name", "start_date")
+PLAYER_KEY = ("first_name", "last_name")
+
+
+def _prefixed(prefix: str, key: Tuple[str, ...]) -> Tuple[str, ...]:
+    return tuple(f"{prefix}__{name}" for name in key)
+
+
+# The value paths that make up each model's natural key, in file order.
+# Keys of dependent models embed the keys of what they point at, so a
+# team's key starts with its players' keys and ends with its group's.
+NATURAL_KEYS = OrderedDict([
+    (Group, ("name",)),
+    (Player, PLAYER_KEY),
+    (Tournament, TOURNAMENT_KEY),
+    (TournamentGroup, (*_prefixed("tournament", TOURNAMENT_KEY), "group__name")),
+    (Team, (
+        *_prefixed("player1", PLAYER_KEY),
+        *_prefixed("player2", PLAYER_KEY),
+        *_prefixed("tournament", TOURNAMENT_KEY),
+        "tournament_group__group__name",
+    )),
+])
+
+# Plain fields written with each record
+FIELDS = {
+    Group: (),
+    Player: (),
+    Tournament: ("end_date", "status"),
+    TournamentGroup: (),
+    Team: ("rank", "is_withdrawn"),
+    Match: (
+        "set1_team1", "set1_team2", "set2_team1", "set2_team2",
+        "set3_team1", "set3_team2", "date_played", "retired_team",
+    ),
+}
+
+LABELS = {model._meta.label_lower: model for model in FIELDS}
+ORDER = list(FIELDS)
+
+
+class SeedError(Exception):
+    """The seed data cannot be exported or loaded as it stands"""
+
+
+@dataclass
+class SeedResult:
+    """Records created and already present, by model label"""
+
+    created: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    existing: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+
+def _plain(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _key(values: Iterable[Any]) -> tuple:
+    return tuple(_plain(value) for value in values)
+
+
+def _batches(items: Iterable, size: int) -> Iterator[list]:
+    items = iter(items)
+    while batch := list(islice(items, size)):
+        yield batch
+
+
+def check_natural_keys():
+    """Raise SeedError if two rows of a model share a natural key"""
+    for model, key in NATURAL_KEYS.items():
+        # order_by() drops Meta.ordering, which would split the groups
+        duplicates = model.objects.order_by().values(*key).annotate(rows=Count("pk")).filter(rows__gt=1)
+        duplicate = next(iter(duplicates[:1]), None)
+        if duplicate:
+            values = ", ".join(str(_plain(duplicate[name])) for name in key)
+            raise SeedError(
+                f"{duplicate['rows']} {model._meta.verbose_name_plural} share the natural key ({values})"
+            )
+
+
+# Models whose natural keys appear in the keys of others
+KEYED = {Group: NATURAL_KEYS[Group], Player: PLAYER_KEY, Tournament: TOURNAMENT_KEY}
+
+
+def _related_model(model, prefix: str):
+    for name in prefix.split("__"):
+        model = model._meta.get_field(name).related_model
+    return model
+
+
+def _archived_rows(queryset, paths: Tuple[str, ...]) -> Iterator[tuple]:
+    """Rows of paths from a season file, with keys of what they point at from the primary database
+
+    Season files keep their own copies of the players, groups and
+    tournaments their rows refer to, which are not updated when those are
+    edited. Each embedded key is read as the id it points at instead, and
+    looked up a batch at a time.
+    """
+    query, targets = [], []
+    index = 0
+    while index < len(paths):
+        prefix = paths[index].rpartition("__")[0]
+        target = _related_model(queryset.model, prefix) if prefix else None
+        if target in KEYED:
+            query.append(f"{prefix}_id")
+            targets.append(target)
+            index += len(KEYED[target])
+        else:
+            query.append(paths[index])
+            targets.append(None)
+            index += 1
+
+    rows = queryset.values_list(*query).iterator(chunk_size=BATCH_SIZE)
+    for batch in _batches(rows, BATCH_SIZE):
+        keys = {}
+        for target in set(filter(None, targets)):
+            ids = {row[i] for row in batch for i, t in enumerate(targets) if t is target}
+            keys[target] = {
+                pk: key
+                for pk, *key in target.objects.using(DEFAULT_DB_ALIAS).filter(pk__in=ids)
+                .values_list("pk", *KEYED[target])
+            }
+        for row in batch:
+            values = []
+            for value, target in zip(row, targets):
+                if target is None:
+                    values.append(value)
+                elif value in keys[target]:
+                    values.extend(keys[target][value])
+                else:
+                    raise SeedError(
+                        f"An archived {queryset.model._meta.verbose_name} refers to "
+                        f"{target._meta.verbose_name} {value}, which no longer exists"
+                    )
+            yield tuple(values)
+
+
+def export_records() -> Iterator[dict]:
+    """Every tournament record in dependency order, read a batch at a time"""
+    yield {"format": FORMAT, "version": VERSION}
+    for model in ORDER:
+        label = model._meta.label_lower
+        fields = FIELDS[model]
+        if model is Match:
+            team_key = NATURAL_KEYS[Team]
+            paths = (*_prefixed("team1", team_key), *_prefixed("team2", team_key), *fields)
+            size = len(team_key)
+        else:
+            paths = (*NATURAL_KEYS[model], *fields)
+            size = len(NATURAL_KEYS[model])
+
+        rows = model.objects.order_by("pk").values_list(*paths).iterator(chunk_size=BATCH_SIZE)
+        archived = (
+            row
+            for queryset in archived_querysets(model.objects.order_by("pk"))
+            for row in _archived_rows(queryset, paths)
+        )
+        for row in chain(rows, archived):
+            record = {"model": label}
+            if model is Match:
+                record["team1"] = _key(row[:size])
+                record["team2"] = _key(row[size:2 * size])
+                values = row[2 * size:]
+            else:
+                record["key"] = _key(row[:size])
+                values = row[size:]
+            record["fields"] = {name: _plain(value) for name, value in zip(fields, values)}
+            yield record
+
+
+def export_seed(stream: IO[str]) -> Dict[str, int]:
+    """Write newline-delimited seed records to stream; returns counts by model
+
+    Runs in one transaction so every query reads the same snapshot.
+    """
+    counts = defaultdict(int)
+    with transaction.atomic():
+        check_natural_keys()
+        for record in export_records():
+            stream.write(json.dumps(record, separators=(",", ":")) + "\n")
+            if "model" in record:
+                counts[record["model"]] += 1
+    return counts
+
+
+class KeyCache:
+    """Natural key to id for one model
+
+    Missing keys are looked up a batch at a time and at most size entries
+    are kept, dropping the least recently used, so memory stays flat
+    however many rows the model has.
+    """
+
+    def __init__(self, model, size: int = CACHE_SIZE):
+        self.model = model
+        self.key = NATURAL_KEYS[model]
+        self.size = size
+        self.ids: "OrderedDict[tuple, int]" = OrderedDict()
+
+    def add(self, key: tuple, id: int):
+        self.ids[key] = id
+        self.ids.move_to_end(key)
+        while len(self.ids) > self.size:
+            self.ids.popitem(last=False)
+
+    def resolve(self, keys: Iterable[tuple]) -> Dict[tuple, int]:
+        """Ids of those keys that exist"""
+        found = {}
+        missing = []
+        for key in set(keys):
+            if key in self.ids:
+                self.ids.move_to_end(key)
+                found[key] = self.ids[key]
+            else:
+                missing.append(key)
+        for batch in _batches(missing, LOOKUP_SIZE):
+            condition = reduce(or_, (Q(**dict(zip(self.key, key))) for key in batch))
+            for *values, id in self.model.objects.filter(condition).values_list(*self.key, "pk"):
+                found[_key(values)] = id
+                self.add(_key(values), id)
+        return found
+
+
+def read_records(stream: IO[str]) -> Iterator[dict]:
+    """Parse seed lines lazily, checking the header and the model order"""
+    header = next(stream, None)
+    try:
+        header = json.loads(header) if header else {}
+    except json.JSONDecodeError:
+        header = {}
+    if not isinstance(header, dict) or header.get("format") != FORMAT:
+        raise SeedError("Not a tournament seed file")
+    if header.get("version") != VERSION:
+        raise SeedError(f"Unsupported seed version {header.get('version')}")
+
+    position = 0
+    for number, line in enumerate(stream, start=2):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            model = LABELS[record["model"]]
+        except (json.JSONDecodeError, KeyError, TypeError):
+            raise SeedError(f"Line {number} is not a tournament seed record")
+        if ORDER.index(model) < position:
+            raise SeedError(f"Line {number}: {record['model']} comes after the records that depend on it")
+        position = ORDER.index(model)
+        yield record
+
+
+class SeedLoader:
+    """Bulk insert seed records, skipping any whose natural key exists
+
+    Records are read in runs of one model, BATCH_SIZE at a time; foreign
+    keys are resolved through each model's KeyCache. Matches have no
+    natural key, so one is skipped when its tournament already has a
+    result between the same two teams.
+    """
+
+    def __init__(self, cache_size: int = CACHE_SIZE):
+        self.caches = {model: KeyCache(model, cache_size) for model in NATURAL_KEYS}
+        self.result = SeedResult()
+
+    def load(self, stream: IO[str]) -> SeedResult:
+        with immediate_atomic():
+            batch: List[dict] = []
+            for record in read_records(stream):
+                if batch and (record["model"] != batch[0]["model"] or len(batch) == BATCH_SIZE):
+                    self._load_batch(batch)
+                    batch = []
+                batch.append(record)
+            if batch:
+                self._load_batch(batch)
+        return self.result
+
+    def _ids(self, model, keys: Iterable[tuple]) -> Dict[tuple, int]:
+        keys = list(keys)
+        ids = self.caches[model].resolve(keys)
+        missing = [key for key in keys if key not in ids]
+        if missing:
+            raise SeedError(f"No {model._meta.verbose_name} with the natural key {missing[0]}")
+        return ids
+
+    def _load_batch(self, records: List[dict]):
+        label = records[0]["model"]
+        model = LABELS[label]
+        if model is Match:
+            objects = self._build_matches(records)
+        else:
+            cache = self.caches[model]
+            records = list({tuple(record["key"]): record for record in records}.values())
+            existing = cache.resolve(tuple(record["key"]) for record in records)
+            records = [record for record in records if tuple(record["key"]) not in existing]
+            self.result.existing[label] += len(existing)
+            objects = self._build(model, records)
+
+        if not objects:
+            return
+        model.objects.bulk_create(objects)
+        self.result.created[label] += len(objects)
+        if model is not Match:
+            for obj, record in zip(objects, records):
+                cache.add(tuple(record["key"]), obj.pk)
+
+    def _build(self, model, records: List[dict]) -> list:
+        keys = [tuple(record["key"]) for record in records]
+        fields = [record["fields"] for record in records]
+
+        if model is Group:
+            return [Group(name=name) for (name,) in keys]
+        if model is Player:
+            return [Player(first_name=first, last_name=last) for first, last in keys]
+        if model is Tournament:
+            return [
+                Tournament(name=name, start_date=start, **values)
+                for (name, start), values in zip(keys, fields)
+            ]
+
+        if model is TournamentGroup:
+            tournaments = self._ids(Tournament, (key[:2] for key in keys))
+            groups = self._ids(Group, (key[2:] for key in keys))
+            return [
+                TournamentGroup(tournament_id=tournaments[key[:2]], group_id=groups[key[2:]])
+                for key in keys
+            ]
+
+        tournaments = self._ids(Tournament, (key[4:6] for key in keys))
+        players = self._ids(Player, (player for key in keys for player in (key[:2], key[2:4])))
+        tournament_groups = self._ids(TournamentGroup, (key[4:] for key in keys))
+        teams = []
+        for key, values in zip(keys, fields):
+            team = Team(
+                player1_id=players[key[:2]],
+                player2_id=players[key[2:4]],
+                tournament_group_id=tournament_groups[key[4:]],
+                tournament_id=tournaments[key[4:6]],
+                **values,
+            )
+            # The key carries the first names, so labels need no player rows
+            team.short_label, team.full_label = Team.labels_for(key[0], key[2])
+            teams.append(team)
+        return teams
+
+    def _build_matches(self, records: List[dict]) -> List[Match]:
+        team_keys = [key for record in records for key in (tuple(record["team1"]), tuple(record["team2"]))]
+        teams = self._ids(Team, team_keys)
+        tournaments = self._ids(Tournament, (key[4:6] for key in team_keys))
+
+        team_ids = {teams[key] for key in team_keys}
+        played = {
+            frozenset(pair)
+            for pair in Match.objects.filter(team1_id__in=team_ids).values_list("team1_id", "team2_id")
+        }
+        matches = []
+        for record in records:
+            team1, team2 = teams[tuple(record["team1"])], teams[tuple(record["team2"])]
+            pair = frozenset((team1, team2))
+            if pair in played:
+                self.result.existing[Match._meta.label_lower] += 1
+                continue
+            played.add(pair)
+            matches.append(Match(
+                tournament_id=tournaments[tuple(record["team1"])[4:6]],
+                team1_id=team1,
+                team2_id=team2,
+                **record["fields"],
+            ))
+        return matches
+
+
+def load_seed(stream: IO[str], cache_size: int = CACHE_SIZE) -> SeedResult:
+    """Load seed records from stream in one transaction"""
+    return SeedLoader(cache_size).load(stream)
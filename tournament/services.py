@@ -1,6 +1,6 @@
 # tournament/services.py
+from collections import defaultdict
 from django.db.models import (
-    Q,
     Prefetch,
     F,
     Value,
@@ -8,10 +8,13 @@ from django.db.models import (
     Case,
     When,
     IntegerField,
+    Count,
 )
-from django.db.models.functions import Concat
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
+import time
+from .instrumentation import timed_stage
+from .metrics import recorder
 from .models import Tournament, TournamentGroup, Team, Match
 
 
@@ -128,11 +131,38 @@ class StandingsCalculator:
         self, tournament_group: TournamentGroup
     ) -> List[Dict[str, Any]]:
         """Calculate standings for a tournament group"""
-        teams = self._get_teams_with_matches(tournament_group)
+        with timed_stage("standings"):
+            teams = list(self._get_teams_with_matches(tournament_group))
+            self._attach_teams(
+                [m for team in teams for m in team.matches_as_team1 + team.matches_as_team2],
+                {team.id: team for team in teams},
+            )
+            return self._rank_teams(teams, tournament_group.tournament_id)
+
+    def calculate_standings_from(
+        self, teams: List[Team], matches: List[Match]
+    ) -> List[Dict[str, Any]]:
+        """Calculate standings for one group's teams from already loaded matches"""
+        with timed_stage("standings"):
+            teams_by_id = {team.id: team for team in teams}
+            for team in teams:
+                team.matches_as_team1 = []
+                team.matches_as_team2 = []
+            for match in matches:
+                if match.team1_id in teams_by_id:
+                    teams_by_id[match.team1_id].matches_as_team1.append(match)
+                if match.team2_id in teams_by_id:
+                    teams_by_id[match.team2_id].matches_as_team2.append(match)
+            self._attach_teams(matches, teams_by_id)
+
+            tournament_id = matches[0].tournament_id if matches else None
+            return self._rank_teams(teams, tournament_id)
+
+    def _rank_teams(self, teams: List[Team], tournament_id: int) -> List[Dict[str, Any]]:
         standings = []
 
         for team in teams:
-            stats = self._calculate_team_stats(team, tournament_group.tournament_id)
+            stats = self._calculate_team_stats(team, tournament_id)
             standings.append(stats)
 
         # Sort by points, then sets %, then games %
@@ -147,6 +177,14 @@ class StandingsCalculator:
 
         return standings
 
+    def _attach_teams(self, matches: List[Match], teams_by_id: Dict[int, Team]):
+        """Point matches at the loaded teams so reading the winner costs no query"""
+        for match in matches:
+            if match.team1_id in teams_by_id:
+                match.team1 = teams_by_id[match.team1_id]
+            if match.team2_id in teams_by_id:
+                match.team2 = teams_by_id[match.team2_id]
+
     def _get_teams_with_matches(self, tournament_group: TournamentGroup):
         """Get teams with prefetched matches"""
         return Team.objects.filter(tournament_group=tournament_group).prefetch_related(
@@ -219,95 +257,158 @@ class StandingsCalculator:
 class TournamentGridBuilder:
     """Service for building tournament grid data"""
 
+    ANNOTATED_MATCH_FIELDS = (
+        "id",
+        "team1_name",
+        "team2_name",
+        "set1_team1",
+        "set1_team2",
+        "set2_team1",
+        "set2_team2",
+        "set3_team1",
+        "set3_team2",
+        "set1_winner",
+        "set2_winner",
+        "set3_winner",
+        "match_winner",
+        "date_played",
+        "sets_won_team1",
+        "sets_won_team2",
+        "retired_team",
+    )
+
     def __init__(self):
         self.standings_calculator = StandingsCalculator()
 
     def build_grid_data(self, tournament: Tournament) -> List[Dict[str, Any]]:
-        """Build complete grid data for tournament"""
+        """Build complete grid data for tournament
+
+        Loads the groups, teams, matches and annotated results of the whole
+        tournament in four queries and splits them per group in memory, so
+        the number of queries does not grow with teams or matches.
+        """
+        start = time.perf_counter()
         tournament_groups = TournamentGroup.objects.filter(
             tournament=tournament
         ).select_related("group")
 
+        teams_by_group = defaultdict(list)
+        for team in Team.objects.filter(tournament=tournament).order_by("rank"):
+            teams_by_group[team.tournament_group_id].append(team)
+
+        group_of_team = {
+            team.id: group_id
+            for group_id, teams in teams_by_group.items()
+            for team in teams
+        }
+        matches_by_group = defaultdict(list)
+        for match in Match.objects.filter(tournament=tournament):
+            matches_by_group[group_of_team.get(match.team1_id)].append(match)
+
+        annotated_matches = self._get_annotated_matches_by_group(tournament)
+
         group_data = []
         for tournament_group in tournament_groups:
-            data = self._build_group_data(tournament_group, tournament)
+            data = self._build_group_data(
+                tournament_group,
+                teams_by_group[tournament_group.id],
+                matches_by_group[tournament_group.id],
+                annotated_matches.get(tournament_group.id, []),
+            )
             group_data.append(data)
 
+        recorder.observe("grid_build_ms", "", (time.perf_counter() - start) * 1000)
         return group_data
 
     def _build_group_data(
-        self, tournament_group: TournamentGroup, tournament: Tournament
+        self,
+        tournament_group: TournamentGroup,
+        teams: List[Team],
+        matches: List[Match],
+        annotated_matches: List[Dict[str, Any]],
     ) -> Dict[str, Any]:
         """Build data for a single group"""
-        teams = list(tournament_group.teams.all().order_by("rank"))
-
         return {
             "group": tournament_group.group,
             "teams": teams,
-            "match_grid": self._build_match_grid(teams, tournament),
-            "matches": self._get_annotated_matches(tournament_group, tournament),
-            "standings": self.standings_calculator.calculate_standings(
-                tournament_group
+            "match_grid": self._build_match_grid(teams, matches),
+            "matches": annotated_matches,
+            "standings": self.standings_calculator.calculate_standings_from(
+                teams, matches
             ),
         }
 
     def _build_match_grid(
-        self, teams: List[Team], tournament: Tournament
+        self, teams: List[Team], matches: List[Match]
     ) -> List[List]:
         """Build the match grid matrix"""
         match_grid = []
 
-        for team1 in teams:
-            row = [team1]
-            for team2 in teams:
-                if team1 == team2:
-                    row.append(None)
-                else:
-                    cell_value = self._get_grid_cell_value(team1, team2, tournament)
-                    row.append(cell_value)
-            match_grid.append(row)
+        with timed_stage("grid"):
+            matches_by_pair = {
+                (match.team1_id, match.team2_id): match for match in matches
+            }
+            for team1 in teams:
+                row = [team1]
+                for team2 in teams:
+                    if team1 == team2:
+                        row.append(None)
+                    else:
+                        cell_value = self._get_grid_cell_value(team1, team2, matches_by_pair)
+                        row.append(cell_value)
+                match_grid.append(row)
 
         return match_grid
 
     def _get_grid_cell_value(
-        self, team1: Team, team2: Team, tournament: Tournament
+        self, team1: Team, team2: Team, matches_by_pair: Dict[tuple, Match]
     ) -> Any:
         """Get value for a grid cell"""
         if team2.is_withdrawn:
             return "W"
 
-        try:
-            match = Match.objects.get(
-                Q(team1=team1, team2=team2) | Q(team1=team2, team2=team1),
-                tournament=tournament,
-            )
-            score = match.get_score().split("-")
-            return int(score[0]) if match.team1 == team1 else int(score[1])
-        except Match.DoesNotExist:
+        match = matches_by_pair.get((team1.id, team2.id)) or matches_by_pair.get(
+            (team2.id, team1.id)
+        )
+        if match is None:
             return " "
 
+        score = match.get_score().split("-")
+        return int(score[0]) if match.team1_id == team1.id else int(score[1])
+
     def _get_annotated_matches(
         self, tournament_group: TournamentGroup, tournament: Tournament
     ):
         """Get matches with annotations for display"""
-        return (
-            Match.objects.filter(
-                tournament=tournament, team1__tournament_group=tournament_group
+        # Evaluated here rather than lazily in the template so the query is
+        # attributed to this stage
+        with timed_stage("matches"):
+            return list(
+                self._annotated_matches_queryset(tournament).filter(
+                    team1__tournament_group=tournament_group
+                )
             )
+
+    def _get_annotated_matches_by_group(
+        self, tournament: Tournament
+    ) -> Dict[int, List[Dict[str, Any]]]:
+        """Annotated matches for every group of the tournament in one query"""
+        matches_by_group = defaultdict(list)
+        with timed_stage("matches"):
+            for match in self._annotated_matches_queryset(tournament).values(
+                "team1__tournament_group_id", *self.ANNOTATED_MATCH_FIELDS
+            ):
+                group_id = match.pop("team1__tournament_group_id")
+                matches_by_group[group_id].append(match)
+        return matches_by_group
+
+    def _annotated_matches_queryset(self, tournament: Tournament):
+        return (
+            Match.objects.filter(tournament=tournament)
             .order_by("-date_played")
             .annotate(
-                team1_name=Concat(
-                    F("team1__player1__first_name"),
-                    Value("/"),
-                    F("team1__player2__first_name"),
-                    output_field=CharField(),
-                ),
-                team2_name=Concat(
-                    F("team2__player1__first_name"),
-                    Value("/"),
-                    F("team2__player2__first_name"),
-                    output_field=CharField(),
-                ),
+                team1_name=F("team1__full_label"),
+                team2_name=F("team2__full_label"),
                 set1_winner=Case(
                     # For retirement matches, no set winners (avoid highlighting scores)
                     When(retired_team__isnull=False, then=Value("none")),
@@ -393,23 +494,90 @@ class TournamentGridBuilder:
                     output_field=CharField(),
                 ),
             )
-            .values(
-                "id",
-                "team1_name",
-                "team2_name",
-                "set1_team1",
-                "set1_team2",
-                "set2_team1",
-                "set2_team2",
-                "set3_team1",
-                "set3_team2",
-                "set1_winner",
-                "set2_winner",
-                "set3_winner",
-                "match_winner",
-                "date_played",
-                "sets_won_team1",
-                "sets_won_team2",
-                "retired_team",
-            )
+            .values(*self.ANNOTATED_MATCH_FIELDS)
         )
+
+
+class TournamentSummaryBuilder:
+    """Service for the summary columns of the tournament history list"""
+
+    COUNTED_MODELS = {"groups": TournamentGroup, "teams": Team, "matches": Match}
+
+    def __init__(self):
+        self.standings_calculator = StandingsCalculator()
+
+    def build_summaries(self, tournaments: List[Tournament]) -> Dict[int, Dict[str, Any]]:
+        """Groups, teams, matches played and group winners of each tournament
+
+        Archived tournaments use the summary frozen when they were archived,
+        as their rows are no longer in this database. The rest cost three
+        counting queries, plus one for the teams and one for the matches of
+        those that are completed, however many tournaments are listed.
+        """
+        summaries = {
+            tournament.pk: tournament.archive_summary
+            for tournament in tournaments
+            if tournament.archive_summary is not None
+        }
+        summaries.update(self.summarize(
+            [tournament for tournament in tournaments if tournament.archive_season is None]
+        ))
+        return summaries
+
+    def summarize(self, tournaments: List[Tournament]) -> Dict[int, Dict[str, Any]]:
+        """Count and rank the tournaments' rows in the database being read"""
+        if not tournaments:
+            return {}
+        summaries = {}
+        with timed_stage("summaries"):
+            for tournament in tournaments:
+                summaries[tournament.pk] = {
+                    **{key: 0 for key in self.COUNTED_MODELS}, "winners": [],
+                }
+            for key, model in self.COUNTED_MODELS.items():
+                counts = (
+                    model.objects.filter(tournament__in=tournaments)
+                    .values("tournament_id")
+                    .annotate(count=Count("pk"))
+                    .order_by()
+                )
+                for row in counts:
+                    summaries[row["tournament_id"]][key] = row["count"]
+
+            completed = [tournament.pk for tournament in tournaments if tournament.status == "COMPLETED"]
+            for tournament_id, winners in self.group_winners(completed).items():
+                summaries[tournament_id]["winners"] = winners
+        return summaries
+
+    def group_winners(self, tournament_ids: List[int]) -> Dict[int, List[Dict[str, str]]]:
+        """The top team of each group's standings, for several tournaments at once"""
+        if not tournament_ids:
+            return {}
+        teams_by_group = defaultdict(list)
+        for team in Team.objects.filter(tournament_id__in=tournament_ids).select_related(
+            "tournament_group__group"
+        ).order_by("rank"):
+            teams_by_group[team.tournament_group_id].append(team)
+        group_of_team = {
+            team.id: group_id
+            for group_id, teams in teams_by_group.items()
+            for team in teams
+        }
+        matches_by_group = defaultdict(list)
+        for match in Match.objects.filter(tournament_id__in=tournament_ids):
+            matches_by_group[group_of_team.get(match.team1_id)].append(match)
+
+        winners = defaultdict(list)
+        for group_id, teams in sorted(
+            teams_by_group.items(), key=lambda item: item[1][0].tournament_group.group.name
+        ):
+            standings = self.standings_calculator.calculate_standings_from(
+                teams, matches_by_group[group_id]
+            )
+            if standings and standings[0]["matches_played"]:
+                tournament_group = teams[0].tournament_group
+                winners[tournament_group.tournament_id].append({
+                    "group": tournament_group.group.name,
+                    "team": standings[0]["team"].full_label,
+                })
+        return winners
@@ -0,0 +1,115 @@
+# tournament/sqlite.py
+import os
+import sqlite3
+import time
+from typing import Any, Callable, Dict, Mapping, Optional
+
+# Applied to every new connection, in this order. journal_mode comes first
+# because it decides how the rest behave; WAL lets readers carry on while
+# a worker writes, and synchronous=NORMAL is durable enough with WAL.
+TUNED_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    # Negative sizes are KiB, so about 16 MiB of page cache per connection
+    "cache_size": -16000,
+    "mmap_size": 64 * 1024 * 1024,
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,
+}
+
+
+def apply_pragmas(connection: sqlite3.Connection, pragmas: Mapping[str, Any]):
+    """Run each PRAGMA on a freshly opened connection"""
+    for name, value in pragmas.items():
+        if not name.replace("_", "").isalnum():
+            raise ValueError(f"Invalid pragma name {name!r}")
+        connection.execute(f"PRAGMA {name} = {value}")
+
+
+def read_pragmas(connection: sqlite3.Connection, names) -> Dict[str, Any]:
+    return {name: connection.execute(f"PRAGMA {name}").fetchone()[0] for name in names}
+
+
+def copy_database(
+    source_path: str,
+    dest_path: str,
+    pages: int = -1,
+    sleep: float = 0.25,
+    progress: Optional[Callable[[int, int, int], object]] = None,
+):
+    """Copy a database with SQLite's online backup API
+
+    Unlike copying the file, this includes commits still in the WAL and
+    is safe while other processes use either database. With pages set,
+    the copy runs that many pages per step and sleeps between steps, so
+    writers get the database back in between; a write during the copy
+    makes SQLite restart it.
+    """
+    source = sqlite3.connect(source_path)
+    dest = sqlite3.connect(dest_path)
+    try:
+        source.backup(dest, pages=pages, sleep=sleep, progress=progress)
+    finally:
+        dest.close()
+        source.close()
+
+
+def generation_path(db_path: str) -> str:
+    return f"{db_path}.generation"
+
+
+def read_generation(db_path: str) -> str:
+    """The token bump_generation last wrote for db_path, or "" if none"""
+    try:
+        with open(generation_path(db_path)) as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return ""
+
+
+def bump_generation(db_path: str) -> str:
+    """Record that db_path was replaced, so processes know to reconnect"""
+    token = str(time.time_ns())
+    path = generation_path(db_path)
+    with open(f"{path}.tmp", "w") as f:
+        f.write(token)
+    os.replace(f"{path}.tmp", path)
+    return token
+
+
+def swap_database(new_path: str, db_path: str, attempts: int = 5) -> str:
+    """Atomically replace db_path with the database at new_path
+
+    new_path must be on the same filesystem. The live WAL is checkpointed
+    first, then the write lock is taken and held across the rename, so no
+    commit lands in the old WAL between the two and the new file never
+    picks up frames written for the old one; the old WAL files are removed
+    after. A writer still on the old file waits for the lock and then
+    commits to a file no one reads again, so callers with workers running
+    should drain them first, as maintenance_mode does. Connections already
+    open keep reading the old file until they reconnect; the returned
+    generation token tells them to.
+    """
+    if os.path.exists(db_path):
+        connection = sqlite3.connect(db_path, isolation_level=None)
+        try:
+            for _ in range(attempts):
+                connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+                connection.execute("BEGIN IMMEDIATE")
+                # A commit between the checkpoint and the lock refills the WAL
+                if not os.path.exists(f"{db_path}-wal") or os.path.getsize(f"{db_path}-wal") == 0:
+                    break
+                connection.execute("ROLLBACK")
+            else:
+                raise sqlite3.OperationalError(f"{db_path} kept being written to during the swap")
+            os.replace(new_path, db_path)
+        finally:
+            connection.close()
+    else:
+        os.replace(new_path, db_path)
+    for suffix in ("-wal", "-shm"):
+        try:
+            os.remove(f"{db_path}{suffix}")
+        except FileNotFoundError:
+            pass
+    return bump_generation(db_path)
@@ -0,0 +1,264 @@
+# tournament/static_history.py
+import functools
+import hashlib
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import FileResponse, HttpRequest
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from whitenoise.compress import Compressor
+from .models import Match, Team, Tournament, TournamentGroup
+from .seasons import reading_tournament
+from .views import TournamentDetailView
+
+EXPORT_DIR = "history"
+MANIFEST_NAME = "manifest.json"
+
+# Length of the version in file names; WHITENOISE_IMMUTABLE_FILE_TEST
+# matches it, so these files are served with far-future caching
+HASH_LENGTH = 12
+
+TEMPLATE_DIR = Path(__file__).resolve().parent / "templates"
+
+# Every field of a tournament's pages, in a fixed order
+TOURNAMENT_FIELDS = ("pk", "name", "start_date", "end_date", "status")
+VERSION_FIELDS = {
+    TournamentGroup: ("pk", "group__name"),
+    Team: ("pk", "tournament_group_id", "rank", "is_withdrawn", "short_label", "full_label"),
+    Match: (
+        "pk", "team1_id", "team2_id", "set1_team1", "set1_team2", "set2_team1", "set2_team2",
+        "set3_team1", "set3_team2", "date_played", "retired_team",
+    ),
+}
+
+
+@dataclass
+class ExportResult:
+    written: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    removed: List[str] = field(default_factory=list)
+
+
+def export_root() -> str:
+    return os.path.join(settings.STATIC_ROOT, EXPORT_DIR)
+
+
+def _digest(*parts) -> str:
+    sha256 = hashlib.sha256()
+    for part in parts:
+        sha256.update(part if isinstance(part, bytes) else repr(part).encode())
+        sha256.update(b"\x00")
+    return sha256.hexdigest()
+
+
+def tournament_rows_version(tournament_id: int) -> str:
+    """A version of the tournament row a page shows, read by primary key
+
+    It changes when the tournament is renamed, reopened or deleted, which
+    can happen without an export.
+    """
+    return _digest(*Tournament.objects.filter(pk=tournament_id).values_list(*TOURNAMENT_FIELDS))
+
+
+def site_version() -> str:
+    """A version of the templates and collected static files the pages are rendered with"""
+    paths = sorted(path for path in TEMPLATE_DIR.rglob("*") if path.is_file())
+    manifest = Path(settings.STATIC_ROOT) / "staticfiles.json"
+    if manifest.exists():
+        paths.append(manifest)
+    return _digest(*((path.name, path.read_bytes()) for path in paths))
+
+
+def tournament_data_version(tournament: Tournament) -> str:
+    """A version of the groups, teams and matches on a tournament's page"""
+    with reading_tournament(tournament):
+        return _digest(*(
+            row
+            for model, fields in VERSION_FIELDS.items()
+            for row in model.objects.filter(tournament=tournament).order_by("pk").values_list(*fields)
+        ))
+
+
+def _render(view, **kwargs):
+    """Render a view as it would answer an anonymous GET, returning its response"""
+    request = HttpRequest()
+    request.method = "GET"
+    response = view.as_view()(request, **kwargs)
+    response.render()
+    return response
+
+
+def _detail_data(context) -> Dict[str, Any]:
+    tournament = context["tournament"]
+    return {
+        "tournament": {
+            "id": tournament.pk,
+            "name": tournament.name,
+            "start_date": tournament.start_date,
+            "end_date": tournament.end_date,
+            "status": tournament.status,
+        },
+        "groups": [
+            {
+                "name": data["group"].name,
+                "standings": [
+                    {**{key: value for key, value in stats.items() if key != "team"},
+                     "team": {"id": stats["team"].pk, "label": stats["team"].full_label}}
+                    for stats in data["standings"]
+                ],
+                "matches": data["matches"],
+            }
+            for data in context["group_data"]
+        ],
+    }
+
+
+def _remove(path: str, suffixes=("", ".gz", ".br")):
+    for suffix in suffixes:
+        if os.path.exists(f"{path}{suffix}"):
+            os.remove(f"{path}{suffix}")
+
+
+def _write(name: str, content: bytes, compressor: Compressor):
+    """Write one exported file, and the compressed copies WhiteNoise serves"""
+    path = os.path.join(export_root(), name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f"{path}.partial", "wb") as f:
+        f.write(content)
+    os.replace(f"{path}.partial", path)
+    # Copies that would not be smaller are skipped, so clear any old ones
+    _remove(path, (".gz", ".br"))
+    list(compressor.compress(path))
+
+
+def read_manifest() -> Dict[str, Any]:
+    path = os.path.join(export_root(), MANIFEST_NAME)
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"pages": {}}
+
+
+def export_static_history(force: bool = False) -> ExportResult:
+    """Render the page of every completed tournament to static files
+
+    Each page is written as HTML and JSON named by its version, under
+    STATIC_ROOT/history, and recorded in manifest.json by URL. A page whose
+    version matches the manifest is left alone, so a run after one match
+    changes renders that tournament's page and nothing else; force renders
+    everything. Files of pages that changed or went away are deleted once
+    the new manifest is in place.
+
+    The history page is not exported: it lists every tournament, so
+    checking that an export of it is current costs more than the
+    paginated live view.
+    """
+    result = ExportResult()
+    previous = read_manifest()["pages"]
+    site = site_version()
+    compressor = Compressor(quiet=True)
+
+    pages = {}
+    for tournament in Tournament.objects.filter(status="COMPLETED").order_by("start_date", "pk"):
+        pages[reverse("tournament_detail", args=[tournament.pk])] = (
+            tournament_rows_version(tournament.pk),
+            _digest(site, tournament_data_version(tournament)),
+            TournamentDetailView,
+            {"tournament_id": tournament.pk},
+            f"tournament/{tournament.pk}",
+            _detail_data,
+        )
+
+    manifest = {}
+    for url, (rows, content, view, kwargs, stem, data) in pages.items():
+        version = _digest(rows, content)
+        entry = previous.get(url)
+        if entry and entry["version"] == version and not force:
+            manifest[url] = entry
+            result.unchanged += 1
+            continue
+        response = _render(view, **kwargs)
+        entry = {
+            "version": version,
+            "tournaments": rows,
+            "html": f"{stem}.{version[:HASH_LENGTH]}.html",
+            "json": f"{stem}.{version[:HASH_LENGTH]}.json",
+        }
+        _write(entry["html"], response.content, compressor)
+        _write(
+            entry["json"],
+            json.dumps(data(response.context_data), cls=DjangoJSONEncoder, separators=(",", ":")).encode(),
+            compressor,
+        )
+        manifest[url] = entry
+        result.written.append(url)
+
+    _write(MANIFEST_NAME, json.dumps({"pages": manifest}, indent=1).encode(), compressor)
+
+    kept = {entry[kind] for entry in manifest.values() for kind in ("html", "json")}
+    for url, entry in previous.items():
+        stale = [entry[kind] for kind in ("html", "json") if entry[kind] not in kept]
+        for name in stale:
+            _remove(os.path.join(export_root(), name))
+        if url not in manifest:
+            result.removed.append(url)
+    return result
+
+
+# Each worker keeps the parsed manifest until the file changes
+_manifest_cache: Dict[str, Tuple[Tuple[int, int], Dict[str, Any]]] = {}
+
+
+def _cached_manifest() -> Optional[Dict[str, Any]]:
+    path = os.path.join(export_root(), MANIFEST_NAME)
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    changed = (stat.st_mtime_ns, stat.st_size)
+    cached = _manifest_cache.get(path)
+    if cached is None or cached[0] != changed:
+        cached = _manifest_cache[path] = (changed, read_manifest()["pages"])
+    return cached[1]
+
+
+def prefer_export(view):
+    """Answer with the exported page for the URL, if there is a current one
+
+    An exported page is used while its tournament row is the one it was
+    exported with, which costs one query by primary key instead of the
+    page's own. A tournament reopened is rendered live at once; changes to
+    a completed tournament's teams and matches are picked up by the next
+    export_static_history run.
+    """
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD") or request.GET:
+            return view(request, *args, **kwargs)
+        entry = (_cached_manifest() or {}).get(request.path)
+        if entry is None or entry["tournaments"] != tournament_rows_version(kwargs["tournament_id"]):
+            return view(request, *args, **kwargs)
+        try:
+            file = open(os.path.join(export_root(), entry["html"]), "rb")
+        except FileNotFoundError:
+            # Removed by an export that ran after the manifest was read
+            return view(request, *args, **kwargs)
+        etag = f'"{entry["version"][:HASH_LENGTH]}"'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            file.close()
+            return not_modified
+        response = FileResponse(file, content_type="text/html; charset=utf-8")
+        response["ETag"] = etag
+        # The URL stays the same when the page changes, so check each time
+        response["Cache-Control"] = "no-cache"
+        return response
+
+    return wrapper
@@ -0,0 +1,167 @@
+# tournament/synthetic.py
+import itertools
+import random
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+from django.db import transaction
+from .models import Tournament, Player, Group, TournamentGroup, Team, Match
+
+
+FIRST_NAMES = [
+    "Alice", "Beth", "Cara", "Dana", "Erin", "Fay", "Gina", "Hana", "Iris",
+    "Jade", "Kate", "Lena", "Maya", "Nina", "Olga", "Pia", "Rosa", "Sara",
+    "Tess", "Uma", "Vera", "Wren", "Yara", "Zoe",
+]
+LAST_NAMES = [
+    "Adams", "Baker", "Clark", "Davies", "Evans", "Fisher", "Green", "Hughes",
+    "Jones", "King", "Lewis", "Moore", "Parker", "Roberts", "Smith", "Taylor",
+    "Walker", "White", "Wood", "Young",
+]
+
+
+@dataclass
+class SyntheticConfig:
+    """Shape of a synthetic dataset"""
+
+    tournaments: int = 1
+    min_groups: int = 2
+    max_groups: int = 7
+    teams_per_group: int = 6
+    # Share of each group's round-robin that has been played
+    completion: float = 1.0
+    retirement_rate: float = 0.05
+    withdrawal_rate: float = 0.05
+    seed: Optional[int] = None
+
+
+class SyntheticDataGenerator:
+    """Generate realistic tournaments with bulk inserts
+
+    Tournaments run back to back, one a quarter, ending with the most recent
+    one still ongoing. The same pool of players is reused across
+    tournaments, as it is in the real league.
+    """
+
+    def __init__(self, config: SyntheticConfig):
+        if not 2 <= config.min_groups <= config.max_groups <= 7:
+            raise ValueError("Groups per tournament must be between 2 and 7")
+        if config.teams_per_group < 2:
+            raise ValueError("Each group needs at least 2 teams")
+        self.config = config
+        self.random = random.Random(config.seed)
+
+    @transaction.atomic
+    def generate(self, name_prefix: str = "Synthetic") -> List[Tournament]:
+        config = self.config
+        players = self._create_players(config.max_groups * config.teams_per_group * 2)
+        groups = self._get_groups(config.max_groups)
+
+        first_start = date.today() - timedelta(weeks=13 * (config.tournaments - 1))
+        tournaments = []
+        for index in range(config.tournaments):
+            start_date = first_start + timedelta(weeks=13 * index)
+            is_last = index == config.tournaments - 1
+            tournaments.append(Tournament(
+                name=f"{name_prefix} {start_date:%Y-%m} #{index + 1}",
+                start_date=start_date,
+                end_date=None if is_last else start_date + timedelta(weeks=12),
+                status="ONGOING" if is_last else "COMPLETED",
+            ))
+        tournaments = Tournament.objects.bulk_create(tournaments)
+
+        tournament_groups = TournamentGroup.objects.bulk_create([
+            TournamentGroup(tournament=tournament, group=group)
+            for tournament in tournaments
+            for group in self.random.sample(
+                groups, self.random.randint(config.min_groups, config.max_groups)
+            )
+        ])
+
+        teams = []
+        tournament_by_id = {tournament.id: tournament for tournament in tournaments}
+        for tournament in tournaments:
+            own_groups = [tg for tg in tournament_groups if tg.tournament_id == tournament.id]
+            pool = self.random.sample(players, len(own_groups) * config.teams_per_group * 2)
+            pairs = iter(zip(pool[::2], pool[1::2]))
+            for tournament_group in own_groups:
+                for rank in range(1, config.teams_per_group + 1):
+                    player1, player2 = next(pairs)
+                    team = Team(
+                        player1=player1,
+                        player2=player2,
+                        tournament_group=tournament_group,
+                        tournament=tournament,
+                        rank=rank,
+                        is_withdrawn=self.random.random() < config.withdrawal_rate,
+                    )
+                    team.sync_labels()
+                    teams.append(team)
+        teams = Team.objects.bulk_create(teams)
+
+        matches = []
+        teams_by_group = itertools.groupby(teams, key=lambda team: team.tournament_group_id)
+        group_by_id = {tg.id: tg for tg in tournament_groups}
+        for group_id, group_teams in teams_by_group:
+            tournament = tournament_by_id[group_by_id[group_id].tournament_id]
+            for team1, team2 in itertools.combinations(list(group_teams), 2):
+                if self.random.random() < config.completion:
+                    matches.append(self._build_match(tournament, team1, team2))
+        Match.objects.bulk_create(matches, batch_size=500)
+
+        return tournaments
+
+    def _create_players(self, count: int) -> List[Player]:
+        names = itertools.product(LAST_NAMES, FIRST_NAMES)
+        players = []
+        for index in range(count):
+            last_name, first_name = next(names, (f"Player{index}", f"P{index}"))
+            players.append(Player(first_name=first_name, last_name=last_name))
+        return Player.objects.bulk_create(players)
+
+    def _get_groups(self, count: int) -> List[Group]:
+        groups = list(Group.objects.order_by("id")[:count])
+        missing = [
+            Group(name=f"Synthetic Group {index}")
+            for index in range(len(groups) + 1, count + 1)
+        ]
+        Group.objects.bulk_create(missing, ignore_conflicts=True)
+        if missing:
+            groups = list(Group.objects.order_by("id")[:count])
+        return groups
+
+    def _build_match(self, tournament: Tournament, team1: Team, team2: Team) -> Match:
+        last_day = tournament.end_date or date.today()
+        span = max((last_day - tournament.start_date).days, 0)
+        date_played = tournament.start_date + timedelta(days=self.random.randint(0, span))
+
+        if self.random.random() < self.config.retirement_rate:
+            return Match(
+                tournament=tournament, team1=team1, team2=team2,
+                set1_team1=0, set1_team2=0, set2_team1=0, set2_team2=0,
+                date_played=date_played,
+                retired_team=self.random.choice(["team1", "team2"]),
+            )
+
+        team1_wins = self.random.random() < 0.5
+        if self.random.random() < 0.3:
+            # Three sets, the loser takes the middle one
+            winners = [team1_wins, not team1_wins, team1_wins]
+        else:
+            winners = [team1_wins, team1_wins]
+
+        sets = [self._set_score(team1_won) for team1_won in winners]
+        third_set = sets[2] if len(sets) == 3 else (None, None)
+        return Match(
+            tournament=tournament, team1=team1, team2=team2,
+            set1_team1=sets[0][0], set1_team2=sets[0][1],
+            set2_team1=sets[1][0], set2_team2=sets[1][1],
+            set3_team1=third_set[0], set3_team2=third_set[1],
+            date_played=date_played,
+        )
+
+    def _set_score(self, team1_won: bool) -> Tuple[int, int]:
+        winner, loser = self.random.choice(
+            [(6, 0), (6, 1), (6, 2), (6, 3), (6, 4), (7, 5), (7, 6)]
+        )
+        return (winner, loser) if team1_won else (loser, winner)
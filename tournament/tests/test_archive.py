@@ -0,0 +1,99 @@
+import io
+import os
+import tempfile
+from django.test import TestCase
+from tournament.archive import NULL, Archive, ArchiveError, export_archive, load_archive
+from tournament.models import Match, Team, Tournament
+from tournament.seed import export_seed
+from tournament.synthetic import SyntheticConfig, SyntheticDataGenerator
+from tournament.tests.test_seed import MODELS, snapshot
+
+
+class ArchiveTest(TestCase):
+    def setUp(self):
+        config = SyntheticConfig(
+            tournaments=2, min_groups=2, max_groups=3, teams_per_group=4, retirement_rate=0.3, seed=5
+        )
+        SyntheticDataGenerator(config).generate("Archive")
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = os.path.join(tmp.name, "history.tda")
+
+    def clear(self):
+        for model in reversed(MODELS):
+            model.objects.all().delete()
+
+    def test_round_trip_keeps_rows_and_ids(self):
+        before = snapshot()
+        ids = sorted(Match.objects.values_list("id", "team1_id", "team2_id"))
+        export_archive(self.path)
+        self.clear()
+
+        counts = load_archive(self.path)
+
+        self.assertEqual(snapshot(), before)
+        self.assertEqual(sorted(Match.objects.values_list("id", "team1_id", "team2_id")), ids)
+        self.assertEqual(counts["matches"], len(ids))
+        # New rows carry on after the archived ids
+        last_id = max(Tournament.objects.values_list("pk", flat=True))
+        self.assertGreater(Tournament.objects.create(name="Next", start_date="2030-01-01").pk, last_id)
+
+    def test_columns_are_typed_views_of_the_file(self):
+        export_archive(self.path)
+        match = Match.objects.order_by("pk").first()
+        retired = Match.objects.exclude(retired_team=None).order_by("pk").first()
+        set1_total = sum(Match.objects.values_list("set1_team1", flat=True))
+        unretired = Match.objects.filter(retired_team=None).count()
+
+        with self.assertNumQueries(0), Archive(self.path) as archive:
+            set1 = archive.column("matches", "set1_team1")
+            self.assertIsInstance(set1, memoryview)
+            self.assertEqual((set1.format, set1.itemsize), ("b", 1))
+            self.assertEqual(archive.column("matches", "id")[0], match.pk)
+            self.assertEqual(set1[0], match.set1_team1)
+            self.assertEqual(sum(set1), set1_total)
+
+            retired_codes = archive.column("matches", "retired_team")
+            self.assertEqual(list(retired_codes).count(NULL), unretired)
+            record = next(r for r in archive.records("matches") if r["id"] == retired.pk)
+            self.assertEqual(record["retired_team"], retired.retired_team)
+            self.assertEqual(record["date_played"], retired.date_played)
+
+        self.assertRaises(ValueError, len, set1)
+
+    def test_names_are_stored_once(self):
+        export_archive(self.path)
+
+        with Archive(self.path) as archive:
+            first_names = archive.column("players", "first_name")
+            self.assertEqual(archive.header["strings"]["count"], len(set(
+                archive.string(code) for table in ("groups", "players", "tournaments", "matches")
+                for name, entry in archive.header["tables"][table]["columns"].items()
+                if entry["type"] == "string"
+                for code in archive.column(table, name) if code != NULL
+            )))
+            self.assertLess(max(first_names), archive.header["strings"]["count"])
+
+    def test_archive_is_smaller_than_the_seed_file(self):
+        export_archive(self.path)
+        seed = io.StringIO()
+        export_seed(seed)
+
+        self.assertLess(os.path.getsize(self.path), len(seed.getvalue().encode()) / 2)
+
+    def test_loading_into_a_populated_database_needs_replace(self):
+        export_archive(self.path)
+        teams = Team.objects.count()
+
+        with self.assertRaisesMessage(ArchiveError, "not empty"):
+            load_archive(self.path)
+
+        load_archive(self.path, replace=True)
+        self.assertEqual(Team.objects.count(), teams)
+
+    def test_other_files_are_rejected(self):
+        with open(self.path, "wb") as f:
+            f.write(b'{"model": "tournament.group"}\n')
+
+        with self.assertRaisesMessage(ArchiveError, "not a tournament archive"):
+            Archive(self.path)
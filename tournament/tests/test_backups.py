@@ -0,0 +1,269 @@
+import gzip
+import hashlib
+import io
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import boto3
+from botocore.stub import Stubber
+from django.test import SimpleTestCase
+from tournament.backups import (
+    CHUNK_PREFIX, LATEST_KEY, MANIFEST_PREFIX, BackupError, GzipStream, LocalStore, S3Store,
+    backup_database, check_integrity, collect_garbage, download_ranges, incremental_backup,
+    latest_backup, list_backups, restore_backup,
+)
+from tournament.sqlite import apply_pragmas, read_generation
+
+
+def create_database(path, rows=2000):
+    connection = sqlite3.connect(path)
+    apply_pragmas(connection, {"journal_mode": "WAL", "wal_autocheckpoint": 0})
+    connection.execute("CREATE TABLE result (id INTEGER PRIMARY KEY, score TEXT)")
+    connection.executemany(
+        "INSERT INTO result (score) VALUES (?)", [(f"6-{i % 5} 6-{i % 4}",) for i in range(rows)]
+    )
+    connection.commit()
+    return connection
+
+
+def count_rows(path):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute("SELECT count(*) FROM result").fetchone()[0]
+    finally:
+        connection.close()
+
+
+class GzipStreamTest(SimpleTestCase):
+    def test_small_reads_produce_the_gzip_of_the_source(self):
+        data = os.urandom(50_000) + b"6-3 6-4 " * 20_000
+        stream = GzipStream(io.BytesIO(data), chunk_size=4096)
+
+        compressed = b"".join(iter(lambda: stream.read(1000), b""))
+
+        self.assertEqual(gzip.decompress(compressed), data)
+        self.assertEqual(stream.bytes_read, len(compressed))
+        self.assertEqual(stream.digest.hexdigest(), hashlib.sha256(compressed).hexdigest())
+
+
+class BackupTest(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = os.path.join(tmp.name, "live.sqlite3")
+        self.store = LocalStore(os.path.join(tmp.name, "bucket"))
+        self.restored_path = os.path.join(tmp.name, "restored.sqlite3")
+        # Left open so the rows stay in the WAL, as with a running app
+        self.live = create_database(self.db_path)
+        self.addCleanup(self.live.close)
+
+    def test_backup_round_trips_through_the_store(self):
+        result = backup_database(self.db_path, self.store, key="backup_test.sqlite3.gz", pages=4)
+
+        [stored] = list_backups(self.store)
+        self.assertEqual(stored.key, "backup_test.sqlite3.gz")
+        self.assertEqual(stored.size, result.compressed_bytes)
+        with open(self.store.path(stored.key), "rb") as f:
+            self.assertEqual(hashlib.sha256(f.read()).hexdigest(), result.sha256)
+
+        restore_backup(self.store, result.key, self.restored_path)
+        self.assertEqual(count_rows(self.restored_path), 2000)
+
+    def test_writers_are_not_blocked_by_a_stepped_backup(self):
+        committed = []
+
+        def write():
+            connection = sqlite3.connect(self.db_path, timeout=0.5)
+            for i in range(20):
+                connection.execute("INSERT INTO result (score) VALUES ('6-0 6-0')")
+                connection.commit()
+                committed.append(i)
+            connection.close()
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        result = backup_database(self.db_path, self.store, key="backup_busy.sqlite3.gz", pages=2, sleep=0.001)
+        writer.join()
+
+        self.assertEqual(len(committed), 20)
+        restore_backup(self.store, result.key, self.restored_path)
+        self.assertIn(count_rows(self.restored_path), range(2000, 2021))
+
+    def test_corrupt_database_is_not_uploaded(self):
+        self.live.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        with open(self.db_path, "r+b") as f:
+            f.seek(4096 * 3)
+            f.write(b"\xff" * 4096 * 4)
+
+        with self.assertRaises(BackupError):
+            backup_database(self.db_path, self.store, key="backup_bad.sqlite3.gz")
+        self.assertEqual(list(self.store.list()), [])
+
+    def test_integrity_check_rejects_a_file_that_is_not_a_database(self):
+        path = os.path.join(self.store.root, "not-a-database")
+        with open(path, "wb") as f:
+            f.write(b"not a database" * 100)
+
+        with self.assertRaisesMessage(BackupError, "not a readable database"):
+            check_integrity(path)
+
+
+class IncrementalBackupTest(SimpleTestCase):
+    CHUNK_SIZE = 8192
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = os.path.join(tmp.name, "live.sqlite3")
+        self.store = LocalStore(os.path.join(tmp.name, "bucket"))
+        self.restored_path = os.path.join(tmp.name, "restored.sqlite3")
+        self.live = create_database(self.db_path)
+        self.addCleanup(self.live.close)
+
+    def backup(self, name):
+        return incremental_backup(
+            self.db_path, self.store, key=f"{MANIFEST_PREFIX}{name}.json", chunk_size=self.CHUNK_SIZE
+        )
+
+    def test_only_changed_chunks_are_uploaded(self):
+        first = self.backup("1")
+        self.assertGreater(first.chunks, 4)
+        self.assertEqual(first.uploaded_chunks, first.chunks)
+
+        self.assertEqual(self.backup("2").uploaded_chunks, 0)
+
+        self.live.execute("UPDATE result SET score = '7-6 7-6' WHERE id = 1500")
+        self.live.commit()
+        third = self.backup("3")
+        self.assertIn(third.uploaded_chunks, (1, 2))
+
+        restore_backup(self.store, third.key, self.restored_path)
+        connection = sqlite3.connect(self.restored_path)
+        self.addCleanup(connection.close)
+        self.assertEqual(
+            connection.execute("SELECT score FROM result WHERE id = 1500").fetchone()[0], "7-6 7-6"
+        )
+
+    def test_garbage_collection_keeps_what_retained_backups_need(self):
+        self.backup("1")
+        self.live.execute("DELETE FROM result WHERE id > 1000")
+        self.live.commit()
+        second = self.backup("2")
+
+        expired, unreferenced = collect_garbage(self.store, keep=1)
+
+        self.assertEqual(expired, [f"{MANIFEST_PREFIX}1.json"])
+        self.assertTrue(unreferenced)
+        self.assertEqual(
+            len(list(self.store.list(CHUNK_PREFIX))), len(set(self.manifest_chunks(second.key)))
+        )
+        self.assertEqual(latest_backup(self.store), second.key)
+        restore_backup(self.store, second.key, self.restored_path)
+        self.assertEqual(count_rows(self.restored_path), 1000)
+
+    def test_damaged_chunk_fails_the_restore(self):
+        result = self.backup("1")
+        damaged = self.store.path(f"{CHUNK_PREFIX}{self.manifest_chunks(result.key)[0]}")
+        with open(damaged, "wb") as f:
+            f.write(gzip.compress(b"\0" * self.CHUNK_SIZE))
+
+        with self.assertRaisesMessage(BackupError, "does not match its checksum"):
+            restore_backup(self.store, result.key, self.restored_path)
+        self.assertFalse(os.path.exists(self.restored_path))
+
+    def manifest_chunks(self, key):
+        with open(self.store.path(key)) as f:
+            return json.load(f)["chunks"]
+
+
+class RestoreTest(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.db_path = os.path.join(tmp.name, "live.sqlite3")
+        self.store = LocalStore(os.path.join(tmp.name, "bucket"))
+        self.live = create_database(self.db_path)
+        self.addCleanup(self.live.close)
+
+    def delete_rows_above(self, id):
+        self.live.execute("DELETE FROM result WHERE id > ?", (id,))
+        self.live.commit()
+
+    def test_latest_pointer_names_the_last_backup(self):
+        backup_database(self.db_path, self.store, key="backup_1.sqlite3.gz")
+        incremental_backup(self.db_path, self.store, key=f"{MANIFEST_PREFIX}2.json")
+        self.assertEqual(latest_backup(self.store), f"{MANIFEST_PREFIX}2.json")
+
+        backup_database(self.db_path, self.store, key="backup_3.sqlite3.gz")
+        self.assertEqual(latest_backup(self.store), "backup_3.sqlite3.gz")
+
+        # Without the pointer the listing is used instead
+        self.store.delete([LATEST_KEY])
+        self.assertEqual(
+            [backup.key for backup in list_backups(self.store)],
+            ["backup_1.sqlite3.gz", f"{MANIFEST_PREFIX}2.json", "backup_3.sqlite3.gz"],
+        )
+
+    def test_restores_an_earlier_backup_over_the_live_database(self):
+        first = backup_database(self.db_path, self.store, key="backup_1.sqlite3.gz")
+        self.delete_rows_above(10)
+        second = incremental_backup(self.db_path, self.store, key=f"{MANIFEST_PREFIX}2.json")
+        self.delete_rows_above(5)
+        reader = sqlite3.connect(self.db_path)
+        self.addCleanup(reader.close)
+
+        generation = restore_backup(self.store, first.key, self.db_path)
+
+        self.assertEqual(read_generation(self.db_path), generation)
+        self.assertEqual(count_rows(self.db_path), 2000)
+        # A connection opened before the swap keeps the old file until it reconnects
+        self.assertEqual(reader.execute("SELECT count(*) FROM result").fetchone()[0], 5)
+
+        self.assertNotEqual(restore_backup(self.store, second.key, self.db_path, workers=2), generation)
+        self.assertEqual(count_rows(self.db_path), 10)
+
+    def test_tampered_backup_leaves_the_live_database_alone(self):
+        result = backup_database(self.db_path, self.store, key="backup_1.sqlite3.gz")
+        with open(self.store.path(result.key), "wb") as f:
+            f.write(gzip.compress(b"\0" * 4096))
+        self.delete_rows_above(10)
+
+        with self.assertRaisesMessage(BackupError, "does not match its checksum"):
+            restore_backup(self.store, result.key, self.db_path)
+        self.assertEqual(count_rows(self.db_path), 10)
+        self.assertEqual(read_generation(self.db_path), "")
+
+    def test_ranges_reassemble_the_object(self):
+        data = os.urandom(100_000)
+        self.store.upload("blob", io.BytesIO(data))
+        dest = os.path.join(self.tmp, "blob")
+
+        download_ranges(self.store, "blob", dest, part_size=7_000, workers=3)
+
+        with open(dest, "rb") as f:
+            self.assertEqual(f.read(), data)
+
+
+class S3StoreTest(SimpleTestCase):
+    def setUp(self):
+        client = boto3.client(
+            "s3", region_name="us-east-1", aws_access_key_id="test", aws_secret_access_key="test"
+        )
+        self.stubber = Stubber(client)
+        self.store = S3Store(client, "backups")
+
+    def test_read_range_asks_for_an_inclusive_byte_range(self):
+        self.stubber.add_response(
+            "get_object", {"Body": io.BytesIO(b"abc")},
+            {"Bucket": "backups", "Key": "backup_1.sqlite3.gz", "Range": "bytes=10-12"},
+        )
+        with self.stubber:
+            self.assertEqual(self.store.read_range("backup_1.sqlite3.gz", 10, 13), b"abc")
+
+    def test_exists_is_false_for_a_missing_key(self):
+        self.stubber.add_client_error("head_object", "404", http_status_code=404)
+        with self.stubber:
+            self.assertFalse(self.store.exists(LATEST_KEY))
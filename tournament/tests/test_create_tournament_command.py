@@ -0,0 +1,86 @@
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from tournament.models import Tournament, Group, TournamentGroup, Player, Team
+from datetime import date
+
+
+class CreateTournamentCommandTest(TestCase):
+    def setUp(self):
+        # Start from a clean slate so "most recent tournament" is ours
+        Tournament.objects.all().delete()
+        self.previous = Tournament.objects.create(
+            name="Previous",
+            start_date=date(2026, 1, 1),
+            status="COMPLETED",
+            end_date=date(2026, 3, 1)
+        )
+        self.groups = [
+            Group.objects.create(name=f"Clone Group {i}") for i in range(3)
+        ]
+        self.tournament_groups = [
+            TournamentGroup.objects.create(tournament=self.previous, group=group)
+            for group in self.groups
+        ]
+        self.player_count = 0
+
+    def add_teams(self, count):
+        for tournament_group in self.tournament_groups:
+            for rank in range(1, count + 1):
+                player1 = Player.objects.create(first_name=f"P{self.player_count}", last_name="A")
+                player2 = Player.objects.create(first_name=f"P{self.player_count + 1}", last_name="B")
+                self.player_count += 2
+                Team.objects.create(
+                    player1=player1, player2=player2,
+                    tournament_group=tournament_group, rank=rank
+                )
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('create_tournament', *args, stdout=out)
+        return out.getvalue()
+
+    def test_copies_groups_and_teams(self):
+        self.add_teams(2)
+
+        output = self.run_command("Next")
+
+        new_tournament = Tournament.objects.get(name="Next")
+        self.assertEqual(new_tournament.tournamentgroup_set.count(), 3)
+        new_teams = Team.objects.filter(tournament_group__tournament=new_tournament)
+        self.assertEqual(new_teams.count(), 6)
+        self.assertEqual(
+            sorted(new_teams.values_list('rank', flat=True)), [1, 1, 1, 2, 2, 2]
+        )
+        self.assertIn("Created team:", output)
+        self.assertIn("with 3 groups and 6 teams", output)
+
+    def test_query_count_does_not_grow_with_teams(self):
+        self.add_teams(1)
+        with CaptureQueriesContext(connection) as small:
+            self.run_command("Small", "--summary-only")
+
+        Tournament.objects.filter(name="Small").delete()
+        self.add_teams(5)
+        with CaptureQueriesContext(connection) as large:
+            self.run_command("Large", "--summary-only")
+
+        self.assertEqual(len(small.captured_queries), len(large.captured_queries))
+
+    def test_dry_run_saves_nothing(self):
+        self.add_teams(2)
+
+        output = self.run_command("Dry", "--dry-run")
+
+        self.assertFalse(Tournament.objects.filter(name="Dry").exists())
+        self.assertIn("Dry run: would create tournament Dry with 3 groups and 6 teams", output)
+
+    def test_summary_only_skips_per_row_output(self):
+        self.add_teams(2)
+
+        output = self.run_command("Quiet", "--summary-only")
+
+        self.assertNotIn("Created team:", output)
+        self.assertEqual(output.strip().count("\n"), 0)
@@ -0,0 +1,160 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tournament.imports import MatchResultImporter
+from tournament.models import Tournament, Group, TournamentGroup, Player, Team, Match
+from datetime import date
+
+
+CSV_HEADER = "team1,team2,set1_team1,set1_team2,set2_team1,set2_team2,set3_team1,set3_team2,date_played,retired_team\n"
+
+
+class MatchResultImporterTest(TestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(
+            name="Import Test",
+            start_date=date(2026, 4, 1)
+        )
+        group_a = Group.objects.create(name="Import Group A")
+        group_b = Group.objects.create(name="Import Group B")
+        self.group_a = TournamentGroup.objects.create(tournament=self.tournament, group=group_a)
+        self.group_b = TournamentGroup.objects.create(tournament=self.tournament, group=group_b)
+
+        names = ["Alice", "Beth", "Cara", "Dana", "Erin", "Fay"]
+        self.players = [
+            Player.objects.create(first_name=name, last_name=f"{name[0]}son")
+            for name in names
+        ]
+        self.alice_beth = Team.objects.create(
+            player1=self.players[0], player2=self.players[1], tournament_group=self.group_a
+        )
+        self.cara_dana = Team.objects.create(
+            player1=self.players[2], player2=self.players[3], tournament_group=self.group_a
+        )
+        self.erin_fay = Team.objects.create(
+            player1=self.players[4], player2=self.players[5], tournament_group=self.group_b
+        )
+
+    def row(self, **overrides):
+        row = {
+            "team1": "Alice/Beth", "team2": "Cara/Dana",
+            "set1_team1": "6", "set1_team2": "3",
+            "set2_team1": "6", "set2_team2": "4",
+            "set3_team1": "", "set3_team2": "",
+            "date_played": "2026-04-10", "retired_team": "",
+        }
+        row.update(overrides)
+        return row
+
+    def test_imports_valid_rows(self):
+        result = MatchResultImporter(self.tournament).import_rows([
+            self.row(team1="Alice Ason/Beth Bson"),
+        ])
+
+        self.assertEqual(result.errors, [])
+        match = Match.objects.get(tournament=self.tournament)
+        self.assertEqual(match.team1, self.alice_beth)
+        self.assertEqual(match.team2, self.cara_dana)
+        self.assertEqual(match.get_score(), "4-1")
+
+    def test_reports_every_invalid_row(self):
+        result = MatchResultImporter(self.tournament).import_rows([
+            self.row(team2="Erin/Fay"),
+            self.row(team1="Nobody/Here"),
+            self.row(set1_team1="6", set1_team2="6"),
+            self.row(date_played="2026-03-01"),
+            self.row(retired_team="both"),
+            self.row(set2_team1="x"),
+        ])
+
+        self.assertEqual([error.row for error in result.errors], [1, 2, 3, 4, 5, 6])
+        self.assertIn("same tournament group", result.errors[0].message)
+        self.assertFalse(Match.objects.filter(tournament=self.tournament).exists())
+
+    def test_reports_rows_that_are_not_objects(self):
+        result = MatchResultImporter(self.tournament).import_rows(
+            [["Alice/Beth", "Cara/Dana"], "Alice/Beth", None, self.row()]
+        )
+
+        self.assertEqual([error.row for error in result.errors], [1, 2, 3])
+        self.assertEqual(result.errors[0].message, "Expected an object, got list")
+        self.assertEqual(len(result.created), 1)
+
+    def test_rejects_duplicate_results(self):
+        Match.objects.create(
+            tournament=self.tournament, team1=self.alice_beth, team2=self.cara_dana,
+            set1_team1=6, set1_team2=1, set2_team1=6, set2_team2=1
+        )
+
+        result = MatchResultImporter(self.tournament).import_rows([
+            self.row(team1="Cara/Dana", team2="Alice/Beth"),
+        ])
+
+        self.assertEqual(len(result.errors), 1)
+        self.assertIn("already exists", result.errors[0].message)
+
+    def test_dry_run_saves_nothing(self):
+        result = MatchResultImporter(self.tournament).import_rows([self.row()], dry_run=True)
+
+        self.assertEqual(len(result.created), 1)
+        self.assertFalse(Match.objects.filter(tournament=self.tournament).exists())
+
+    def test_query_count_does_not_grow_with_rows(self):
+        with CaptureQueriesContext(connection) as one_row:
+            MatchResultImporter(self.tournament).import_rows([self.row()], dry_run=True)
+
+        rows = [self.row(), self.row(team1="Erin/Fay", team2="Alice/Beth")] * 20
+        with CaptureQueriesContext(connection) as many_rows:
+            MatchResultImporter(self.tournament).import_rows(rows, dry_run=True)
+
+        self.assertEqual(len(one_row.captured_queries), len(many_rows.captured_queries))
+
+    def test_command_reads_csv_and_json(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "results.csv")
+            with open(csv_path, "w") as f:
+                f.write(CSV_HEADER)
+                f.write("Alice/Beth,Cara/Dana,6,3,6,4,,,2026-04-10,\n")
+                f.write("Alice/Beth,Erin/Fay,6,3,6,4,,,2026-04-10,\n")
+
+            out = StringIO()
+            call_command("import_results", csv_path, f"--tournament={self.tournament.id}", stdout=out)
+            self.assertIn("Row 2:", out.getvalue())
+            self.assertIn("Imported 1 results", out.getvalue())
+
+            json_path = os.path.join(tmp, "results.json")
+            with open(json_path, "w") as f:
+                json.dump([self.row(team1="Erin/Fay", team2="Erin Eson/Fay Fson")], f)
+
+            out = StringIO()
+            call_command("import_results", json_path, f"--tournament={self.tournament.id}", stdout=out)
+            self.assertIn("A team cannot play itself", out.getvalue())
+
+        self.assertEqual(Match.objects.filter(tournament=self.tournament).count(), 1)
+
+    def test_admin_upload(self):
+        User.objects.create_superuser(username="admin", password="password")
+        self.client.login(username="admin", password="password")
+        changelist = self.client.get(reverse("admin:tournament_match_changelist"))
+        self.assertContains(changelist, reverse("admin:tournament_match_import"))
+
+        upload = SimpleUploadedFile(
+            "results.csv",
+            (CSV_HEADER + "Alice/Beth,Cara/Dana,6,3,3,6,7,5,2026-04-10,\n").encode(),
+        )
+        response = self.client.post(
+            reverse("admin:tournament_match_import"),
+            {"tournament": self.tournament.id, "results_file": upload},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "1 results imported, 0 rows rejected")
+        self.assertEqual(Match.objects.filter(tournament=self.tournament).count(), 1)
@@ -0,0 +1,62 @@
+from django.test import TestCase
+from tournament.instrumentation import collect_timings, current_timings, timed_stage
+from tournament.models import Tournament, Group, TournamentGroup, Player, Team
+from datetime import date
+
+
+class RequestTimingMiddlewareTest(TestCase):
+    def setUp(self):
+        Tournament.objects.filter(status='ONGOING').delete()
+        tournament = Tournament.objects.create(
+            name="Timing Tournament",
+            start_date=date.today(),
+            status="ONGOING"
+        )
+        groups = [Group.objects.create(name=f"Timing Group {i}") for i in range(2)]
+        tournament_groups = [
+            TournamentGroup.objects.create(tournament=tournament, group=group)
+            for group in groups
+        ]
+        players = [
+            Player.objects.create(first_name=f"Player{i}", last_name=f"Last{i}")
+            for i in range(4)
+        ]
+        Team.objects.create(player1=players[0], player2=players[1], tournament_group=tournament_groups[0])
+        Team.objects.create(player1=players[2], player2=players[3], tournament_group=tournament_groups[0])
+
+    def test_server_timing_header(self):
+        response = self.client.get('/')
+
+        header = response['Server-Timing']
+        metrics = [metric.split(';')[0] for metric in header.split(', ')]
+        self.assertEqual(metrics[0], 'db')
+        for name in ['template', 'grid', 'standings', 'matches', 'total']:
+            self.assertIn(name, metrics)
+        self.assertRegex(header, r'db;dur=[\d.]+;desc="\d+ queries"')
+
+    def test_logs_one_line_per_request(self):
+        with self.assertLogs('tournament.timing', level='INFO') as logs:
+            self.client.get('/tournaments/')
+
+        self.assertEqual(len(logs.output), 1)
+        self.assertRegex(
+            logs.output[0],
+            r'method=GET path=/tournaments/ status=200 total_ms=[\d.]+ queries=\d+ db_ms=[\d.]+ template_ms=[\d.]+'
+        )
+
+
+class TimedStageTest(TestCase):
+    def test_noop_without_request(self):
+        self.assertIsNone(current_timings())
+        with timed_stage("grid"):
+            pass
+
+    def test_accumulates_into_current_timings(self):
+        with collect_timings() as timings:
+            with timed_stage("grid"):
+                pass
+            with timed_stage("grid"):
+                pass
+
+        self.assertEqual(list(timings.stages), ["grid"])
+        self.assertIsNone(current_timings())
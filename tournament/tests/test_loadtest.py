@@ -0,0 +1,67 @@
+from django.contrib.auth.models import User
+from django.test import LiveServerTestCase, SimpleTestCase
+from tournament.loadtest import (
+    LoadResult, Sample, Target, parse_mix, percentile, run_load, summarise,
+)
+from tournament.models import Match
+from tournament.synthetic import SyntheticConfig, SyntheticDataGenerator
+
+
+class LoadTestReportTest(SimpleTestCase):
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("grid=70, history=10,write=0"), {"grid": 70, "history": 10, "write": 0})
+        for bad in ("grid=x", "nowhere=5", "grid=-1", "grid=0"):
+            with self.subTest(mix=bad), self.assertRaises(ValueError):
+                parse_mix(bad)
+
+    def test_percentile_uses_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertEqual(percentile([7], 95), 7)
+        self.assertIsNone(percentile([], 50))
+
+    def test_summary_per_route(self):
+        result = LoadResult(
+            samples=[
+                Sample("grid", 200, 10), Sample("grid", 200, 30), Sample("grid", 500, 20),
+                Sample("write", 302, 50), Sample("write", 200, 60),
+            ],
+            duration=2,
+        )
+
+        summary = summarise(result)
+
+        self.assertEqual(summary["grid"]["requests"], 3)
+        self.assertEqual(summary["grid"]["errors"], 1)
+        self.assertEqual(summary["grid"]["p50_ms"], 20)
+        self.assertEqual(summary["grid"]["rps"], 1.5)
+        # A rejected admin form comes back as 200 rather than a redirect
+        self.assertEqual(summary["write"]["errors"], 1)
+        self.assertEqual(summary["total"]["requests"], 5)
+
+
+class LoadTestDriverTest(LiveServerTestCase):
+    def test_drives_every_route(self):
+        tournament = SyntheticDataGenerator(
+            SyntheticConfig(min_groups=2, max_groups=2, teams_per_group=3, retirement_rate=0, seed=4)
+        ).generate()[0]
+        User.objects.create_superuser(username="loadtest", password="loadtest-password")
+        matches = list(
+            Match.objects.filter(tournament=tournament).values(
+                "id", "tournament_id", "team1_id", "team2_id", "date_played"
+            )
+        )
+        for match in matches:
+            match["date_played"] = match["date_played"].isoformat()
+        target = Target(self.live_server_url, [tournament.id], matches)
+
+        result = run_load(
+            target, {"grid": 1, "detail": 1, "history": 1, "write": 1},
+            concurrency=1, duration=1, seed=1,
+        )
+
+        summary = summarise(result)
+        self.assertEqual(set(summary), {"grid", "detail", "history", "write", "total"})
+        self.assertEqual(summary["total"]["errors"], 0)
+        self.assertGreater(summary["write"]["requests"], 0)
@@ -0,0 +1,172 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from unittest import mock
+from django.db import connections, router
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from tournament.maintenance import in_maintenance, maintenance_mode
+from tournament.middleware import MaintenanceModeMiddleware
+from tournament.models import Team
+from tournament.sqlite import bump_generation, read_generation, swap_database
+
+ALIAS = "generation_test"
+
+
+class MaintenanceTestCase(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.db_path = os.path.join(tmp.name, "live.sqlite3")
+        settings = override_settings(
+            MAINTENANCE_FLAG_PATH=f"{self.db_path}.maintenance",
+            MAINTENANCE_SNAPSHOT_PATH=f"{self.db_path}.snapshot",
+            MAINTENANCE_DRAIN_SECONDS=0,
+            METRICS_ENABLED=False,
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+
+class MaintenanceModeMiddlewareTest(MaintenanceTestCase):
+    def setUp(self):
+        super().setUp()
+        self.read_aliases = []
+
+        def view(request):
+            self.read_aliases.append(router.db_for_read(Team))
+            return HttpResponse("ok")
+
+        self.middleware = MaintenanceModeMiddleware(view)
+        self.factory = RequestFactory()
+
+    def test_reads_use_the_default_database_normally(self):
+        response = self.middleware(self.factory.get("/"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.read_aliases, ["default"])
+
+    def test_maintenance_serves_reads_from_the_snapshot_and_rejects_writes(self):
+        open(f"{self.db_path}.maintenance", "w").close()
+
+        read = self.middleware(self.factory.get("/"))
+        write = self.middleware(self.factory.post("/admin/tournament/match/add/"))
+
+        self.assertEqual(read.status_code, 200)
+        self.assertEqual(self.read_aliases, ["snapshot"])
+        self.assertEqual(write.status_code, 503)
+        self.assertEqual(write["Retry-After"], "30")
+        # Routing goes back to normal after the request
+        self.assertEqual(router.db_for_read(Team), "default")
+
+
+class MaintenanceModeTest(MaintenanceTestCase):
+    def create_database(self, path):
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("CREATE TABLE result (score TEXT)")
+        connection.execute("INSERT INTO result VALUES ('6-3 6-4')")
+        connection.commit()
+        return connection
+
+    def test_snapshot_is_taken_before_the_flag_is_raised(self):
+        live = self.create_database(self.db_path)
+        self.addCleanup(live.close)
+
+        with maintenance_mode(self.db_path):
+            self.assertTrue(in_maintenance())
+            live.execute("DELETE FROM result")
+            live.commit()
+            snapshot = sqlite3.connect(f"file:{self.db_path}.snapshot?mode=ro", uri=True)
+            self.addCleanup(snapshot.close)
+            self.assertEqual(snapshot.execute("SELECT score FROM result").fetchall(), [("6-3 6-4",)])
+
+        self.assertFalse(in_maintenance())
+
+    def test_requests_past_the_middleware_finish_before_the_block_runs(self):
+        self.create_database(self.db_path).close()
+        committed = []
+
+        def request():
+            # Got past the flag check just before maintenance began
+            worker = sqlite3.connect(self.db_path)
+            time.sleep(0.2)
+            worker.execute("INSERT INTO result VALUES ('7-5 6-4')")
+            worker.commit()
+            worker.close()
+            committed.append(time.monotonic())
+
+        thread = threading.Thread(target=request)
+        thread.start()
+        self.addCleanup(thread.join)
+        with override_settings(MAINTENANCE_DRAIN_SECONDS=1), maintenance_mode(self.db_path):
+            swapped = time.monotonic()
+
+        self.assertLess(committed[0], swapped)
+
+    def test_no_commit_reaches_the_old_file_while_it_is_swapped(self):
+        self.create_database(self.db_path).close()
+        restored = os.path.join(os.path.dirname(self.db_path), "restored.sqlite3")
+        self.create_database(restored).execute("PRAGMA journal_mode = DELETE").connection.close()
+        worker = sqlite3.connect(self.db_path, timeout=0.1)
+        self.addCleanup(worker.close)
+        worker.execute("SELECT count(*) FROM result").fetchall()
+        replace = os.replace
+        late_writes = []
+
+        def replace_while_writing(source, dest):
+            try:
+                worker.execute("INSERT INTO result VALUES ('lost')")
+                worker.commit()
+            except sqlite3.OperationalError as e:
+                late_writes.append(str(e))
+            replace(source, dest)
+
+        with mock.patch("tournament.sqlite.os.replace", side_effect=replace_while_writing):
+            generation = swap_database(restored, self.db_path)
+
+        self.assertEqual(late_writes, ["database is locked"])
+        self.assertEqual(read_generation(self.db_path), generation)
+        self.assertFalse(os.path.exists(f"{self.db_path}-wal"))
+        fresh = sqlite3.connect(self.db_path)
+        self.addCleanup(fresh.close)
+        self.assertEqual(fresh.execute("SELECT score FROM result").fetchall(), [("6-3 6-4",)])
+
+
+class GenerationReconnectTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.db_path = os.path.join(cls.tmp.name, "generation.sqlite3")
+        default = connections.settings["default"]
+        config = {**default, "NAME": cls.db_path, "CONN_MAX_AGE": None}
+        connections.settings[ALIAS] = connections.configure_settings(
+            {"default": default, ALIAS: config}
+        )[ALIAS]
+        cls.databases = {*cls.databases, ALIAS}
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[ALIAS].close()
+        del connections[ALIAS]
+        del connections.settings[ALIAS]
+        cls.tmp.cleanup()
+        super().tearDownClass()
+
+    def test_persistent_connection_closes_after_a_swap(self):
+        connection = connections[ALIAS]
+        connection.ensure_connection()
+
+        connection.close_if_unusable_or_obsolete()
+        self.assertIsNotNone(connection.connection)
+
+        bump_generation(self.db_path)
+        connection.close_if_unusable_or_obsolete()
+        self.assertIsNone(connection.connection)
+
+        connection.ensure_connection()
+        connection.close_if_unusable_or_obsolete()
+        self.assertIsNotNone(connection.connection)
@@ -0,0 +1,47 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from tournament.benchmarks import profile_memory
+from tournament.synthetic import SyntheticConfig, SyntheticDataGenerator
+
+
+class MemoryProfileTest(TestCase):
+    def setUp(self):
+        self.tournament = SyntheticDataGenerator(
+            SyntheticConfig(min_groups=2, max_groups=2, teams_per_group=4, seed=5)
+        ).generate("Memory")[0]
+
+    def test_reports_peaks_and_modules(self):
+        result = profile_memory(self.tournament, top=5)
+
+        self.assertEqual(result["teams"], 8)
+        self.assertEqual(result["matches"], 12)
+        self.assertGreater(result["peak_bytes"], 0)
+        self.assertEqual(
+            result["peak_bytes"], max(result["build_peak_bytes"], result["render_peak_bytes"])
+        )
+        self.assertLessEqual(len(result["top_modules"]), 5)
+        self.assertTrue(all("." in site["module"] for site in result["top_modules"]))
+
+    def test_check_against_baseline(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = os.path.join(tmp, "baseline.json")
+            args = ["profile_memory", f"--tournament={self.tournament.id}", f"--baseline={baseline}"]
+
+            call_command(*args, "--save-baseline", stdout=StringIO())
+            out = StringIO()
+            call_command(*args, "--check", "--tolerance=1", stdout=out)
+            self.assertIn("is within 100% of the baseline", out.getvalue())
+
+            with open(baseline) as f:
+                stored = json.load(f)
+            stored["peak_bytes"] = 1
+            with open(baseline, "w") as f:
+                json.dump(stored, f)
+
+            with self.assertRaisesMessage(CommandError, "exceeds the baseline"):
+                call_command(*args, "--check", stdout=StringIO())
@@ -0,0 +1,69 @@
+import os
+import tempfile
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tournament.metrics import MetricsRecorder, recorder
+
+
+class MetricsTestMixin:
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(
+            METRICS_DB_PATH=os.path.join(tmp.name, "metrics.sqlite3"),
+            METRICS_FLUSH_INTERVAL=3600,
+            METRICS_ENABLED=True,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        super().setUp()
+
+
+class MetricsRecorderTest(MetricsTestMixin, TestCase):
+    def test_aggregates_across_workers(self):
+        worker1 = MetricsRecorder()
+        worker2 = MetricsRecorder()
+        for latency in [3, 7, 40]:
+            worker1.observe("request_ms", "tournament_grid", latency)
+        worker2.observe("request_ms", "tournament_grid", 4000)
+        worker1.flush()
+        worker2.flush()
+
+        snapshot = MetricsRecorder().snapshot()
+
+        grid = snapshot["histograms"]["request_ms"]["tournament_grid"]
+        self.assertEqual(grid["count"], 4)
+        self.assertEqual(grid["sum"], 4050)
+        self.assertEqual(grid["buckets"]["le_5"], 1)
+        self.assertEqual(grid["buckets"]["le_10"], 1)
+        self.assertEqual(grid["buckets"]["le_50"], 1)
+        self.assertEqual(grid["buckets"]["le_5000"], 1)
+        self.assertEqual(grid["p50"], 10)
+        self.assertEqual(grid["p99"], 5000)
+
+    def test_reset(self):
+        worker = MetricsRecorder()
+        worker.increment("restores", "")
+        worker.flush()
+
+        worker.reset()
+
+        self.assertEqual(worker.snapshot()["counters"], {})
+
+
+class MetricsViewTest(MetricsTestMixin, TestCase):
+    def test_requires_staff(self):
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_reports_route_latency_and_grid_builds(self):
+        recorder.reset()
+        User.objects.create_user(username="admin", password="password", is_staff=True)
+        self.client.login(username="admin", password="password")
+        self.client.get(reverse("tournament_history"))
+
+        data = self.client.get(reverse("metrics")).json()
+
+        self.assertEqual(data["histograms"]["request_ms"]["tournament_history"]["count"], 1)
+        self.assertIn("tournament_history", data["histograms"]["request_queries"])
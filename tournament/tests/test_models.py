@@ -1,6 +1,10 @@
+from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.core.exceptions import ValidationError
-from tournament.models import Tournament, Group, TournamentGroup, Player, Team, Match
+from django.urls import reverse
+from tournament.models import Tournament, Group, TournamentGroup, Player, Team, Match, ValidationContext
 from datetime import date
 
 
@@ -126,4 +130,214 @@ class MatchModelTest(TestCase):
             set1_team1=6, set1_team2=4,
             set2_team1=6, set2_team2=3
         )
-        self.assertEqual(match3.get_score(), "4-1")  # 1 + 2 sets + 1 bonus vs 1 point
\ No newline at end of file
+        self.assertEqual(match3.get_score(), "4-1")  # 1 + 2 sets + 1 bonus vs 1 point
+
+class ValidationContextTest(TestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(
+            name="Context Test",
+            start_date=date(2026, 5, 1)
+        )
+        groups = [Group.objects.create(name=f"Context Group {i}") for i in range(2)]
+        self.tournament_groups = [
+            TournamentGroup.objects.create(tournament=self.tournament, group=group)
+            for group in groups
+        ]
+        players = [
+            Player.objects.create(first_name=f"P{i}", last_name=f"L{i}")
+            for i in range(4)
+        ]
+        self.team1 = Team.objects.create(
+            player1=players[0], player2=players[1],
+            tournament_group=self.tournament_groups[0]
+        )
+        self.team2 = Team.objects.create(
+            player1=players[2], player2=players[3],
+            tournament_group=self.tournament_groups[0]
+        )
+        self.match = Match.objects.create(
+            tournament=self.tournament,
+            team1=self.team1, team2=self.team2,
+            set1_team1=6, set1_team2=4,
+            set2_team1=6, set2_team2=3,
+            date_played=date(2026, 5, 2)
+        )
+
+    def test_match_clean_queries_lazily_by_default(self):
+        match = Match.objects.get(pk=self.match.pk)
+
+        # The match's tournament and both teams; the teams carry their
+        # tournament id so their groups are not needed
+        with self.assertNumQueries(3):
+            match.clean()
+
+    def test_match_clean_uses_no_queries_with_context(self):
+        context = ValidationContext.for_tournament(self.tournament)
+        match = Match.objects.get(pk=self.match.pk)
+
+        with self.assertNumQueries(0):
+            match.clean(context=context)
+
+    def test_match_clean_with_context_still_rejects_bad_rows(self):
+        context = ValidationContext.for_tournament(self.tournament)
+        match = Match(
+            tournament_id=self.tournament.pk,
+            team1_id=self.team1.pk, team2_id=self.team2.pk,
+            set1_team1=6, set1_team2=4,
+            set2_team1=6, set2_team2=3,
+            date_played=date(2026, 4, 1)
+        )
+
+        with self.assertNumQueries(0):
+            with self.assertRaisesMessage(ValidationError, "before tournament start date"):
+                match.clean(context=context)
+
+    def test_tournament_save_skips_group_count_query_with_context(self):
+        tournament = Tournament.objects.get(pk=self.tournament.pk)
+        context = ValidationContext.from_objects(
+            tournaments=[tournament], tournament_groups=self.tournament_groups
+        )
+
+        with self.assertNumQueries(2):
+            tournament.save()
+        with self.assertNumQueries(1):
+            tournament.save(validation_context=context)
+
+    def test_admin_save_counts_groups_from_the_inline(self):
+        admin = User.objects.create_superuser(username="admin", password="password")
+        self.client.force_login(admin)
+        data = {
+            "name": "Renamed", "start_date": "2026-05-01", "status": "ONGOING",
+            "tournamentgroup_set-TOTAL_FORMS": "2",
+            "tournamentgroup_set-INITIAL_FORMS": "2",
+            "tournamentgroup_set-MIN_NUM_FORMS": "2",
+            "tournamentgroup_set-MAX_NUM_FORMS": "7",
+        }
+        for index, tournament_group in enumerate(self.tournament_groups):
+            data[f"tournamentgroup_set-{index}-id"] = tournament_group.pk
+            data[f"tournamentgroup_set-{index}-tournament"] = self.tournament.pk
+            data[f"tournamentgroup_set-{index}-group"] = tournament_group.group_id
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                reverse("admin:tournament_tournament_change", args=[self.tournament.pk]), data
+            )
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Tournament.objects.get(pk=self.tournament.pk).name, "Renamed")
+        self.assertFalse([
+            query["sql"] for query in queries.captured_queries
+            if "COUNT(" in query["sql"] and "tournament_tournamentgroup" in query["sql"]
+        ])
+
+    def test_team_clean_does_not_load_players(self):
+        team = Team.objects.get(pk=self.team1.pk)
+
+        with self.assertNumQueries(0):
+            team.clean()
+
+        team.player2_id = team.player1_id
+        with self.assertRaises(ValidationError):
+            team.clean()
+
+
+class TeamTournamentSyncTest(TestCase):
+    def setUp(self):
+        self.tournaments = [
+            Tournament.objects.create(name=f"Sync {i}", start_date=date(2026, 5, 1))
+            for i in range(2)
+        ]
+        group = Group.objects.create(name="Sync Group")
+        self.tournament_group = TournamentGroup.objects.create(
+            tournament=self.tournaments[0], group=group
+        )
+        self.players = [
+            Player.objects.create(first_name=f"S{i}", last_name=f"L{i}")
+            for i in range(2)
+        ]
+
+    def create_team(self):
+        return Team.objects.create(
+            player1=self.players[0], player2=self.players[1],
+            tournament_group=self.tournament_group
+        )
+
+    def test_team_takes_tournament_from_its_group(self):
+        team = self.create_team()
+
+        self.assertEqual(Team.objects.get(pk=team.pk).tournament_id, self.tournaments[0].pk)
+
+    def test_moving_team_to_another_group_updates_tournament(self):
+        team = self.create_team()
+        other_group = TournamentGroup.objects.create(
+            tournament=self.tournaments[1], group=Group.objects.create(name="Other Sync Group")
+        )
+
+        team.tournament_group = other_group
+        team.save(update_fields=["tournament_group"])
+
+        self.assertEqual(Team.objects.get(pk=team.pk).tournament_id, self.tournaments[1].pk)
+
+    def test_moving_group_to_another_tournament_updates_its_teams(self):
+        team = self.create_team()
+
+        self.tournament_group.tournament = self.tournaments[1]
+        self.tournament_group.save()
+
+        self.assertEqual(Team.objects.get(pk=team.pk).tournament_id, self.tournaments[1].pk)
+
+    def test_save_with_context_does_not_load_the_group(self):
+        team = Team.objects.get(pk=self.create_team().pk)
+        context = ValidationContext.for_tournament(self.tournaments[0])
+
+        with self.assertNumQueries(1):
+            team.save(validation_context=context)
+
+
+class TeamLabelTest(TestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(name="Labels", start_date=date(2026, 5, 1))
+        self.tournament_group = TournamentGroup.objects.create(
+            tournament=self.tournament, group=Group.objects.create(name="Label Group")
+        )
+        self.players = [
+            Player.objects.create(first_name=name, last_name="L")
+            for name in ("Alexandra", "Bo", "Christopher")
+        ]
+        self.team = Team.objects.create(
+            player1=self.players[0], player2=self.players[1],
+            tournament_group=self.tournament_group
+        )
+
+    def test_labels_are_stored_on_create(self):
+        team = Team.objects.get(pk=self.team.pk)
+
+        self.assertEqual(team.short_label, "Alex/Bo")
+        self.assertEqual(team.full_label, "Alexandra/Bo")
+        with self.assertNumQueries(0):
+            self.assertEqual(str(team), "Alexandra/Bo")
+
+    def test_renaming_a_player_updates_their_teams(self):
+        player = Player.objects.get(pk=self.players[1].pk)
+        player.first_name = "Bonnie"
+        player.save()
+
+        team = Team.objects.get(pk=self.team.pk)
+        self.assertEqual(team.short_label, "Alex/Bonn")
+        self.assertEqual(team.full_label, "Alexandra/Bonnie")
+
+    def test_changing_a_player_updates_labels(self):
+        team = Team.objects.get(pk=self.team.pk)
+        team.player2 = self.players[2]
+        team.save(update_fields=["player2"])
+
+        self.assertEqual(Team.objects.get(pk=team.pk).full_label, "Alexandra/Christopher")
+
+    def test_saving_unchanged_players_does_not_load_them(self):
+        team = Team.objects.get(pk=self.team.pk)
+        team.rank = 3
+
+        # Only the group, for the tournament id, and the update itself
+        with self.assertNumQueries(2):
+            team.save()
+        self.assertEqual(team.full_label, "Alexandra/Bo")
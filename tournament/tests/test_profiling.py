@@ -0,0 +1,58 @@
+import os
+import tempfile
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tournament.profiling import list_profiles
+
+
+class RequestProfilingTest(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.profile_dir = tmp.name
+        settings_override = override_settings(PROFILE_DIR=self.profile_dir, PROFILE_KEEP=2)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.staff = User.objects.create_user(username="admin", password="password", is_staff=True)
+
+    def test_ignored_for_anonymous_users(self):
+        response = self.client.get(reverse("tournament_history"), {"profile": 1})
+
+        self.assertNotIn("X-Profile", response)
+        self.assertEqual(list_profiles(), [])
+
+    def test_staff_request_is_profiled(self):
+        self.client.login(username="admin", password="password")
+
+        response = self.client.get(reverse("tournament_history"), {"profile": 1})
+
+        name = response["X-Profile"]
+        self.assertTrue(os.path.isfile(os.path.join(self.profile_dir, name)))
+        self.assertIn("tournaments", name)
+
+        listing = self.client.get(reverse("profile_list"))
+        self.assertContains(listing, name)
+
+        detail = self.client.get(reverse("profile_detail", args=[name]))
+        self.assertContains(detail, "cumulative")
+
+        download = self.client.get(reverse("profile_detail", args=[name]), {"download": 1})
+        self.assertEqual(download["Content-Disposition"], f'attachment; filename="{name}"')
+
+    def test_keeps_newest_profiles_only(self):
+        self.client.login(username="admin", password="password")
+        for _ in range(3):
+            self.client.get(reverse("tournament_history"), {"profile": 1})
+
+        self.assertEqual(len(list_profiles()), 2)
+
+    def test_profile_pages_require_staff(self):
+        response = self.client.get(reverse("profile_list"))
+        self.assertEqual(response.status_code, 302)
+
+    def test_rejects_paths_outside_profile_dir(self):
+        self.client.login(username="admin", password="password")
+        response = self.client.get(reverse("profile_detail", args=["..secret.prof"]))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,121 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from tournament.models import Tournament, Player
+from tournament.synthetic import SyntheticConfig, SyntheticDataGenerator
+
+
+# The most queries any of the pages below may run, however big the data
+MAX_QUERIES = 15
+
+
+class QueryCountScalingTest(TestCase):
+    """Pages must run the same number of queries for small and large tournaments
+
+    Each check loads a page against a small and a large synthetic dataset. A
+    count that differs between the two means a query is run per team, match
+    or tournament; the failure message lists the SQL of the larger run so
+    the repeated query is easy to spot.
+    """
+
+    def setUp(self):
+        Tournament.objects.all().delete()
+        Player.objects.all().delete()
+        self.admin = User.objects.create_superuser(username="admin", password="password")
+
+    def generate(self, tournaments=1, teams_per_group=3):
+        Tournament.objects.all().delete()
+        Player.objects.all().delete()
+        SyntheticDataGenerator(SyntheticConfig(
+            tournaments=tournaments,
+            min_groups=3,
+            max_groups=3,
+            teams_per_group=teams_per_group,
+            withdrawal_rate=0.2,
+            seed=1,
+        )).generate()
+        return Tournament.objects.order_by("-start_date").first()
+
+    def count_queries(self, url, staff=False):
+        if staff:
+            self.client.force_login(self.admin)
+        else:
+            self.client.logout()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return queries
+
+    def assertQueriesDoNotScale(self, small, large, bound=MAX_QUERIES):
+        """Same count for both sizes, and within the bound"""
+        sql = "\n".join(
+            f"{index}. {query['sql']}"
+            for index, query in enumerate(large.captured_queries, start=1)
+        )
+        self.assertEqual(
+            len(small.captured_queries), len(large.captured_queries),
+            f"Query count grew from {len(small.captured_queries)} to "
+            f"{len(large.captured_queries)} with more data:\n{sql}",
+        )
+        self.assertLessEqual(
+            len(large.captured_queries), bound,
+            f"{len(large.captured_queries)} queries, expected at most {bound}:\n{sql}",
+        )
+
+    def compare(self, url_for, staff=False, small=None, large=None):
+        small = small or {}
+        large = large or {"teams_per_group": 8}
+        tournament = self.generate(**small)
+        small_queries = self.count_queries(url_for(tournament), staff)
+        tournament = self.generate(**large)
+        large_queries = self.count_queries(url_for(tournament), staff)
+        self.assertQueriesDoNotScale(small_queries, large_queries)
+
+    def test_current_tournament_grid(self):
+        self.compare(lambda tournament: reverse("tournament_grid"))
+
+    def test_tournament_detail(self):
+        self.compare(
+            lambda tournament: reverse("tournament_detail", args=[tournament.id]),
+            small={"tournaments": 2},
+            large={"tournaments": 4, "teams_per_group": 8},
+        )
+
+    def test_tournament_history(self):
+        # Both lists include a completed tournament, whose group winners
+        # take two more queries
+        self.compare(
+            lambda tournament: reverse("tournament_history"),
+            small={"tournaments": 2},
+            large={"tournaments": 30, "teams_per_group": 8},
+        )
+
+    def test_teams_api(self):
+        self.compare(
+            lambda tournament: f"{reverse('api_teams_by_tournament')}?tournament={tournament.id}",
+            staff=True,
+        )
+
+    def test_previous_partner_api(self):
+        def url_for(tournament):
+            player = Player.objects.order_by("id").first()
+            return f"{reverse('api_previous_partner')}?player_id={player.id}"
+
+        self.compare(
+            url_for,
+            staff=True,
+            small={"tournaments": 2},
+            large={"tournaments": 5, "teams_per_group": 8},
+        )
+
+    def test_admin_changelists(self):
+        for name in ("tournament", "team", "match", "player"):
+            with self.subTest(changelist=name):
+                self.compare(
+                    lambda tournament: reverse(f"admin:tournament_{name}_changelist"),
+                    staff=True,
+                    small={"tournaments": 2},
+                    large={"tournaments": 4, "teams_per_group": 8},
+                )
@@ -0,0 +1,32 @@
+from django.test import SimpleTestCase, TestCase
+from tournament.query_plans import QueryPlan, collect_query_plans
+from tournament.synthetic import SyntheticConfig, SyntheticDataGenerator
+
+
+class QueryPlanTest(TestCase):
+    def test_service_queries_use_indexes(self):
+        tournament = SyntheticDataGenerator(
+            SyntheticConfig(tournaments=2, min_groups=2, max_groups=2, teams_per_group=4, seed=3)
+        ).generate("Plans")[-1]
+
+        plans = collect_query_plans(tournament)
+
+        self.assertGreater(len(plans), 10)
+        scanning = [plan for plan in plans if plan.full_scans]
+        self.assertEqual(
+            scanning, [],
+            "\n".join(f"[{plan.source}] {plan.sql}\n  {plan.plan}" for plan in scanning),
+        )
+
+
+class FullScanDetectionTest(SimpleTestCase):
+    def test_detects_table_scans_only(self):
+        plan = QueryPlan("test", "SELECT ...", [
+            "SCAN tournament_tournament",
+            "SCAN tournament_team USING INDEX team_group_rank_idx",
+            "SCAN tournament_player USING COVERING INDEX sqlite_autoindex",
+            "SEARCH tournament_match USING INDEX match_tournament_teams_idx (tournament_id=?)",
+            "SCAN CONSTANT ROW",
+        ])
+
+        self.assertEqual(plan.full_scans, ["tournament_tournament"])
@@ -0,0 +1,222 @@
+import io
+import os
+import signal
+import sqlite3
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase
+from tournament.backups import BackupError, LocalStore
+from tournament.replication import (
+    PAGES_SUFFIX, SNAPSHOT_SUFFIX, Replicator, copy_database, list_replica, prune_replica,
+    restore_replica,
+)
+from tournament.tests.test_backups import count_rows, create_database
+
+START = datetime(2026, 5, 1, 12, 0, tzinfo=timezone.utc)
+
+
+class FlakyStore(LocalStore):
+    """A local store whose next uploads fail, or run a callback first"""
+
+    failures = 0
+    before_upload = None
+
+    def upload(self, key, fileobj):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("store unreachable")
+        if self.before_upload:
+            self.before_upload()
+        super().upload(key, fileobj)
+
+
+class ReplicationTest(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        self.db_path = os.path.join(tmp.name, "live.sqlite3")
+        self.restored_path = os.path.join(tmp.name, "restored.sqlite3")
+        self.store = FlakyStore(os.path.join(tmp.name, "bucket"))
+        self.live = create_database(self.db_path)
+        self.addCleanup(self.live.close)
+        self.replicator = Replicator(self.db_path, self.store, snapshot_every=3600, workdir=tmp.name)
+        self.addCleanup(self.replicator.close)
+
+    def delete_rows_above(self, id):
+        self.live.execute("DELETE FROM result WHERE id > ?", (id,))
+        self.live.commit()
+
+    def test_only_changed_pages_are_shipped(self):
+        first = self.replicator.tick(START)
+        self.assertTrue(first.key.endswith(SNAPSHOT_SUFFIX))
+
+        self.assertIsNone(self.replicator.tick(START + timedelta(seconds=10)).key)
+
+        self.live.execute("UPDATE result SET score = '7-6 7-6' WHERE id = 1500")
+        self.live.commit()
+        second = self.replicator.tick(START + timedelta(seconds=20))
+
+        self.assertTrue(second.key.endswith(PAGES_SUFFIX))
+        # The pages the UPDATE wrote to the WAL, just the row's leaf page
+        self.assertLessEqual(second.changed_pages, 3)
+        self.assertLess(second.changed_pages, first.changed_pages)
+
+    def test_segments_are_read_from_the_wal_without_copying_the_database(self):
+        self.replicator.tick(START)
+
+        with mock.patch("tournament.replication.copy_database") as copy:
+            for minute, id in enumerate((1000, 100), start=1):
+                self.delete_rows_above(id)
+                self.assertTrue(self.replicator.tick(START + timedelta(minutes=minute)).key)
+            self.assertIsNone(self.replicator.tick(START + timedelta(minutes=3)).key)
+        copy.assert_not_called()
+
+        restore_replica(self.store, self.restored_path)
+        self.assertEqual(count_rows(self.restored_path), 100)
+
+    def test_restarted_wal_falls_back_to_diffing_a_copy(self):
+        self.replicator.tick(START)
+        self.delete_rows_above(1000)
+        # Copies every frame into the database and empties the WAL, so the
+        # next write starts it again with new salts
+        self.live.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.delete_rows_above(100)
+
+        with mock.patch("tournament.replication.copy_database", wraps=copy_database) as copy:
+            result = self.replicator.tick(START + timedelta(minutes=1))
+            self.assertEqual(copy.call_count, 1)
+            self.delete_rows_above(10)
+            self.replicator.tick(START + timedelta(minutes=2))
+            self.assertEqual(copy.call_count, 1)
+
+        self.assertTrue(result.key.endswith(PAGES_SUFFIX))
+        restore_replica(self.store, self.restored_path, until=START + timedelta(minutes=1))
+        self.assertEqual(count_rows(self.restored_path), 100)
+        restore_replica(self.store, self.restored_path)
+        self.assertEqual(count_rows(self.restored_path), 10)
+
+    def test_failed_upload_is_retried_without_losing_changes(self):
+        self.replicator.tick(START)
+        self.delete_rows_above(1000)
+        self.store.failures = 1
+        with self.assertRaises(OSError):
+            self.replicator.tick(START + timedelta(minutes=1))
+        self.delete_rows_above(100)
+
+        self.replicator.tick(START + timedelta(minutes=2))
+
+        self.assertEqual([item.sequence for item in list_replica(self.store)], [1, 2])
+        restore_replica(self.store, self.restored_path)
+        self.assertEqual(count_rows(self.restored_path), 100)
+
+    def replicate(self, *args):
+        stderr = io.StringIO()
+        with mock.patch("tournament.management.commands.replicate_db.store_from_env", return_value=self.store), \
+                mock.patch.dict(settings.DATABASES["default"], NAME=self.db_path):
+            call_command("replicate_db", "--interval=0", *args, stdout=io.StringIO(), stderr=stderr)
+        return stderr.getvalue()
+
+    def test_command_gives_up_after_repeated_failures(self):
+        self.store.failures = 3
+
+        with self.assertRaisesMessage(CommandError, "Giving up after 3 failed shipments"):
+            self.replicate("--max-failures=3")
+        self.assertEqual(list_replica(self.store), [])
+
+    def test_command_finishes_the_upload_in_progress_on_sigterm(self):
+        self.store.failures = 1
+        self.store.before_upload = lambda: os.kill(os.getpid(), signal.SIGTERM)
+
+        stderr = self.replicate()
+
+        self.assertIn("retrying", stderr)
+        # One generation, whose snapshot was uploaded after the signal
+        self.assertEqual([(item.sequence, item.is_snapshot) for item in list_replica(self.store)], [(1, True)])
+        self.assertEqual(signal.getsignal(signal.SIGTERM), signal.SIG_DFL)
+
+    def test_restore_replays_segments_up_to_the_chosen_time(self):
+        self.replicator.tick(START)
+        for minute, id in enumerate((1000, 100, 10), start=1):
+            self.delete_rows_above(id)
+            self.replicator.tick(START + timedelta(minutes=minute))
+
+        applied, _ = restore_replica(self.store, self.restored_path, until=START + timedelta(minutes=2, seconds=30))
+        self.assertEqual(applied.sequence, 3)
+        self.assertEqual(count_rows(self.restored_path), 100)
+
+        restore_replica(self.store, self.restored_path)
+        self.assertEqual(count_rows(self.restored_path), 10)
+
+        restore_replica(self.store, self.restored_path, until=START)
+        self.assertEqual(count_rows(self.restored_path), 2000)
+
+    def test_database_that_grows_and_shrinks_restores_exactly(self):
+        self.replicator.tick(START)
+        self.live.executemany("INSERT INTO result (score) VALUES (?)", [("6-0 6-0",)] * 3000)
+        self.live.commit()
+        self.replicator.tick(START + timedelta(minutes=1))
+        self.delete_rows_above(500)
+        self.live.execute("VACUUM")
+        self.replicator.tick(START + timedelta(minutes=2))
+
+        restore_replica(self.store, self.restored_path)
+
+        copy = os.path.join(self.tmp, "copy.sqlite3")
+        backup = sqlite3.connect(copy)
+        self.live.backup(backup)
+        backup.close()
+        self.assertEqual(os.path.getsize(self.restored_path), os.path.getsize(copy))
+        self.assertEqual(count_rows(self.restored_path), 500)
+
+    def test_periodic_snapshot_starts_a_fresh_base_and_pruning_keeps_it(self):
+        self.replicator.tick(START)
+        self.delete_rows_above(1000)
+        self.replicator.tick(START + timedelta(minutes=1))
+        self.delete_rows_above(100)
+        compacted = self.replicator.tick(START + timedelta(hours=1))
+        self.assertTrue(compacted.key.endswith(SNAPSHOT_SUFFIX))
+        self.delete_rows_above(10)
+        self.replicator.tick(START + timedelta(hours=1, minutes=1))
+
+        expired = prune_replica(self.store, START + timedelta(hours=1, seconds=30))
+
+        self.assertEqual(len(expired), 2)
+        self.assertEqual([item.sequence for item in list_replica(self.store)], [3, 4])
+        restore_replica(self.store, self.restored_path, until=START + timedelta(hours=1))
+        self.assertEqual(count_rows(self.restored_path), 100)
+        with self.assertRaisesMessage(BackupError, "old enough"):
+            restore_replica(self.store, self.restored_path, until=START + timedelta(minutes=1))
+
+    def test_missing_segment_fails_the_restore(self):
+        self.replicator.tick(START)
+        for minute, id in enumerate((1000, 100), start=1):
+            self.delete_rows_above(id)
+            self.replicator.tick(START + timedelta(minutes=minute))
+        self.store.delete([list_replica(self.store)[1].key])
+
+        with self.assertRaisesMessage(BackupError, "segment 2"):
+            restore_replica(self.store, self.restored_path)
+        self.assertFalse(os.path.exists(self.restored_path))
+
+    def test_memory_does_not_grow_with_the_database(self):
+        self.live.executemany("INSERT INTO result (score) VALUES (?)", [("x" * 200,)] * 20000)
+        self.live.commit()
+        self.assertGreater(os.path.getsize(self.db_path) + os.path.getsize(f"{self.db_path}-wal"), 4_000_000)
+        self.replicator.tick(START)
+        self.live.execute("UPDATE result SET score = 'y'")
+        self.live.commit()
+
+        tracemalloc.start()
+        try:
+            self.replicator.tick(START + timedelta(minutes=1))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(peak, 1_000_000)
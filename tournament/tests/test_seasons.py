@@ -0,0 +1,218 @@
+import io
+import os
+import sqlite3
+import tempfile
+from datetime import date
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tournament.archive import export_archive, load_archive
+from tournament.backups import LocalStore
+from tournament.models import Match, Team, Tournament, TournamentGroup
+from tournament.routers import SEASON_ALIAS_PREFIX
+from tournament.seasons import (
+    BUILD_ALIAS, archive_completed, download_seasons, season_alias, season_path, upload_seasons,
+)
+from tournament.seed import export_seed, load_seed
+from tournament.services import TournamentSummaryBuilder
+from tournament.synthetic import SyntheticConfig, SyntheticDataGenerator
+from tournament.tests.test_seed import MODELS, snapshot
+
+
+class SeasonTestCase(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+        settings = override_settings(SEASON_ARCHIVE_DIR=os.path.join(tmp.name, "seasons"), METRICS_ENABLED=False)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.addCleanup(self.unregister_seasons)
+        # Season aliases are registered at runtime, after the test
+        # transaction has started, so allow connections to them for the test
+        databases = type(self).databases
+        type(self).databases = {*databases, BUILD_ALIAS, f"{SEASON_ALIAS_PREFIX}2024", f"{SEASON_ALIAS_PREFIX}2025"}
+        self.addCleanup(setattr, type(self), "databases", databases)
+
+        config = SyntheticConfig(tournaments=4, min_groups=2, max_groups=2, teams_per_group=4, seed=2)
+        self.ongoing = SyntheticDataGenerator(config).generate("Season")[-1]
+        self.completed = list(Tournament.objects.filter(status="COMPLETED").order_by("start_date"))
+        # Spread the completed tournaments over two seasons
+        for tournament, start in zip(self.completed, (date(2024, 4, 1), date(2024, 9, 1), date(2025, 4, 1))):
+            tournament.start_date = start
+            tournament.end_date = start.replace(month=start.month + 2)
+            tournament.save()
+
+    def unregister_seasons(self):
+        for alias in [alias for alias in connections.settings if alias.startswith(SEASON_ALIAS_PREFIX)]:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+
+
+class ArchiveSeasonsTest(SeasonTestCase):
+    def test_history_pages_render_the_same_after_archiving(self):
+        pages = [reverse("tournament_history")] + [
+            reverse("tournament_detail", args=[tournament.pk]) for tournament in self.completed
+        ]
+        before = [self.client.get(page).content for page in pages]
+
+        archived = archive_completed(keep=0)
+
+        self.assertEqual({season: len(tournaments) for season, tournaments in archived.items()}, {2024: 2, 2025: 1})
+        self.assertEqual([self.client.get(page).content for page in pages], before)
+
+    def test_primary_keeps_only_the_hot_tournaments(self):
+        archive_completed(keep=1)
+
+        kept = self.completed[-1]
+        self.assertEqual(
+            set(Match.objects.values_list("tournament_id", flat=True).distinct()), {self.ongoing.pk, kept.pk}
+        )
+        self.assertEqual(
+            set(Team.objects.values_list("tournament_id", flat=True).distinct()), {self.ongoing.pk, kept.pk}
+        )
+        self.assertEqual(
+            [Tournament.objects.get(pk=tournament.pk).archive_season for tournament in self.completed],
+            [2024, 2024, None],
+        )
+        self.assertFalse(os.path.exists(season_path(2025)))
+
+    def test_season_file_holds_its_tournaments_and_is_read_only(self):
+        first = self.completed[0]
+        matches = Match.objects.filter(tournament=first).count()
+
+        archive_completed(keep=0)
+
+        alias = season_alias(2024)
+        self.assertEqual(Match.objects.using(alias).filter(tournament=first).count(), matches)
+        self.assertEqual(TournamentGroup.objects.using(alias).filter(tournament=first).count(), 2)
+        self.assertEqual(Tournament.objects.using(alias).get(pk=first.pk).archive_season, 2024)
+        connection = sqlite3.connect(f"file:{season_path(2024)}?mode=ro", uri=True)
+        self.addCleanup(connection.close)
+        with self.assertRaises(sqlite3.OperationalError):
+            connection.execute("DELETE FROM tournament_match")
+
+    def test_later_runs_add_to_an_existing_season(self):
+        archive_completed(keep=2)
+        self.assertEqual(Tournament.objects.filter(archive_season=2024).count(), 1)
+
+        archived = archive_completed(keep=1)
+
+        self.assertEqual(list(archived), [2024])
+        alias = season_alias(2024)
+        self.assertEqual(
+            set(Match.objects.using(alias).values_list("tournament_id", flat=True).distinct()),
+            {self.completed[0].pk, self.completed[1].pk},
+        )
+        self.assertEqual(archive_completed(keep=1), {})
+
+    def test_older_season_files_gain_new_columns(self):
+        archive_completed(keep=2)
+        connection = sqlite3.connect(season_path(2024))
+        connection.execute("ALTER TABLE tournament_tournament DROP COLUMN archive_summary")
+        connection.commit()
+        connection.close()
+
+        archive_completed(keep=1)
+
+        self.assertEqual(
+            list(Tournament.objects.using(season_alias(2024)).order_by("start_date").values_list("pk", "archive_summary")),
+            [(self.completed[0].pk, None), (self.completed[1].pk, None)],
+        )
+
+    def test_summaries_are_frozen_and_filled_in_for_older_archives(self):
+        summaries = TournamentSummaryBuilder().summarize(self.completed)
+
+        archive_completed(keep=0)
+
+        archived = Tournament.objects.filter(pk__in=summaries).order_by("start_date")
+        self.assertEqual([tournament.archive_summary for tournament in archived], list(summaries.values()))
+        self.assertEqual(summaries[self.completed[0].pk]["groups"], 2)
+
+        archived.update(archive_summary=None)
+        archive_completed(keep=0)
+        self.assertEqual([tournament.archive_summary for tournament in archived], list(summaries.values()))
+
+    def test_archived_tournament_can_still_be_edited(self):
+        archive_completed(keep=0)
+        tournament = Tournament.objects.get(pk=self.completed[0].pk)
+
+        tournament.name = "Spring 2024"
+        tournament.save()
+
+        self.assertEqual(Tournament.objects.get(pk=tournament.pk).name, "Spring 2024")
+
+
+class SeasonBackupTest(SeasonTestCase):
+    def test_seasons_upload_once_and_download_when_missing(self):
+        store = LocalStore(os.path.join(self.tmp, "bucket"))
+        archive_completed(keep=0)
+
+        self.assertEqual(upload_seasons(store), ["seasons/season_2024.sqlite3", "seasons/season_2025.sqlite3"])
+        self.assertEqual(upload_seasons(store), [])
+
+        os.remove(season_path(2025))
+        self.assertEqual(download_seasons(store), [season_path(2025)])
+        self.assertEqual(
+            set(Match.objects.using(season_alias(2025)).values_list("tournament_id", flat=True)),
+            {self.completed[2].pk},
+        )
+
+    def test_stale_local_season_is_replaced(self):
+        store = LocalStore(os.path.join(self.tmp, "bucket"))
+        archive_completed(keep=2)
+        with open(season_path(2024), "rb") as f:
+            older = f.read()
+        archive_completed(keep=1)
+        upload_seasons(store)
+
+        with open(season_path(2024), "wb") as f:
+            f.write(older)
+        self.assertEqual(download_seasons(store), [season_path(2024)])
+        self.assertEqual(
+            set(Match.objects.using(season_alias(2024)).values_list("tournament_id", flat=True)),
+            {self.completed[0].pk, self.completed[1].pk},
+        )
+        self.assertEqual(download_seasons(store), [])
+
+
+def _sorted(snapshot, renames=()):
+    renames = dict(renames)
+    return {
+        table: sorted((tuple(renames.get(value, value) for value in row) for row in rows), key=repr)
+        for table, rows in snapshot.items()
+    }
+
+
+class SeasonExportTest(SeasonTestCase):
+    def clear(self):
+        for model in reversed(MODELS):
+            model.objects.all().delete()
+
+    def test_archive_export_includes_archived_tournaments(self):
+        before = snapshot()
+        archive_completed(keep=0)
+        path = os.path.join(self.tmp, "history.tda")
+
+        counts = export_archive(path)
+        self.clear()
+        load_archive(path)
+
+        self.assertEqual(_sorted(snapshot()), _sorted(before))
+        self.assertEqual(counts["matches"], len(before["matches"]))
+
+    def test_seed_export_includes_archived_tournaments(self):
+        before = snapshot()
+        archive_completed(keep=0)
+        # Edited after archiving, so the season file's copy is out of date
+        tournament = Tournament.objects.get(pk=self.completed[0].pk)
+        old_name, tournament.name = tournament.name, "Spring 2024"
+        tournament.save()
+        stream = io.StringIO()
+
+        export_seed(stream)
+        self.clear()
+        load_seed(io.StringIO(stream.getvalue()))
+
+        self.assertEqual(_sorted(snapshot()), _sorted(before, {old_name: "Spring 2024"}))
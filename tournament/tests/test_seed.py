@@ -0,0 +1,150 @@
+import io
+import json
+from datetime import date
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from tournament.models import Group, Match, Player, Team, Tournament, TournamentGroup
+from tournament.seed import SeedError, export_seed, load_seed
+from tournament.synthetic import SyntheticConfig, SyntheticDataGenerator
+
+MODELS = [Group, Player, Tournament, TournamentGroup, Team, Match]
+
+
+def snapshot():
+    """Everything a seed carries, without the ids"""
+    return {
+        "tournaments": sorted(Tournament.objects.values_list("name", "start_date", "end_date", "status")),
+        "groups": sorted(
+            TournamentGroup.objects.values_list("tournament__name", "group__name")
+        ),
+        "teams": sorted(Team.objects.values_list(
+            "player1__last_name", "player2__last_name", "tournament__name",
+            "tournament_group__group__name", "rank", "is_withdrawn", "full_label", "short_label",
+        )),
+        "matches": sorted(
+            Match.objects.values_list(
+                "tournament__name", "team1__full_label", "team2__full_label",
+                "set1_team1", "set1_team2", "set2_team1", "set2_team2",
+                "set3_team1", "set3_team2", "date_played", "retired_team",
+            ),
+            key=repr,
+        ),
+    }
+
+
+class SeedTest(TestCase):
+    def setUp(self):
+        config = SyntheticConfig(tournaments=2, min_groups=2, max_groups=3, teams_per_group=4, seed=5)
+        SyntheticDataGenerator(config).generate("Seed")
+
+    def export(self):
+        stream = io.StringIO()
+        export_seed(stream)
+        stream.seek(0)
+        return stream
+
+    def clear(self):
+        for model in reversed(MODELS):
+            model.objects.all().delete()
+
+    def test_round_trip_into_an_empty_database(self):
+        before = snapshot()
+        stream = self.export()
+        self.clear()
+
+        result = load_seed(stream)
+
+        self.assertEqual(snapshot(), before)
+        self.assertEqual(result.created["tournament.match"], len(before["matches"]))
+        self.assertFalse(any(result.existing.values()))
+
+    def test_loading_twice_creates_nothing(self):
+        stream = self.export()
+        counts = {model: model.objects.count() for model in MODELS}
+
+        result = load_seed(stream)
+
+        self.assertFalse(any(result.created.values()))
+        self.assertEqual({model: model.objects.count() for model in MODELS}, counts)
+
+    def test_queries_grow_with_batches_not_rows(self):
+        stream = self.export()
+        self.clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            load_seed(stream)
+
+        # An insert and a few lookups per model, however many rows
+        self.assertLess(len(queries), 20)
+        self.assertGreater(Match.objects.count() + Team.objects.count(), 2 * len(queries))
+
+    def test_small_cache_still_resolves_every_key(self):
+        before = snapshot()
+        stream = self.export()
+        self.clear()
+
+        load_seed(stream, cache_size=3)
+
+        self.assertEqual(snapshot(), before)
+
+    def test_existing_players_are_reused(self):
+        stream = self.export()
+        Match.objects.all().delete()
+        Team.objects.all().delete()
+        TournamentGroup.objects.all().delete()
+        Tournament.objects.all().delete()
+        players = Player.objects.count()
+
+        result = load_seed(stream)
+
+        self.assertEqual(Player.objects.count(), players)
+        self.assertEqual(result.existing["tournament.player"], players)
+
+    def test_records_use_natural_keys(self):
+        records = [json.loads(line) for line in self.export()]
+        tournament = Tournament.objects.filter(status="COMPLETED").first()
+
+        self.assertEqual(records[0], {"format": "tournament-seed", "version": 1})
+        self.assertIn(
+            {"model": "tournament.tournament", "key": [tournament.name, tournament.start_date.isoformat()],
+             "fields": {"end_date": tournament.end_date.isoformat(), "status": tournament.status}},
+            records,
+        )
+        self.assertEqual(Tournament.objects.get_by_natural_key(*tournament.natural_key()), tournament)
+        self.assertEqual([record["model"] for record in records[1:]], sorted(
+            (record["model"] for record in records[1:]),
+            key=[model._meta.label_lower for model in MODELS].index,
+        ))
+
+    def test_duplicate_natural_keys_stop_the_export(self):
+        player = Player.objects.first()
+        Player.objects.create(first_name=player.first_name, last_name=player.last_name)
+
+        with self.assertRaisesMessage(SeedError, "2 players share the natural key"):
+            export_seed(io.StringIO())
+
+    def test_out_of_order_records_are_rejected(self):
+        lines = self.export().readlines()
+        team = next(line for line in lines if '"tournament.team"' in line)
+        lines.append(team)
+        self.clear()
+
+        with self.assertRaisesMessage(SeedError, "comes after the records that depend on it"):
+            load_seed(io.StringIO("".join(lines)))
+        self.assertFalse(Group.objects.exists())
+
+    def test_file_without_a_header_is_rejected(self):
+        with self.assertRaisesMessage(SeedError, "Not a tournament seed file"):
+            load_seed(io.StringIO('[{"model": "tournament.group"}]\n'))
+
+
+class NaturalKeyTest(TestCase):
+    def test_models_round_trip_their_natural_keys(self):
+        group = Group.objects.create(name="Group A")
+        player = Player.objects.create(first_name="Alice", last_name="Smith")
+        tournament = Tournament.objects.create(name="Spring", start_date=date(2026, 4, 1))
+
+        self.assertEqual(Group.objects.get_by_natural_key(*group.natural_key()), group)
+        self.assertEqual(Player.objects.get_by_natural_key(*player.natural_key()), player)
+        self.assertEqual(tournament.natural_key(), ("Spring", "2026-04-01"))
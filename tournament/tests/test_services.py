@@ -224,4 +224,37 @@ class StandingsCalculatorTest(TestCase):
         team1_standing = next(s for s in standings if s['team'] == teams[1])
         team2_standing = next(s for s in standings if s['team'] == teams[2])
         self.assertEqual(team1_standing['total_points'], 1)
-        self.assertEqual(team2_standing['total_points'], 1)
\ No newline at end of file
+        self.assertEqual(team2_standing['total_points'], 1)
+
+class TournamentGridBuilderLabelTest(TestCase):
+    def setUp(self):
+        self.tournament = Tournament.objects.create(name="Grid Labels", start_date=date(2026, 5, 1))
+        tournament_group = TournamentGroup.objects.create(
+            tournament=self.tournament, group=Group.objects.create(name="Grid Label Group")
+        )
+        players = [
+            Player.objects.create(first_name=name, last_name="L")
+            for name in ("Alexandra", "Bo", "Charlotte", "Dee")
+        ]
+        teams = [
+            Team.objects.create(
+                player1=players[i], player2=players[i + 1],
+                tournament_group=tournament_group, rank=i
+            )
+            for i in (0, 2)
+        ]
+        Match.objects.create(
+            tournament=self.tournament, team1=teams[0], team2=teams[1],
+            set1_team1=6, set1_team2=4, set2_team1=6, set2_team2=3,
+            date_played=date(2026, 5, 2)
+        )
+
+    def test_grid_reads_stored_labels_without_joining_players(self):
+        with self.assertNumQueries(4) as queries:
+            grid = TournamentGridBuilder().build_grid_data(self.tournament)
+
+        self.assertFalse(any("tournament_player" in q["sql"] for q in queries.captured_queries))
+        match = grid[0]["matches"][0]
+        self.assertEqual(match["team1_name"], "Alexandra/Bo")
+        self.assertEqual(match["team2_name"], "Charlotte/Dee")
+        self.assertEqual([team.short_label for team in grid[0]["teams"]], ["Alex/Bo", "Char/Dee"])
@@ -0,0 +1,48 @@
+import os
+import sqlite3
+import tempfile
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from tournament.sqlite import TUNED_PRAGMAS, apply_pragmas, copy_database, read_pragmas
+
+
+class SqliteBackendTest(TestCase):
+    def test_connections_get_tuned_pragmas(self):
+        with connection.cursor() as cursor:
+            pragmas = {}
+            for name in ("synchronous", "cache_size", "temp_store", "busy_timeout"):
+                cursor.execute(f"PRAGMA {name}")
+                pragmas[name] = cursor.fetchone()[0]
+
+        # synchronous=NORMAL is 1 and temp_store=MEMORY is 2
+        self.assertEqual(pragmas, {
+            "synchronous": 1,
+            "cache_size": TUNED_PRAGMAS["cache_size"],
+            "temp_store": 2,
+            "busy_timeout": TUNED_PRAGMAS["busy_timeout"],
+        })
+
+
+class SqliteHelpersTest(SimpleTestCase):
+    def test_rejects_invalid_pragma_names(self):
+        with self.assertRaises(ValueError):
+            apply_pragmas(sqlite3.connect(":memory:"), {"synchronous; DROP TABLE x": 1})
+
+    def test_copy_includes_commits_still_in_the_wal(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source_path = os.path.join(tmp, "source.sqlite3")
+            source = sqlite3.connect(source_path)
+            apply_pragmas(source, {"journal_mode": "WAL", "wal_autocheckpoint": 0})
+            source.execute("CREATE TABLE result (score TEXT)")
+            source.execute("INSERT INTO result VALUES ('6-3 6-4')")
+            source.commit()
+            self.assertTrue(os.path.getsize(source_path + "-wal"))
+
+            dest_path = os.path.join(tmp, "dest.sqlite3")
+            copy_database(source_path, dest_path)
+            source.close()
+
+            dest = sqlite3.connect(dest_path)
+            self.assertEqual(dest.execute("SELECT score FROM result").fetchall(), [("6-3 6-4",)])
+            self.assertEqual(read_pragmas(dest, ["journal_mode"]), {"journal_mode": "wal"})
+            dest.close()
@@ -0,0 +1,130 @@
+import json
+import os
+import tempfile
+from django.http import FileResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from tournament.models import Match, Tournament
+from tournament.static_history import export_root, export_static_history, read_manifest
+from tournament.synthetic import SyntheticConfig, SyntheticDataGenerator
+
+
+class StaticHistoryTest(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings = override_settings(STATIC_ROOT=tmp.name, METRICS_ENABLED=False)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        config = SyntheticConfig(tournaments=3, min_groups=2, max_groups=2, teams_per_group=4, seed=3)
+        self.ongoing = SyntheticDataGenerator(config).generate("Static")[-1]
+        self.completed = list(Tournament.objects.filter(status="COMPLETED").order_by("start_date"))
+        self.history = reverse("tournament_history")
+        self.details = [reverse("tournament_detail", args=[tournament.pk]) for tournament in self.completed]
+
+    def get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        if isinstance(response, FileResponse):
+            return b"".join(response.streaming_content), True
+        return response.content, False
+
+    def test_exported_pages_are_served_in_place_of_the_views(self):
+        live = [self.get(url)[0] for url in self.details]
+
+        result = export_static_history()
+
+        self.assertEqual(result.written, self.details)
+        with self.assertNumQueries(1):
+            exported = self.get(self.details[0])
+        self.assertEqual(exported, (live[0], True))
+        self.assertEqual([self.get(url) for url in self.details], [(page, True) for page in live])
+        # Ongoing tournaments and the history page are always rendered live
+        self.assertEqual(self.get(reverse("tournament_detail", args=[self.ongoing.pk]))[1], False)
+        self.assertEqual(self.get(self.history)[1], False)
+        self.assertNotIn(self.history, read_manifest()["pages"])
+
+    def test_only_changed_tournaments_are_rendered_again(self):
+        export_static_history()
+        before = read_manifest()["pages"]
+        match = Match.objects.filter(tournament=self.completed[0], retired_team=None).first()
+        # The other team wins instead
+        for n in (1, 2, 3):
+            first, second = getattr(match, f"set{n}_team1"), getattr(match, f"set{n}_team2")
+            setattr(match, f"set{n}_team1", second)
+            setattr(match, f"set{n}_team2", first)
+        match.save()
+
+        result = export_static_history()
+
+        self.assertEqual(result.written, [self.details[0]])
+        self.assertEqual(result.unchanged, len(self.details) - 1)
+        after = read_manifest()["pages"]
+        self.assertNotEqual(after[self.details[0]]["html"], before[self.details[0]]["html"])
+        self.assertFalse(os.path.exists(os.path.join(export_root(), before[self.details[0]]["html"])))
+        self.assertEqual(export_static_history().written, [])
+
+    def test_pages_showing_changed_tournaments_are_served_live_until_exported(self):
+        export_static_history()
+        self.completed[0].name = "Renamed"
+        self.completed[0].save()
+
+        self.assertFalse(self.get(self.details[0])[1])
+        self.assertTrue(self.get(self.details[1])[1])
+
+        result = export_static_history()
+        self.assertEqual(result.written, [self.details[0]])
+        content, exported = self.get(self.details[0])
+        self.assertTrue(exported)
+        self.assertIn(b"Renamed", content)
+
+    def test_history_page_from_an_older_export_is_removed(self):
+        manifest = os.path.join(export_root(), "manifest.json")
+        os.makedirs(export_root())
+        with open(manifest, "w") as f:
+            json.dump({"pages": {self.history: {"version": "0", "tournaments": "0",
+                                                "html": "tournaments.0.html", "json": "tournaments.0.json"}}}, f)
+
+        result = export_static_history()
+
+        self.assertEqual(result.removed, [self.history])
+        self.assertFalse(self.get(self.history)[1])
+
+    def test_reopened_tournaments_are_removed(self):
+        export_static_history()
+        self.completed[0].status = "ONGOING"
+        self.completed[0].save()
+
+        result = export_static_history()
+
+        self.assertEqual(result.removed, [self.details[0]])
+        self.assertNotIn(self.details[0], read_manifest()["pages"])
+        self.assertFalse(self.get(self.details[0])[1])
+
+    def test_json_has_standings_and_matches(self):
+        export_static_history()
+        tournament = self.completed[-1]
+        entry = read_manifest()["pages"][self.details[-1]]
+
+        with open(os.path.join(export_root(), entry["json"])) as f:
+            data = json.load(f)
+
+        self.assertEqual(data["tournament"]["name"], tournament.name)
+        self.assertEqual(len(data["groups"]), 2)
+        self.assertEqual(
+            sum(len(group["matches"]) for group in data["groups"]),
+            Match.objects.filter(tournament=tournament).count(),
+        )
+        standings = data["groups"][0]["standings"]
+        self.assertEqual(len(standings), 4)
+        self.assertGreaterEqual(standings[0]["total_points"], standings[-1]["total_points"])
+        self.assertIn("label", standings[0]["team"])
+
+    def test_conditional_requests_get_not_modified(self):
+        export_static_history()
+        etag = self.client.get(self.details[0])["ETag"]
+
+        response = self.client.get(self.details[0], HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
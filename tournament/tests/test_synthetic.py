@@ -0,0 +1,66 @@
+from django.test import TestCase
+from tournament.benchmarks import benchmark_tournament
+from tournament.models import Team, Match, ValidationContext
+from tournament.synthetic import SyntheticConfig, SyntheticDataGenerator
+
+
+class SyntheticDataGeneratorTest(TestCase):
+    def test_generates_complete_round_robins(self):
+        config = SyntheticConfig(
+            tournaments=3, min_groups=2, max_groups=4, teams_per_group=5, seed=7
+        )
+
+        tournaments = SyntheticDataGenerator(config).generate("Synth")
+
+        self.assertEqual(len(tournaments), 3)
+        self.assertEqual(
+            [t.status for t in tournaments], ["COMPLETED", "COMPLETED", "ONGOING"]
+        )
+        for tournament in tournaments:
+            group_count = tournament.tournamentgroup_set.count()
+            self.assertTrue(2 <= group_count <= 4)
+            self.assertEqual(
+                Team.objects.filter(tournament_group__tournament=tournament).count(),
+                group_count * 5,
+            )
+            # Every pair in a group of five plays once
+            self.assertEqual(tournament.matches.count(), group_count * 10)
+
+    def test_generated_matches_pass_validation(self):
+        config = SyntheticConfig(teams_per_group=4, retirement_rate=0.3, seed=3)
+        tournament = SyntheticDataGenerator(config).generate("Valid")[0]
+
+        context = ValidationContext.for_tournament(tournament)
+        for match in Match.objects.filter(tournament=tournament):
+            match.clean(context=context)
+
+    def test_partial_round_robin(self):
+        config = SyntheticConfig(min_groups=2, max_groups=2, teams_per_group=6, completion=0, seed=1)
+
+        tournament = SyntheticDataGenerator(config).generate("Empty")[0]
+
+        self.assertEqual(tournament.matches.count(), 0)
+
+    def test_same_seed_gives_same_results(self):
+        config = SyntheticConfig(teams_per_group=4, seed=11)
+        first = SyntheticDataGenerator(config).generate("First")[0]
+        second = SyntheticDataGenerator(config).generate("Second")[0]
+
+        def scores(tournament):
+            return list(
+                Match.objects.filter(tournament=tournament)
+                .order_by("id")
+                .values_list("set1_team1", "set1_team2", "set2_team1", "set2_team2", "retired_team")
+            )
+
+        self.assertEqual(scores(first), scores(second))
+
+    def test_benchmark_reports_each_service(self):
+        tournament = SyntheticDataGenerator(SyntheticConfig(teams_per_group=3, seed=2)).generate()[0]
+
+        results = benchmark_tournament(tournament, repeat=1)
+
+        self.assertEqual(
+            set(results), {"build_grid_data", "calculate_standings", "_get_annotated_matches"}
+        )
+        self.assertGreater(results["build_grid_data"]["queries"], 0)
@@ -2,7 +2,10 @@
 from django.test import TestCase
 from django.urls import reverse
 from datetime import date
-from tournament.models import Tournament, Group, TournamentGroup
+from tournament.models import Tournament, Group, Match, Team, TournamentGroup
+from tournament.services import StandingsCalculator
+from tournament.synthetic import SyntheticConfig, SyntheticDataGenerator
+from tournament.views import TournamentHistoryView
 
 
 class TournamentHistoryViewTest(TestCase):
@@ -49,3 +52,88 @@ class TournamentHistoryViewTest(TestCase):
 
         for tournament in self.tournaments:
             self.assertContains(response, tournament.name)
+
+    def test_tournament_history_view_shows_group_counts(self):
+        """Each tournament should show its number of groups"""
+        response = self.client.get(reverse('tournament_history'))
+
+        tournament = next(t for t in response.context['tournaments'] if t.pk == self.tournaments[0].pk)
+        self.assertEqual(tournament.summary['groups'], 2)
+        self.assertContains(response, '2 groups')
+
+
+class TournamentHistoryPaginationTest(TestCase):
+    def setUp(self):
+        Tournament.objects.bulk_create(
+            Tournament(name=f'Paged {i}', start_date=date(2000 + i // 2, 1 + i % 2, 1))
+            for i in range(45)
+        )
+        # Two tournaments starting the same day are told apart by id
+        Tournament.objects.create(name='Paged same day', start_date=date(2010, 1, 1))
+        self.expected = list(
+            Tournament.objects.order_by('-start_date', '-pk').values_list('name', flat=True)
+        )
+
+    def page(self, **params):
+        response = self.client.get(reverse('tournament_history'), params)
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    def test_pages_cover_every_tournament_once(self):
+        names, context = [], self.page()
+        self.assertIsNone(context['newer_cursor'])
+        while True:
+            page = [tournament.name for tournament in context['tournaments']]
+            self.assertLessEqual(len(page), TournamentHistoryView.paginate_by)
+            names += page
+            if not context['older_cursor']:
+                break
+            context = self.page(before=context['older_cursor'])
+
+        self.assertEqual(names, self.expected)
+
+    def test_newer_links_walk_back_to_the_first_page(self):
+        first = self.page()
+        second = self.page(before=first['older_cursor'])
+        third = self.page(before=second['older_cursor'])
+
+        self.assertEqual(
+            [t.name for t in self.page(after=third['newer_cursor'])['tournaments']],
+            [t.name for t in second['tournaments']],
+        )
+        back = self.page(after=second['newer_cursor'])
+        self.assertEqual([t.name for t in back['tournaments']], [t.name for t in first['tournaments']])
+        self.assertIsNone(back['newer_cursor'])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(reverse('tournament_history'), {'before': 'yesterday'})
+
+        self.assertEqual(response.status_code, 404)
+
+
+class TournamentHistorySummaryTest(TestCase):
+    def setUp(self):
+        config = SyntheticConfig(tournaments=3, min_groups=2, max_groups=3, teams_per_group=4, seed=4)
+        SyntheticDataGenerator(config).generate('Summary')
+
+    def test_summaries_count_rows_and_name_group_winners(self):
+        self.assertTrue(Tournament.objects.filter(name__startswith='Summary', status='COMPLETED').exists())
+        response = self.client.get(reverse('tournament_history'))
+
+        for tournament in response.context['tournaments']:
+            if not tournament.name.startswith('Summary'):
+                continue
+            summary = tournament.summary
+            self.assertEqual(summary['groups'], TournamentGroup.objects.filter(tournament=tournament).count())
+            self.assertEqual(summary['teams'], Team.objects.filter(tournament=tournament).count())
+            self.assertEqual(summary['matches'], Match.objects.filter(tournament=tournament).count())
+            if tournament.status != 'COMPLETED':
+                self.assertEqual(summary['winners'], [])
+                continue
+            expected = []
+            for tournament_group in TournamentGroup.objects.filter(tournament=tournament).order_by('group__name'):
+                standings = StandingsCalculator().calculate_standings(tournament_group)
+                expected.append({'group': tournament_group.group.name, 'team': standings[0]['team'].full_label})
+            self.assertEqual(summary['winners'], expected)
+            self.assertContains(response, expected[0]['team'])
+
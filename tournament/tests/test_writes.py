@@ -0,0 +1,133 @@
+import os
+import sqlite3
+import tempfile
+import threading
+from datetime import date
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, override_settings
+from tournament.models import Tournament, Group, TournamentGroup, Player, Team
+from tournament.writes import WriteFailed, run_write
+
+# A real database file, unlike the in-memory test database, so the workers'
+# locking behaves as it does in production
+ALIAS = "write_stress"
+
+
+@override_settings(METRICS_ENABLED=False, WRITE_RETRY_BACKOFF=0.01)
+class ConcurrentWriteTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp = tempfile.TemporaryDirectory()
+        default = connections.settings["default"]
+        config = {**default, "NAME": os.path.join(cls.tmp.name, "stress.sqlite3")}
+        connections.settings[ALIAS] = connections.configure_settings(
+            {"default": default, ALIAS: config}
+        )[ALIAS]
+        cls.databases = {*cls.databases, ALIAS}
+        call_command("migrate", database=ALIAS, verbosity=0, interactive=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        connections[ALIAS].close()
+        del connections[ALIAS]
+        del connections.settings[ALIAS]
+        cls.tmp.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        db = Tournament.objects.using(ALIAS)
+        self.tournament = db.create(name="Stress", start_date=date(2026, 4, 1))
+        tournament_group = TournamentGroup.objects.using(ALIAS).create(
+            tournament=self.tournament, group=Group.objects.using(ALIAS).create(name=f"Stress {self.id()}")
+        )
+        players = Player.objects.using(ALIAS).bulk_create(
+            [Player(first_name="Alice", last_name="A"), Player(first_name="Beth", last_name="B")]
+        )
+        self.team = Team.objects.using(ALIAS).create(
+            player1=players[0], player2=players[1], tournament_group=tournament_group, rank=0
+        )
+
+    def tearDown(self):
+        Tournament.objects.using(ALIAS).all().delete()
+        Player.objects.using(ALIAS).all().delete()
+
+    def write(self, writer, index):
+        """Read-modify-write the team's rank and add a player in one transaction"""
+        team = Team.objects.using(ALIAS).get(pk=self.team.pk)
+        team.rank += 1
+        team.save(using=ALIAS)
+        Player.objects.using(ALIAS).create(first_name=f"Writer{writer}", last_name=str(index))
+
+    def run_writers(self, threads, writes_each):
+        errors = []
+
+        def writer(number):
+            try:
+                for index in range(writes_each):
+                    run_write(lambda: self.write(number, index), name="stress", using=ALIAS)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connections[ALIAS].close()
+
+        workers = [threading.Thread(target=writer, args=(n,)) for n in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return errors
+
+    def test_concurrent_writers_lose_nothing(self):
+        for queue in (False, True):
+            with self.subTest(queue=queue), override_settings(WRITE_QUEUE_ENABLED=queue):
+                Team.objects.using(ALIAS).filter(pk=self.team.pk).update(rank=0)
+                Player.objects.using(ALIAS).filter(first_name__startswith="Writer").delete()
+
+                errors = self.run_writers(threads=12, writes_each=10)
+
+                self.assertEqual(errors, [])
+                self.assertEqual(Team.objects.using(ALIAS).get(pk=self.team.pk).rank, 120)
+                self.assertEqual(
+                    Player.objects.using(ALIAS).filter(first_name__startswith="Writer").count(), 120
+                )
+
+    def test_reads_are_not_blocked_by_a_writer(self):
+        holding = threading.Event()
+        release = threading.Event()
+
+        def slow_write():
+            self.write(0, 0)
+            holding.set()
+            release.wait(5)
+
+        writer = threading.Thread(
+            target=lambda: (run_write(slow_write, using=ALIAS), connections[ALIAS].close())
+        )
+        writer.start()
+        try:
+            self.assertTrue(holding.wait(5))
+            # The write is still open, yet the last committed rank is readable
+            self.assertEqual(Team.objects.using(ALIAS).get(pk=self.team.pk).rank, 0)
+        finally:
+            release.set()
+            writer.join()
+        self.assertEqual(Team.objects.using(ALIAS).get(pk=self.team.pk).rank, 1)
+
+    def test_gives_up_after_bounded_attempts(self):
+        blocker = sqlite3.connect(connections.settings[ALIAS]["NAME"])
+        blocker.execute("BEGIN IMMEDIATE")
+        try:
+            with connections[ALIAS].cursor() as cursor:
+                cursor.execute("PRAGMA busy_timeout = 20")
+            with self.assertLogs("tournament.writes", "WARNING") as logs, \
+                    self.assertRaisesMessage(WriteFailed, "after 3 attempts"):
+                run_write(lambda: self.write(0, 0), using=ALIAS, attempts=3)
+            self.assertEqual(len(logs.records), 3)
+        finally:
+            blocker.rollback()
+            blocker.close()
+            connections[ALIAS].close()
+
+        self.assertEqual(Team.objects.using(ALIAS).get(pk=self.team.pk).rank, 0)
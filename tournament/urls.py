@@ -1,8 +1,13 @@
 # tournament/urls.py
 from django.urls import path
 from tournament import views
+from tournament.static_history import prefer_export
 
 urlpatterns = [
-    path('tournament/<int:tournament_id>/', views.TournamentDetailView.as_view(), name='tournament_detail'),
+    path(
+        'tournament/<int:tournament_id>/',
+        prefer_export(views.TournamentDetailView.as_view()),
+        name='tournament_detail',
+    ),
     path('tournaments/', views.TournamentHistoryView.as_view(), name='tournament_history'),
-]
\ No newline at end of file
+]
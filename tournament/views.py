@@ -1,11 +1,17 @@
 # tournament/views.py
-from datetime import datetime
-from django.http import JsonResponse
+from datetime import date, datetime
+from django.db.models import Q
+from django.http import FileResponse, Http404, JsonResponse
+from django.contrib import admin
 from django.contrib.admin.views.decorators import staff_member_required
+from django.template.response import TemplateResponse
 from django.views.generic import TemplateView
 from .models import Tournament
-from .services import TournamentGridBuilder, StandingsCalculator
+from .seasons import reading_tournament
+from .services import TournamentGridBuilder, TournamentSummaryBuilder, StandingsCalculator
 from .api import TeamAPI
+from .metrics import recorder
+from .profiling import list_profiles, render_stats, resolve_profile
 import logging
 
 logger = logging.getLogger(__name__)
@@ -96,9 +102,11 @@ class TournamentDetailView(TemplateView):
         # Pass tournament object
         context["tournament"] = tournament
 
-        # Use service to build grid data
+        # Use service to build grid data, from the season's database if the
+        # tournament has been archived
         grid_builder = TournamentGridBuilder()
-        context["group_data"] = grid_builder.build_grid_data(tournament)
+        with reading_tournament(tournament):
+            context["group_data"] = grid_builder.build_grid_data(tournament)
 
         # Add prev/next tournament IDs for navigation
         prev_tournament = (
@@ -119,17 +127,67 @@ class TournamentDetailView(TemplateView):
 
 
 class TournamentHistoryView(TemplateView):
-    """View for displaying list of all tournaments"""
+    """View for displaying list of all tournaments
+
+    Pages through tournaments newest first by (start_date, id) keyset
+    rather than offset, so every page costs the same however far back it
+    is. ?before= and ?after= take the cursor of the last or first
+    tournament on the neighbouring page.
+    """
 
     template_name = "tournament/history.html"
+    paginate_by = 20
+
+    @staticmethod
+    def cursor(tournament):
+        return f"{tournament.start_date.isoformat()}.{tournament.pk}"
+
+    @staticmethod
+    def parse_cursor(value):
+        start_date, _, pk = value.partition(".")
+        try:
+            return date.fromisoformat(start_date), int(pk)
+        except ValueError:
+            raise Http404("Invalid page")
+
+    def get_page(self):
+        """The tournaments on the requested page, and whether there are newer and older ones"""
+        tournaments = Tournament.objects.all()
+        size = self.paginate_by
+        if after := self.request.GET.get("after"):
+            start_date, pk = self.parse_cursor(after)
+            newer = list(
+                tournaments.filter(Q(start_date__gt=start_date) | Q(start_date=start_date, pk__gt=pk))
+                .order_by("start_date", "pk")[:size + 1]
+            )
+            if len(newer) > size:
+                return newer[size - 1::-1], True, True
+            # Fewer than a page left, so show the newest page instead
+
+        query = tournaments.order_by("-start_date", "-pk")
+        has_newer = False
+        if before := self.request.GET.get("before"):
+            start_date, pk = self.parse_cursor(before)
+            query = query.filter(Q(start_date__lt=start_date) | Q(start_date=start_date, pk__lt=pk))
+            has_newer = True
+        page = list(query[:size + 1])
+        return page[:size], has_newer, len(page) > size
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Get all tournaments in reverse chronological order
-        tournaments = Tournament.objects.all().order_by('-start_date')
+        # Get one page of tournaments in reverse chronological order
+        tournaments, has_newer, has_older = self.get_page()
+
+        # Counts and group winners for the whole page in a fixed number of
+        # queries, or frozen on archived tournaments
+        summaries = TournamentSummaryBuilder().build_summaries(tournaments)
+        for tournament in tournaments:
+            tournament.summary = summaries.get(tournament.pk)
 
         context["tournaments"] = tournaments
+        context["newer_cursor"] = self.cursor(tournaments[0]) if has_newer and tournaments else None
+        context["older_cursor"] = self.cursor(tournaments[-1]) if has_older else None
 
         return context
 
@@ -158,3 +216,36 @@ def previous_partner(request):
     partner_id = api.get_previous_partner(int(player_id))
 
     return JsonResponse({"partner_id": partner_id})
+
+
+@staff_member_required
+def metrics(request):
+    """Latency histograms, query counts and counters aggregated across workers"""
+    return JsonResponse(recorder.snapshot())
+
+
+def profile_list(request):
+    """Admin page listing the saved request profiles"""
+    context = {
+        **admin.site.each_context(request),
+        "title": "Request profiles",
+        "profiles": list_profiles(),
+    }
+    return TemplateResponse(request, "admin/profiles/profile_list.html", context)
+
+
+def profile_detail(request, name):
+    """Show a saved profile as text, or download the raw .prof file"""
+    path = resolve_profile(name)
+    if path is None:
+        raise Http404("Profile not found")
+
+    if "download" in request.GET:
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=name)
+
+    context = {
+        **admin.site.each_context(request),
+        "title": name,
+        "stats": render_stats(path),
+    }
+    return TemplateResponse(request, "admin/profiles/profile_detail.html", context)
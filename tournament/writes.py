@@ -0,0 +1,122 @@
+# tournament/writes.py
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Iterator, Optional, TypeVar
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections, transaction
+from .instrumentation import timed_stage
+from .metrics import recorder
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Messages SQLite uses when another connection holds the write lock
+LOCKED_MESSAGES = ("database is locked", "database table is locked", "database is busy")
+
+# One writer at a time within this process when WRITE_QUEUE_ENABLED is set
+_write_queue = threading.Lock()
+
+
+class WriteFailed(OperationalError):
+    """The database stayed locked for every attempt"""
+
+
+def is_locked_error(error: Exception) -> bool:
+    return isinstance(error, OperationalError) and any(
+        message in str(error) for message in LOCKED_MESSAGES
+    )
+
+
+@contextmanager
+def immediate_atomic(using: str = DEFAULT_DB_ALIAS) -> Iterator[None]:
+    """transaction.atomic that starts with BEGIN IMMEDIATE
+
+    A deferred transaction only asks for the write lock at its first write,
+    and if another connection is writing by then SQLite gives up straight
+    away instead of waiting. BEGIN IMMEDIATE takes the lock up front, so the
+    wait falls under busy_timeout and a failure happens before any work.
+    Readers are not affected, as WAL lets them carry on during a write.
+    """
+    connection = connections[using]
+    if connection.in_atomic_block or connection.vendor != "sqlite":
+        # Nested blocks become savepoints of the outer transaction
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    connection.ensure_connection()
+    previous_mode = connection.transaction_mode
+    connection.transaction_mode = "IMMEDIATE"
+    try:
+        with transaction.atomic(using=using):
+            yield
+    finally:
+        connection.transaction_mode = previous_mode
+
+
+def run_write(
+    func: Callable[[], T],
+    name: str = "write",
+    using: str = DEFAULT_DB_ALIAS,
+    attempts: Optional[int] = None,
+) -> T:
+    """Run func in an immediate transaction, retrying while the database is locked
+
+    Each attempt is timed into the write_ms histogram under name, and
+    retries and failures are counted. Backoff doubles from
+    WRITE_RETRY_BACKOFF seconds, with jitter, up to WRITE_RETRY_MAX_BACKOFF.
+    Called inside an existing transaction, func simply joins it: only the
+    outermost block can be retried.
+    """
+    attempts = attempts or getattr(settings, "WRITE_RETRY_ATTEMPTS", 5)
+    if connections[using].in_atomic_block:
+        with transaction.atomic(using=using):
+            return func()
+
+    queue = _write_queue if getattr(settings, "WRITE_QUEUE_ENABLED", False) else nullcontext()
+    backoff = getattr(settings, "WRITE_RETRY_BACKOFF", 0.05)
+    max_backoff = getattr(settings, "WRITE_RETRY_MAX_BACKOFF", 1.0)
+
+    for attempt in range(1, attempts + 1):
+        start = time.perf_counter()
+        try:
+            with queue, timed_stage("write"), immediate_atomic(using):
+                result = func()
+        except OperationalError as e:
+            recorder.observe("write_ms", name, (time.perf_counter() - start) * 1000)
+            if not is_locked_error(e):
+                raise
+            if attempt == attempts:
+                recorder.increment("write_failures", name)
+                logger.error("%s failed after %d attempts: %s", name, attempts, e)
+                raise WriteFailed(f"{name} failed after {attempts} attempts: {e}") from e
+            recorder.increment("write_retries", name)
+            delay = min(backoff * 2 ** (attempt - 1), max_backoff)
+            delay *= random.uniform(0.5, 1.0)
+            logger.warning("%s attempt %d hit a locked database, retrying in %.0f ms", name, attempt, delay * 1000)
+            time.sleep(delay)
+        else:
+            recorder.observe("write_ms", name, (time.perf_counter() - start) * 1000)
+            return result
+
+
+class WriteRetryAdminMixin:
+    """Save admin changes through run_write so a busy database is retried
+
+    The whole add or change form, validation included, runs in one
+    immediate transaction; a retry starts the form over from the request.
+    """
+
+    def changeform_view(self, request, object_id=None, form_url="", extra_context=None):
+        if request.method != "POST":
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        return run_write(
+            lambda: super(WriteRetryAdminMixin, self).changeform_view(
+                request, object_id, form_url, extra_context
+            ),
+            name=f"admin_{self.model._meta.model_name}",
+        )